@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class ScorecardConfig(AppConfig):
+    name = 'scorecard'
+    verbose_name = "Scorecard"
+
+    def ready(self):
+        """
+        Connect the signal handlers outdating the cached pages and load the translations of all languages,
+        so every worker has them when it starts instead of on its first request in a language
+        """
+        from scorecard import signals  # noqa
+        from scorecard.caching import preload_catalogs
+        preload_catalogs()
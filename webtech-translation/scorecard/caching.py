@@ -0,0 +1,142 @@
+import uuid
+from functools import wraps
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.utils import translation
+from django.utils.http import urlencode
+from django.utils.translation.trans_real import get_supported_language_variant
+
+PAGE_KEY = 'scorecard:page:{0}:{1}:{2:d}:{3}'
+GENERATION_KEY = 'scorecard:generation'
+
+
+def get_language_key(language=None):
+    """
+    Normalize a language code to one of the LANGUAGES, so de-DE, de-AT and de end up in the same cache entry
+    :param language:    Language code, defaults to the active language chosen by LocaleMiddleware
+    :return:            Code of the supported language like de
+    """
+    try:
+        return get_supported_language_variant((language or translation.get_language() or '').lower())
+    except LookupError:
+        return get_supported_language_variant(settings.LANGUAGE_CODE.lower())
+
+
+def language_key(request):
+    """
+    Context processor providing the normalized language for the cache template tag
+    :param request:
+    :return:
+    """
+    return {'language_key': get_language_key()}
+
+
+def get_page_cache():
+    """
+    :return: Cache of the rendered pages, every process may have its own
+    """
+    return caches['default']
+
+
+def get_generation_cache():
+    """
+    :return: Cache of the generation, shared by all processes, so a change outdates the pages of every process
+    """
+    return caches['shared']
+
+
+def get_generation(cache=None):
+    """
+    Every change of the courses or lecturers starts a new generation, so all cached pages are outdated at once
+    :param cache:   Cache of the generation, defaults to get_generation_cache
+    :return:        Current generation
+    """
+    if cache is None:
+        cache = get_generation_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_pages():
+    """
+    Outdate all cached pages in all languages
+    :return:
+    """
+    get_generation_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def cached_path(request):
+    """
+    The views only read the query parameters in SCORECARD_PAGE_CACHE_PARAMETERS (none by default),
+    so other parameters do not get pages of their own
+    :param request:
+    :return:        Path of the request with the known query parameters in a fixed order
+    """
+    parameters = sorted((name, request.GET.getlist(name))
+                        for name in getattr(settings, 'SCORECARD_PAGE_CACHE_PARAMETERS', ()) if name in request.GET)
+    if not parameters:
+        return request.path
+    return '{0}?{1}'.format(request.path, urlencode(parameters, doseq=True))
+
+
+def page_key(request, generation):
+    """
+    :param request:
+    :param generation:  Current generation from get_generation
+    :return:            Cache key of the page in the active language
+    """
+    return PAGE_KEY.format(generation, get_language_key(), request.session.get('has_voted', False),
+                           cached_path(request))
+
+
+def is_cacheable(request):
+    """
+    Pages showing flash messages are rendered for this request only
+    :param request:
+    :return:        True if the page of the request may come from the cache
+    """
+    # len does not mark the messages as shown, iterating over them would
+    return request.method in ('GET', 'HEAD') and not len(messages.get_messages(request))
+
+
+def cache_page_per_language(view):
+    """
+    Cache the pages of a view once per language
+    The key holds the normalized active language rather than the Accept-Language header,
+    so the many variants of the header share a few cache entries.
+    The whole response is cached with its headers, like the cache middleware of Django does it.
+    :param view:    View function
+    :return:        Caching view function
+    """
+    @wraps(view)
+    def cached_view(request, *args, **kwargs):
+        if not getattr(settings, 'SCORECARD_PAGE_CACHE', True) or not is_cacheable(request):
+            return view(request, *args, **kwargs)
+        cache = get_page_cache()
+        key = page_key(request, get_generation())
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            cache.set(key, response, getattr(settings, 'SCORECARD_PAGE_CACHE_TIMEOUT', 300))
+        return response
+    return cached_view
+
+
+def preload_catalogs():
+    """
+    Load the translation catalogs of all LANGUAGES, so no request has to wait for the .mo files
+    :return: List of the loaded languages
+    """
+    loaded = []
+    for code, name in settings.LANGUAGES:
+        with translation.override(code):
+            loaded.append(translation.get_language())
+    return loaded
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """
+    Create the tables of the database caches, like the shared cache of the page generation
+    Existing tables are kept
+    """
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+def keep_cache_tables(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scorecard', '0003_auto_20150329_1649'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, keep_cache_tables),
+    ]
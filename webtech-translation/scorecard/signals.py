@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from scorecard.caching import invalidate_pages
+from scorecard.models import Course, Lecturer
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Lecturer)
+@receiver(post_delete, sender=Lecturer)
+def outdate_cached_pages(sender, **kwargs):
+    """
+    Votes and changed courses or lecturers show up on the next request in every language
+    """
+    invalidate_pages()
@@ -1,6 +1,13 @@
-from django.test import TestCase
+from importlib import import_module
+from django.contrib.messages.storage import default_storage
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.core.cache import cache, caches
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.utils.translation import trans_real
 
+from scorecard.caching import cache_page_per_language, get_language_key, invalidate_pages, preload_catalogs
 from scorecard.models import Course, Lecturer
 
 
@@ -146,4 +153,120 @@ class ScoreboardTest(TestCase):
         self.vote(self.course_1, vote)
         response = self.client.get(reverse('scorecard:statistics'))
         self.assertEqual(response.context['lecturer_best'], self.lecturer_1)
-        self.assertEqual(response.context['lecturer_best_votes_mean'], 2)
\ No newline at end of file
+        self.assertEqual(response.context['lecturer_best_votes_mean'], 2)
+
+
+class LanguageCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="Webtech", votes=0, lecturer=lecturer)
+
+    def get_index(self, accept_language):
+        return self.client.get(reverse('scorecard:index'), HTTP_ACCEPT_LANGUAGE=accept_language)
+
+    def test_language_key(self):
+        """
+        Variants of a language share one key, unknown languages use the default language
+        """
+        self.assertEqual(get_language_key('de-DE'), 'de')
+        self.assertEqual(get_language_key('de-at'), 'de')
+        self.assertEqual(get_language_key('en-US'), 'en')
+        self.assertEqual(get_language_key('fr'), 'en')
+
+    def test_page_cached_per_language(self):
+        """
+        The test client only has a context for rendered pages, cached pages come without one
+        """
+        german = self.get_index('de-DE,de;q=0.9')
+        self.assertIsNotNone(german.context)
+        self.assertContains(german, 'Start')
+        cached = self.get_index('de-AT,en;q=0.5')
+        self.assertIsNone(cached.context)
+        self.assertEqual(cached.content, german.content)
+        english = self.get_index('en-GB')
+        self.assertIsNotNone(english.context)
+        self.assertContains(english, 'Home')
+        self.assertIsNone(self.get_index('fr-FR').context)
+
+    def test_vote_outdates_cached_pages(self):
+        self.get_index('de')
+        self.get_index('en')
+        self.client.get(reverse('scorecard:vote', kwargs={'pk': self.course.pk, 'vote': 1}))
+        # The page with the message of the vote is not cached
+        response = self.get_index('de')
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Vote Successful!')
+        response = self.get_index('en')
+        self.assertIsNotNone(response.context)
+        self.assertEqual(response.context['object_list'][0].votes, 1)
+
+    def test_query_string_shares_the_page(self):
+        """
+        Unknown query parameters do not get pages of their own
+        """
+        self.get_index('de')
+        response = self.client.get(reverse('scorecard:index') + '?utm_source=mail', HTTP_ACCEPT_LANGUAGE='de')
+        self.assertIsNone(response.context)
+        self.assertContains(response, 'Start')
+        with self.settings(SCORECARD_PAGE_CACHE_PARAMETERS=('page',)):
+            response = self.client.get(reverse('scorecard:index') + '?page=1', HTTP_ACCEPT_LANGUAGE='de')
+            self.assertIsNotNone(response.context)
+
+    def test_cached_page_keeps_headers(self):
+        """
+        The cached response is returned as a whole and not just its content
+        """
+        calls = []
+
+        @cache_page_per_language
+        def view(request):
+            calls.append(request)
+            response = HttpResponse('{}', content_type='application/json')
+            response['X-Scorecard'] = 'rendered'
+            return response
+
+        request = RequestFactory().get('/feed/')
+        request.session = {}
+        request._messages = default_storage(request)
+        view(request)
+        cached = view(request)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cached['Content-Type'], 'application/json')
+        self.assertEqual(cached['X-Scorecard'], 'rendered')
+
+    def test_change_in_other_process_outdates_pages(self):
+        """
+        The generation is in the shared cache, the pages of this process are outdated
+        although only the shared cache learns about the change
+        """
+        self.get_index('de')
+        self.assertIsNone(self.get_index('de').context)
+        invalidate_pages()
+        self.assertIsNotNone(self.get_index('de').context)
+
+    def test_preload_catalogs(self):
+        translations = trans_real._translations.copy()
+        trans_real._translations.clear()
+        try:
+            self.assertEqual(preload_catalogs(), ['en', 'de'])
+            self.assertIn('de', trans_real._translations)
+        finally:
+            trans_real._translations.update(translations)
+
+
+class CacheTableMigrationTest(TransactionTestCase):
+
+    def test_creates_shared_cache_table(self):
+        """
+        A plain migrate creates the table of the shared cache, createcachetable is not needed
+        """
+        migration = import_module('scorecard.migrations.0004_cache_table')
+        table = caches['shared']._table
+        connection.cursor().execute('DROP TABLE {0}'.format(connection.ops.quote_name(table)))
+        migration.create_cache_tables(None, connection.schema_editor())
+        self.assertIn(table, connection.introspection.table_names())
+        # Existing tables are kept
+        migration.create_cache_tables(None, connection.schema_editor())
@@ -1,9 +1,10 @@
 from django.conf.urls import patterns, url
 
 from scorecard import views
+from scorecard.caching import cache_page_per_language
 
 urlpatterns = patterns('',
-                       url(r'^$', views.IndexView.as_view(), name='index'),
+                       url(r'^$', cache_page_per_language(views.IndexView.as_view()), name='index'),
                        url(r'^vote/(?P<pk>\d+)/(?P<vote>-?\d)/$', views.vote, name='vote'),
                        url(r'^details/(?P<pk>\d+)$', views.details, name='details'),
                        url(r'^vote_again$', views.vote_again, name='vote_again'),
@@ -7,6 +7,7 @@ from django.utils.translation import ugettext as _
 from django.db.models import Avg
 import sys
 
+from scorecard.caching import cache_page_per_language
 from scorecard.models import Course, Lecturer
 
 
@@ -61,6 +62,7 @@ def vote(request, pk, vote):
     return redirect_to_index()
 
 
+@cache_page_per_language
 def statistics(request):
     """
     Show statistics page
@@ -88,6 +90,7 @@ def vote_again(request):
     return redirect_to_index()
 
 
+@cache_page_per_language
 def details(request, pk):
     """
     Show details page for course with primary key pk
@@ -53,7 +53,8 @@ MIDDLEWARE_CLASSES = (
 TEMPLATE_CONTEXT_PROCESSORS = (
     'django.contrib.messages.context_processors.messages',
     'django.contrib.auth.context_processors.auth',
-    'django.core.context_processors.request'
+    'django.core.context_processors.request',
+    'scorecard.caching.language_key',
 )
 
 ROOT_URLCONF = 'webtech.urls'
@@ -61,6 +62,21 @@ ROOT_URLCONF = 'webtech.urls'
 WSGI_APPLICATION = 'webtech.wsgi.application'
 
 
+# Cache
+# Pages and fragments are cached per language in the memory of every process, see scorecard.caching.
+# The generation outdating the pages is in a cache shared by all processes,
+# its table is created by the migration scorecard 0004 with manage.py migrate.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'scorecard_cache',
+    },
+}
+
 # Database
 # https://docs.djangoproject.com/en/1.7/ref/settings/#databases
 
@@ -76,6 +92,12 @@ DATABASES = {
 
 LANGUAGE_CODE = 'en-US'
 
+# Every other language falls back to one of these, so there is one cached page per language
+LANGUAGES = (
+    ('en', 'English'),
+    ('de', 'German'),
+)
+
 TIME_ZONE = 'UTC'
 
 USE_I18N = True
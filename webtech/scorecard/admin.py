@@ -1,8 +1,56 @@
-from django.contrib import admin
-from scorecard.models import Course, Lecturer
+from django import forms
+from django.conf.urls import patterns, url
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import render
+from scorecard.importing import import_courses
+from scorecard.models import Course, Lecturer, Vote
+
+# Number of row errors shown after an upload
+SHOWN_IMPORT_ERRORS = 100
+
+class CourseImportForm(forms.Form):
+    file = forms.FileField(label="CSV file", help_text="Columns title, first_name, last_name, optional course and votes")
 
 class CourseAdmin(admin.ModelAdmin):
     list_display = ('course_title', 'lecturer')
+    # The lecturers are read with the courses instead of one query per row
+    list_select_related = ('lecturer',)
+    change_list_template = 'admin/scorecard/course/change_list.html'
+
+    def get_urls(self):
+        urls = patterns('', url(r'^import/$', self.admin_site.admin_view(self.import_view),
+                                name='scorecard_course_import'))
+        return urls + super(CourseAdmin, self).get_urls()
+
+    def import_view(self, request):
+        """
+        Upload a CSV file and import its lecturers and courses
+        """
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            raise PermissionDenied
+        form = CourseImportForm(request.POST or None, request.FILES or None)
+        report = None
+        if form.is_valid():
+            try:
+                report = import_courses(form.cleaned_data['file'].file)
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, str(report))
+        return render(request, 'admin/scorecard/course/import.html', {
+            'title': "Import courses",
+            'form': form,
+            'opts': self.model._meta,
+            'errors': report.errors[:SHOWN_IMPORT_ERRORS] if report else [],
+            'hidden_errors': max(len(report.errors) - SHOWN_IMPORT_ERRORS, 0) if report else 0,
+        })
+
+class VoteAdmin(admin.ModelAdmin):
+    list_display = ('course', 'delta', 'created', 'session_key', 'processed')
+    list_select_related = ('course',)
+    list_filter = ('processed',)
 
 admin.site.register(Course, CourseAdmin)
-admin.site.register(Lecturer)
\ No newline at end of file
+admin.site.register(Lecturer)
+admin.site.register(Vote, VoteAdmin)
\ No newline at end of file
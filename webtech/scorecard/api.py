@@ -0,0 +1,102 @@
+import json
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from scorecard.dedupe import save_voted_courses
+from scorecard.models import Course
+from scorecard.views import get_current_votes, get_session_key, has_already_voted, set_voted, update_vote, update_votes
+
+
+def error(message, status):
+    """
+    :param message: Description of the error
+    :param status:  HTTP status code
+    :return:        JSON response with the error
+    """
+    return JsonResponse({'error': message}, status=status)
+
+
+def get_batch_size():
+    return getattr(settings, 'SCORECARD_API_BATCH_SIZE', 1000)
+
+
+def parse_votes(body):
+    """
+    Read the votes of a batch request
+    The body is a JSON object like {"votes": [[course_pk, vote], ...]}
+    A voter votes once per course, so a batch naming a course twice is invalid
+    :param body:    Body of the request
+    :return:        List of (course pk, vote) pairs
+    """
+    try:
+        data = json.loads(body.decode('utf-8'))
+    except ValueError:
+        raise ValueError("Body is not valid JSON")
+    votes = data.get('votes') if isinstance(data, dict) else None
+    if not isinstance(votes, list) or not votes:
+        raise ValueError("Expected a non-empty list of [course, vote] pairs in votes")
+    if len(votes) > get_batch_size():
+        raise ValueError("At most {0} votes per request".format(get_batch_size()))
+    pairs = []
+    for pair in votes:
+        if (not isinstance(pair, list) or len(pair) != 2 or
+                not all(isinstance(value, int) and not isinstance(value, bool) for value in pair)):
+            raise ValueError("Invalid vote {0}".format(json.dumps(pair)))
+        if abs(pair[1]) != 1:
+            raise ValueError("Vote for course {0} must be 1 or -1".format(pair[0]))
+        pairs.append((pair[0], pair[1]))
+    pks = [pk for pk, vote in pairs]
+    duplicates = sorted(set(pk for pk in pks if pks.count(pk) > 1))
+    if duplicates:
+        raise ValueError("More than one vote for courses: {0}".format(', '.join(str(pk) for pk in duplicates)))
+    return pairs
+
+
+@require_POST
+def vote(request, pk, vote):
+    """
+    Up- or down-vote a course like the vote view,
+    but answer with the new votes of the course as JSON instead of redirecting to the index page
+    :param request: Request to work on
+    :param pk:      Primary key of the Course
+    :param vote:    1 or -1 depending on up/down-vote
+    :return:        JSON with the course and its votes, or with an error
+    """
+    course = Course.objects.filter(pk=pk).first()
+    if course is None:
+        return error("Course not found", 404)
+    if has_already_voted(request, course.pk):
+        return error("You have already voted!", 403)
+    if not update_vote(course, vote, get_session_key(request)):
+        return error("Vote Not Successful!", 400)
+    set_voted(request, [course.pk])
+    response = JsonResponse({'course': course.pk, 'votes': get_current_votes([course.pk])[course.pk]})
+    return save_voted_courses(request, response)
+
+
+@require_POST
+def vote_batch(request):
+    """
+    Count many votes in one transaction
+    The batch is rejected if the voter has already voted for one of its courses
+    Either all votes of the batch are counted or none of them
+    :param request: Request with a JSON body like {"votes": [[course_pk, vote], ...]}
+    :return:        JSON with the new votes of every course in the batch, or with an error
+    """
+    try:
+        votes = parse_votes(request.body)
+    except ValueError as e:
+        return error(str(e), 400)
+    pks = set(pk for pk, vote in votes)
+    current = get_current_votes(pks)
+    missing = sorted(pks - set(current))
+    if missing:
+        return error("Courses not found: {0}".format(', '.join(str(pk) for pk in missing)), 400)
+    voted = sorted(pk for pk in pks if has_already_voted(request, pk))
+    if voted:
+        return error("You have already voted for courses: {0}".format(', '.join(str(pk) for pk in voted)), 403)
+    update_votes(votes, get_session_key(request))
+    set_voted(request, pks)
+    response = JsonResponse({'votes': dict((str(pk), votes) for pk, votes in get_current_votes(pks).items())})
+    return save_voted_courses(request, response)
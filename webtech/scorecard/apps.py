@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ScorecardConfig(AppConfig):
+    name = 'scorecard'
+    verbose_name = "Scorecard"
+
+    def ready(self):
+        """
+        Connect the signal handlers keeping the lecturer statistics and counters up to date
+        and the one setting the PRAGMAs of new SQLite connections
+        """
+        from scorecard import signals  # noqa
+        from scorecard.sqlite import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='scorecard.sqlite.configure_connection')
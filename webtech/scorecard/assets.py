@@ -0,0 +1,89 @@
+import mimetypes
+import os
+import posixpath
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.http import http_date
+from django.utils.six.moves.urllib.parse import unquote
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from scorecard.storage import ENCODINGS
+
+# Hashed names never change their content
+FAR_FUTURE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Plain names may change with the next deployment
+PLAIN_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+minified_names = {}
+
+
+def minified_name(name):
+    """
+    Use the minified build of a static file like bootstrap.min.css if there is one, unless DEBUG is on
+    :param name:    Name of a static file like scorecard/bootstrap/css/bootstrap.css
+    :return:        Name of the file to use
+    """
+    if settings.DEBUG:
+        return name
+    if name not in minified_names:
+        root, ext = posixpath.splitext(name)
+        minified = '{0}.min{1}'.format(root, ext)
+        minified_names[name] = minified if not root.endswith('.min') and finders.find(minified) else name
+    return minified_names[name]
+
+
+def accepted_encodings(request):
+    """
+    :param request:
+    :return:        Set of the content codings in Accept-Encoding, codings with q=0 are left out
+    """
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, parameters = part.partition(';')
+        if parameters.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+@require_safe
+def serve(request, path):
+    """
+    Serve a collected static file, the compressed copy if the client accepts it
+    Files with the hash in their name may be cached forever, so browsers do not ask for them again,
+    other files are revalidated with If-Modified-Since.
+    The development server serves the static files itself as long as DEBUG is on.
+    :param request:
+    :param path:    Path of the file below STATIC_URL
+    :return:        File response, 304 Not Modified or 404
+    """
+    name = posixpath.normpath(unquote(path)).lstrip('/')
+    if name.startswith('..') or name == '.':
+        raise Http404("Invalid path")
+    full_path = staticfiles_storage.path(name)
+    if not os.path.isfile(full_path):
+        raise Http404("'{0}' does not exist".format(name))
+    content_type, encoding = mimetypes.guess_type(full_path)
+    accepted = accepted_encodings(request)
+    served_path, content_encoding = full_path, encoding
+    if encoding is None:
+        for coding, suffix, compressor in ENCODINGS:
+            if coding in accepted and os.path.isfile(full_path + suffix):
+                served_path, content_encoding = full_path + suffix, coding
+                break
+    stat = os.stat(served_path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime, stat.st_size):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        response['Content-Length'] = stat.st_size
+        if content_encoding:
+            response['Content-Encoding'] = content_encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Vary'] = 'Accept-Encoding'
+    is_hashed = getattr(staticfiles_storage, 'is_hashed', lambda name: False)
+    response['Cache-Control'] = FAR_FUTURE_CACHE_CONTROL if is_hashed(name) else PLAIN_CACHE_CONTROL
+    return response
@@ -0,0 +1,339 @@
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.urlresolvers import reverse
+from django.db import close_old_connections, connection, connections
+from django.db.backends.utils import CursorWrapper
+from django.template import RequestContext
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from scorecard.fragments import render_rows
+from scorecard.models import Course
+from scorecard.pagination import make_cursor
+from scorecard.seeding import seed_scorecard
+from scorecard.views import get_best_lecturer_with_mean, get_best_lecturer_with_mean_2
+
+PERCENTILES = (50, 95, 99)
+
+# Where sessions and flash messages are stored, as settings for override_settings
+SESSION_MODES = OrderedDict([
+    ('database', {'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+                  'MESSAGE_STORAGE': 'django.contrib.messages.storage.session.SessionStorage'}),
+    ('cookie', {'SESSION_ENGINE': 'django.contrib.sessions.backends.cache',
+                'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage'}),
+])
+
+# SQLite setups compared by bench_sqlite: name -> (settings, CONN_MAX_AGE, journal mode)
+SQLITE_MODES = OrderedDict([
+    ('default', ({'SCORECARD_SQLITE_TUNING': False, 'SCORECARD_SQLITE_RETRIES': 0}, 0, 'DELETE')),
+    ('production', ({'SCORECARD_SQLITE_TUNING': True, 'SCORECARD_SQLITE_RETRIES': 4}, 600, 'WAL')),
+])
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    Run a benchmark on a fresh test database, so the real data is never touched
+    The test environment is set up like for the tests, so the test client is allowed as host
+    :param verbosity: Verbosity for creating and destroying the database
+    :return:
+    """
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    try:
+        connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+    finally:
+        teardown_test_environment()
+
+
+@contextmanager
+def capture_queries():
+    """
+    Record the SQL and the parameters of every query, so the queries can be executed again
+    :return: List of (sql, params) tuples, filled while the context is active
+    """
+    queries = []
+    execute = CursorWrapper.execute
+
+    def recording_execute(self, sql, params=None):
+        queries.append((sql, params))
+        return execute(self, sql, params)
+
+    CursorWrapper.execute = recording_execute
+    try:
+        yield queries
+    finally:
+        CursorWrapper.execute = execute
+
+
+def explain_query(sql, params=None):
+    """
+    :param sql:     SQL query as passed to the cursor
+    :param params:  Parameters of the query
+    :return:        List of the steps of the SQLite query plan
+    """
+    cursor = connection.cursor()
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+    # The detail is the last column in every SQLite version
+    return [row[-1] for row in cursor.fetchall()]
+
+
+def create_courses(count, lecturer_count=10):
+    """
+    Create lecturers and courses with random votes for a benchmark
+    :param count:           Number of courses
+    :param lecturer_count:  Number of lecturers the courses are spread over
+    :return:                List of the created courses
+    """
+    seed_scorecard(lecturer_count, count)
+    return list(Course.objects.all())
+
+
+def measure_rate(func, count, threads=1, finish=None):
+    """
+    Call func count times, spread over several threads
+    :param func:    Function to measure, gets the number of the call
+    :param count:   Number of calls
+    :param threads: Number of threads calling func at the same time
+    :param finish:  Function called after all calls, its time is included
+    :return:        Calls per second
+    """
+    start_event = threading.Event()
+
+    def worker(calls):
+        start_event.wait()
+        try:
+            for i in calls:
+                func(i)
+        finally:
+            for conn in connections.all():
+                conn.close()
+
+    workers = [threading.Thread(target=worker, args=(range(n, count, threads),)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    start = time.time()
+    start_event.set()
+    for thread in workers:
+        thread.join()
+    if finish is not None:
+        finish()
+    return count / (time.time() - start)
+
+
+def scoreboard_scenarios(course):
+    """
+    The functions and pages of the scoreboard worth measuring
+    :param course:  Course to show and vote for, the index pages after and before it are requested as well
+    :return:        List of (name, function) tuples, each function issues its request once
+    """
+    client = Client()
+    cursor = make_cursor(course)
+
+    def get(view, args=(), params=None):
+        return lambda: client.get(reverse(view, args=args), params or {})
+
+    def vote():
+        # A new visitor for every vote, so has_already_voted never blocks it
+        Client().get(reverse('scorecard:vote', args=(course.pk, 1)))
+
+    return [
+        ('get_best_lecturer_with_mean', get_best_lecturer_with_mean),
+        ('get_best_lecturer_with_mean_2', get_best_lecturer_with_mean_2),
+        ('index', get('scorecard:index')),
+        ('index next page', get('scorecard:index', params={'after': cursor})),
+        ('index previous page', get('scorecard:index', params={'before': cursor})),
+        ('details', get('scorecard:details', (course.pk,))),
+        ('vote', vote),
+        ('statistics', get('scorecard:statistics')),
+    ]
+
+
+def voter_visit(course):
+    """
+    The requests of an anonymous voter: the index page, a vote and the index page with the message of the vote
+    :param course:  Course to vote for
+    :return:        Function doing one visit as a new voter
+    """
+    def visit():
+        client = Client()
+        client.get(reverse('scorecard:index'))
+        client.get(reverse('scorecard:vote', args=(course.pk, 1)), follow=True)
+    return visit
+
+
+def count_session_queries(queries):
+    """
+    :param queries: Queries as recorded by capture_queries or CaptureQueriesContext
+    :return:        Number of queries using the session table
+    """
+    return sum(1 for query in queries if 'django_session' in (query['sql'] if isinstance(query, dict) else query[0]))
+
+
+def unsaved_courses(count):
+    """
+    Courses which only exist in memory, for benchmarks without a database
+    :param count:   Number of courses
+    :return:        List of courses ordered like the index page
+    """
+    now = timezone.now()
+    return [Course(pk=pk, course_title="Course {0}".format(pk), votes=count - pk, lecturer_id=1, modified=now)
+            for pk in range(1, count + 1)]
+
+
+def row_cache(count):
+    """
+    :param count:   Number of rows the cache has to keep
+    :return:        Empty local memory cache for the rows of the index page
+    """
+    cache = LocMemCache('scorecard-benchmark-rows', {'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': count * 2}})
+    cache.clear()
+    return cache
+
+
+def index_renderer(courses, cache=None):
+    """
+    :param courses: Courses shown on one index page
+    :param cache:   Cache for the rows, see fragments.render_rows
+    :return:        Function rendering the index page like IndexView does
+    """
+    request = RequestFactory().get(reverse('scorecard:index'))
+
+    def render():
+        context = {'object_list': courses, 'course_rows': render_rows(courses, cache),
+                   'previous_cursor': None, 'next_cursor': None, 'has_voted': False}
+        return render_to_string('scorecard/index.html', context, RequestContext(request))
+    return render
+
+
+def measure_latencies(func, iterations, warmup=0):
+    """
+    Call func repeatedly and measure every call
+    :param func:        Function to measure
+    :param iterations:  Number of measured calls
+    :param warmup:      Number of calls before measuring, so caches and connections are ready
+    :return:            List of the durations of the measured calls in seconds
+    """
+    for i in range(warmup):
+        func()
+    latencies = []
+    for i in range(iterations):
+        start = default_timer()
+        func()
+        latencies.append(default_timer() - start)
+    return latencies
+
+
+def percentile(values, percent):
+    """
+    :param values:  Measured values
+    :param percent: Percentile between 0 and 100
+    :return:        Smallest value which is greater or equal than percent percent of the values
+    """
+    ordered = sorted(values)
+    rank = int(math.ceil(percent / 100.0 * len(ordered)))
+    return ordered[max(rank - 1, 0)]
+
+
+def summarize(latencies, queries):
+    """
+    :param latencies:   Durations from measure_latencies
+    :param queries:     Number of SQL queries of one call
+    :return:            Dict with the percentiles in milliseconds and the number of queries
+    """
+    summary = dict(('p{0}'.format(p), percentile(latencies, p) * 1000) for p in PERCENTILES)
+    summary['queries'] = queries
+    return summary
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare benchmark results with a baseline
+    Only sizes and scenarios present in both are compared
+    :param results:     Dict size -> scenario -> summary
+    :param baseline:    Results of an earlier run in the same format
+    :param threshold:   Allowed slowdown, 0.25 allows 25% more time
+    :return:            List of messages describing the regressions, empty if there are none
+    """
+    regressions = []
+    for size, scenarios in sorted(results.items()):
+        for name, summary in sorted(scenarios.items()):
+            old = baseline.get(size, {}).get(name)
+            if old is None:
+                continue
+            if summary['queries'] > old['queries']:
+                regressions.append("{0} courses, {1}: {2} queries instead of {3}".format(
+                    size, name, summary['queries'], old['queries']))
+            for key in ('p50', 'p95'):
+                if summary[key] > old[key] * (1 + threshold):
+                    regressions.append("{0} courses, {1}: {2} {3:.2f} ms instead of {4:.2f} ms".format(
+                        size, name, key, summary[key], old[key]))
+    return regressions
+
+
+def mixed_requests(courses, count, write_ratio, seed=0):
+    """
+    Requests of many visitors reading the index and details pages while others vote
+    :param courses:     Courses to show and vote for
+    :param count:       Number of requests
+    :param write_ratio: Share of votes between 0 and 1
+    :param seed:        Seed of the random choices, so every mode gets the same requests
+    :return:            List of (kind, URL, vote) tuples, kind is read or write, vote is 0 for reads
+    """
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        course = rng.choice(courses)
+        if rng.random() < write_ratio:
+            vote = rng.choice((1, -1))
+            requests.append(('write', reverse('scorecard:vote', args=(course.pk, vote)), vote))
+        elif rng.random() < 0.5:
+            requests.append(('read', reverse('scorecard:details', args=(course.pk,)), 0))
+        else:
+            requests.append(('read', reverse('scorecard:index'), 0))
+    return requests
+
+
+def run_mixed_requests(requests, threads):
+    """
+    Send the requests from several threads, each request from a new visitor
+    After every request the connections are closed like at the end of a real request,
+    unless CONN_MAX_AGE keeps them open
+    :param requests:    Requests from mixed_requests
+    :param threads:     Number of threads sending requests at the same time
+    :return:            Tuple of requests per second, dict kind -> list of latencies in seconds,
+                        sum of the counted votes and list of the errors
+    """
+    latencies = {'read': [], 'write': []}
+    counted = []
+    errors = []
+
+    def send(i):
+        kind, url, vote = requests[i]
+        start = default_timer()
+        try:
+            response = Client().get(url)
+            if response.status_code >= 400:
+                errors.append("{0} {1}".format(url, response.status_code))
+            elif vote:
+                counted.append(vote)
+        except Exception as e:
+            errors.append("{0} {1}".format(url, e))
+        finally:
+            latencies[kind].append(default_timer() - start)
+            close_old_connections()
+
+    rate = measure_rate(send, len(requests), threads)
+    return rate, latencies, sum(counted), errors
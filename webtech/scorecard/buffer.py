@@ -0,0 +1,140 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction, connection
+
+from scorecard.models import Course
+
+logger = logging.getLogger(__name__)
+
+
+class VoteBuffer(object):
+    """
+    Write-behind buffer for votes
+    Votes are summed up in memory per course pk and written to the database
+    in one transaction, either periodically or when enough votes are pending
+    """
+
+    def __init__(self, flush_interval=1.0, flush_size=100):
+        """
+        :param flush_interval:  Seconds between two periodic flushes
+        :param flush_size:      Number of pending votes that triggers a flush
+        """
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.lock = threading.Lock()
+        self.pending = defaultdict(int)
+        self.pending_count = 0
+        self.flusher = None
+        self.stopped = threading.Event()
+        self.registered = False
+
+    def add(self, pk, vote):
+        """
+        Remember a vote for the course with primary key pk
+        A flush started because the buffer is full does not raise, if it fails the votes stay pending,
+        so the caller never counts a buffered vote a second time
+        :param pk:      Primary key of the Course
+        :param vote:    Number of votes to add, may be negative
+        :return:
+        """
+        self.start()
+        with self.lock:
+            self.pending[pk] += vote
+            self.pending_count += 1
+            full = self.pending_count >= self.flush_size
+        if full:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing the full vote buffer failed, the votes stay pending")
+
+    def pending_votes(self, pk):
+        """
+        :param pk:  Primary key of the Course
+        :return:    Sum of the votes for the course which are not yet written
+        """
+        with self.lock:
+            return self.pending.get(pk, 0)
+
+    def flush(self):
+        """
+        Write all pending votes in one transaction
+        If writing fails the votes are put back into the buffer and still count towards flush_size
+        :return: Number of courses updated
+        """
+        with self.lock:
+            pending, count = self.pending, self.pending_count
+            self.pending = defaultdict(int)
+            self.pending_count = 0
+        if not any(pending.values()):
+            return 0
+        try:
+            with transaction.atomic():
+                return Course.objects.add_votes(pending)
+        except Exception:
+            with self.lock:
+                for pk, delta in pending.items():
+                    self.pending[pk] += delta
+                # The votes, not the courses, so the next flush comes after the same number of votes
+                self.pending_count += count
+            raise
+
+    def start(self):
+        """
+        Start the thread flushing the buffer periodically
+        The buffer is flushed a last time when the worker shuts down
+        :return:
+        """
+        if self.flusher is not None:
+            return
+        with self.lock:
+            if self.flusher is not None:
+                return
+            self.stopped.clear()
+            self.flusher = threading.Thread(target=self.run, name='vote-buffer-flusher')
+            self.flusher.daemon = True
+            self.flusher.start()
+            if not self.registered:
+                atexit.register(self.stop)
+                self.registered = True
+
+    def run(self):
+        """
+        Main loop of the flushing thread
+        :return:
+        """
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing the vote buffer failed")
+            finally:
+                connection.close()
+
+    def stop(self):
+        """
+        Stop the flushing thread and write the remaining votes
+        :return:
+        """
+        flusher = self.flusher
+        if flusher is not None:
+            self.stopped.set()
+            flusher.join()
+            self.flusher = None
+        self.flush()
+
+
+def is_enabled():
+    """
+    :return: True if votes should be written through the buffer
+    """
+    return getattr(settings, 'SCORECARD_VOTE_BUFFER', False)
+
+
+vote_buffer = VoteBuffer(
+    flush_interval=getattr(settings, 'SCORECARD_VOTE_BUFFER_INTERVAL', 1.0),
+    flush_size=getattr(settings, 'SCORECARD_VOTE_BUFFER_SIZE', 100),
+)
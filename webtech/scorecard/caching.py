@@ -0,0 +1,128 @@
+import threading
+import time
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+def get_interval():
+    """
+    :return: Length in microseconds of the intervals whose changes share one scoreboard version,
+             0 if every change gets a version of its own (SCORECARD_VERSION_INTERVAL in seconds)
+    """
+    return int(getattr(settings, 'SCORECARD_VERSION_INTERVAL', 0) * 1000000)
+
+
+def get_version():
+    """
+    Get the scoreboard version, which changes with every vote and every change of a course or lecturer
+    The version is the time of the last change in microseconds, kept in a Counter row,
+    so every process sees the changes of the others
+    With SCORECARD_VERSION_INTERVAL the stored version is the end of the interval of the last change.
+    Until that interval is over the start of the interval is returned, so a change later in the interval
+    still outdates what was cached in it, at most one interval after the change.
+    :return: Current scoreboard version, 0 if nothing changed yet
+    """
+    # models imports this module
+    from scorecard.models import Counter, VERSION_COUNTER
+    version = Counter.objects.get_value(VERSION_COUNTER)
+    interval = get_interval()
+    if interval:
+        version = min(version, int(time.time() * 1000000) // interval * interval)
+    return version
+
+
+def bump_version():
+    """
+    Change the scoreboard version, so everything cached for the old version is outdated
+    Call it in the transaction of the change, so the new version is committed together with the change
+    With SCORECARD_VERSION_INTERVAL only the first change of an interval writes the Counter row,
+    the clocks of the processes have to agree to well within the interval then
+    :return:
+    """
+    from scorecard.models import Counter, VERSION_COUNTER
+    now = int(time.time() * 1000000)
+    interval = get_interval()
+    if interval:
+        Counter.objects.raise_to(VERSION_COUNTER, (now // interval + 1) * interval)
+    else:
+        Counter.objects.advance(VERSION_COUNTER, now)
+
+
+def version_modified(version):
+    """
+    :param version: Scoreboard version from get_version
+    :return:        Aware datetime in UTC of the change which started the version
+    """
+    return datetime.utcfromtimestamp(version / 1000000.0).replace(tzinfo=timezone.utc)
+
+
+def get_modified():
+    """
+    Get the time the scoreboard version changed the last time
+    :return: Aware datetime in UTC
+    """
+    return version_modified(get_version())
+
+
+class StatisticsCache(object):
+    """
+    Cache for the figures of the statistics page
+    The entries are kept in the cache of the process, the version they belong to comes from the database
+    An entry is valid as long as the scoreboard version did not change,
+    or for SCORECARD_STATISTICS_STALENESS seconds after it was computed
+    """
+    key = 'scorecard:statistics:{0}'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def staleness(self):
+        """
+        :return: Seconds a cached entry may be used after the scoreboard version changed
+        """
+        return getattr(settings, 'SCORECARD_STATISTICS_STALENESS', 0)
+
+    def get(self, compute, variant='', version=None):
+        """
+        Get the statistics from the cache or compute them
+        :param compute: Function computing the statistics
+        :param variant: Name of the way the statistics are computed, each variant is cached separately
+        :param version: Current scoreboard version if it is known already, read with get_version otherwise
+        :return:        Statistics, True if they came from the cache
+        """
+        key = self.key.format(variant)
+        if version is None:
+            version = get_version()
+        entry = cache.get(key)
+        if entry is not None:
+            entry_version, computed, value = entry
+            if entry_version == version or time.time() - computed < self.staleness():
+                with self.lock:
+                    self.hits += 1
+                return value, True
+        with self.lock:
+            self.misses += 1
+        value = compute()
+        cache.set(key, (version, time.time(), value), None)
+        return value, False
+
+    def counters(self):
+        """
+        :return: Dict with the number of hits and misses of this process
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+def is_enabled():
+    """
+    :return: True if the statistics page should be cached
+    """
+    return getattr(settings, 'SCORECARD_STATISTICS_CACHE', True)
+
+
+statistics_cache = StatisticsCache()
@@ -0,0 +1,82 @@
+import csv
+import json
+from collections import OrderedDict
+from django.utils.encoding import force_str
+
+from scorecard.models import Course
+from scorecard.stats import current_votes_sql, get_vote_corrections
+
+EXPORT_CHUNK_SIZE = 2000
+COLUMNS = ('course', 'title', 'votes', 'lecturer', 'first_name', 'last_name')
+
+
+def export_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over all courses with the names of their lecturers, ordered by primary key
+    The lecturers are joined in the same query.
+    SQLite loads the whole result of a query into memory, even with iterator(),
+    so the courses are read in chunks following the primary key and memory stays flat for any number of courses
+    :param chunk_size:  Number of courses per query
+    :return:            Iterator over tuples with the values of COLUMNS
+    """
+    courses = Course.objects.order_by('pk')
+    votes = 'votes'
+    corrections = get_vote_corrections()
+    if corrections:
+        courses = courses.extra(select={'current_votes': current_votes_sql(corrections)})
+        votes = 'current_votes'
+    courses = courses.values_list('pk', 'course_title', votes, 'lecturer', 'lecturer__first_name',
+                                  'lecturer__last_name')
+    chunk = courses
+    while True:
+        rows = list(chunk[:chunk_size].iterator())
+        for row in rows:
+            yield row
+        if len(rows) < chunk_size:
+            return
+        chunk = courses.filter(pk__gt=rows[-1][0])
+
+
+class Echo(object):
+    """
+    File-like object returning what is written, so csv.writer can produce single lines
+    """
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """
+    :param rows:    Rows from export_rows
+    :return:        Iterator over CSV lines, beginning with a header
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow([force_str(value) for value in row])
+
+
+def ndjson_lines(rows):
+    """
+    :param rows:    Rows from export_rows
+    :return:        Iterator over lines with one JSON object per course
+    """
+    for row in rows:
+        yield json.dumps(OrderedDict(zip(COLUMNS, row))) + '\n'
+
+
+# Format name -> function producing the lines, content type
+FORMATS = OrderedDict((
+    ('csv', (csv_lines, 'text/csv; charset=utf-8')),
+    ('ndjson', (ndjson_lines, 'application/x-ndjson')),
+))
+
+
+def export_lines(format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    :param format:      Name of the format in FORMATS
+    :param chunk_size:  Number of courses per query
+    :return:            Iterator over the lines of the export
+    """
+    lines, content_type = FORMATS[format]
+    return lines(export_rows(chunk_size))
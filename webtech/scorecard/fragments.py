@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.urlresolvers import reverse
+from django.template import Context
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+ROW_TEMPLATE = 'scorecard/course_row.html'
+ROW_KEY = 'scorecard:row:{0}:{1}:{2:d}:{3}:{4}'
+# Stands for the primary key while a URL is reversed once for all courses
+PK_PLACEHOLDER = 9876543210
+
+
+def is_enabled():
+    """
+    :return: True if the rendered rows of the index page should be cached
+    """
+    return getattr(settings, 'SCORECARD_FRAGMENT_CACHE', True)
+
+
+def get_fragment_cache():
+    """
+    :return: The template_fragments cache like the cache template tag uses it, the default cache if there is none
+    """
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def row_key(course):
+    """
+    The row of a course changes with its votes, its rank, the voted state and everything changing Course.modified
+    :param course:  Course to show
+    :return:        Cache key of the rendered row
+    """
+    # Cache keys must not contain spaces
+    rank = getattr(course, 'rank_label', '').replace(' ', '')
+    return ROW_KEY.format(course.pk, course.votes, getattr(course, 'has_voted', False), rank,
+                          course.modified.isoformat() if course.modified else '')
+
+
+def url_maker(view, *args):
+    """
+    Reverse the URL of a view once and fill in the primary keys later,
+    reversing the URLs of every course costs more than rendering the rest of its row
+    :param view:    URL name of a view taking the primary key as first argument
+    :param args:    Further arguments of the view
+    :return:        Function getting the primary key and returning the URL
+    """
+    prefix, suffix = reverse(view, args=(PK_PLACEHOLDER,) + args).split(str(PK_PLACEHOLDER))
+    return lambda pk: '{0}{1}{2}'.format(prefix, pk, suffix)
+
+
+def add_urls(courses):
+    """
+    Set details_url, upvote_url and downvote_url of the courses
+    :param courses: Courses of the page
+    :return:
+    """
+    details = url_maker('scorecard:details')
+    upvote = url_maker('scorecard:vote', 1)
+    downvote = url_maker('scorecard:vote', -1)
+    for course in courses:
+        course.details_url = details(course.pk)
+        course.upvote_url = upvote(course.pk)
+        course.downvote_url = downvote(course.pk)
+
+
+def render_rows(courses, cache=None):
+    """
+    Render the rows of the index page
+    All rows are looked up with one cache request, only the missing rows are rendered.
+    The row template does not need the request, so the context processors do not run for every row,
+    and the URLs are reversed once for all rows.
+    :param courses: Courses of the page
+    :param cache:   Cache for the rows, defaults to get_fragment_cache
+    :return:        List of the rendered rows as safe strings
+    """
+    template = get_template(ROW_TEMPLATE)
+    if not is_enabled():
+        add_urls(courses)
+        return [template.render(Context({'course': course})) for course in courses]
+    if cache is None:
+        cache = get_fragment_cache()
+    keys = [row_key(course) for course in courses]
+    rows = cache.get_many(keys)
+    missing = {}
+    missing_courses = [(key, course) for key, course in zip(keys, courses) if key not in rows]
+    add_urls([course for key, course in missing_courses])
+    for key, course in missing_courses:
+        missing[key] = rows[key] = template.render(Context({'course': course}))
+    if missing:
+        cache.set_many(missing, getattr(settings, 'SCORECARD_FRAGMENT_CACHE_TIMEOUT', 300))
+    return [mark_safe(rows[key]) for key in keys]
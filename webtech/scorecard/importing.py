@@ -0,0 +1,289 @@
+import csv
+import io
+from collections import defaultdict
+from contextlib import contextmanager
+from django.db import connection, transaction
+from django.utils import six, timezone
+
+from scorecard import caching
+from scorecard.leaderboard import leaderboard
+from scorecard.models import Course, Counter, Lecturer, LecturerStats, LECTURER_COUNTER, chunks
+
+IMPORT_CHUNK_SIZE = 10000
+# Above this number of changed lecturers rebuilding all statistics is faster than updating them one by one
+REBUILD_STATS_THRESHOLD = 500
+COLUMNS = ('course', 'title', 'first_name', 'last_name', 'votes')
+REQUIRED_COLUMNS = ('title', 'first_name', 'last_name')
+# Rows per UPDATE, every row needs 5 parameters and sqlite allows 999
+UPDATE_ROWS = 190
+MAX_LENGTH = 200
+
+
+class ImportReport(object):
+    """
+    This class counts what an import did
+    lecturers_created   is the number of created lecturers
+    courses_created     is the number of created courses
+    courses_updated     is the number of courses with a changed title or lecturer
+    courses_unchanged   is the number of courses which were already up to date
+    errors              is a list of (line number, message) of the skipped rows
+    """
+    def __init__(self):
+        self.lecturers_created = 0
+        self.courses_created = 0
+        self.courses_updated = 0
+        self.courses_unchanged = 0
+        self.errors = []
+
+    def __str__(self):
+        return "{0} lecturers created, {1} courses created, {2} updated, {3} unchanged, {4} errors".format(
+            self.lecturers_created, self.courses_created, self.courses_updated, self.courses_unchanged,
+            len(self.errors))
+
+
+def read_csv(stream):
+    """
+    Read a CSV file row by row
+    :param stream:  Binary file object with UTF-8 encoded CSV, the first line names the columns
+    :return:        Iterator over (line number, tuple of the texts in the columns of COLUMNS)
+    """
+    if six.PY3:
+        reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    else:
+        reader = csv.reader(stream)
+    header = [column.strip() for column in next(reader, [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError("Missing columns: {0}".format(', '.join(missing)))
+    # Optional columns which are missing are read from the end of the padded row
+    positions = [header.index(column) if column in header else len(header) for column in COLUMNS]
+    padding = [''] * (len(header) + 1)
+    for row in reader:
+        if not row:
+            continue
+        row = row + padding
+        values = tuple(row[position] for position in positions)
+        if not six.PY3:
+            values = tuple(value.decode('utf-8') for value in values)
+        yield reader.line_num, values
+
+
+def parse_row(row):
+    """
+    Check a row and convert its values
+    :param row: Tuple from read_csv
+    :return:    Course pk or None, title, (first name, last name), votes
+    """
+    pk, title, first_name, last_name, votes = [value.strip() for value in row]
+    if not title or not first_name or not last_name:
+        raise ValueError("title, first_name and last_name are required")
+    if len(title) > MAX_LENGTH or len(first_name) > MAX_LENGTH or len(last_name) > MAX_LENGTH:
+        raise ValueError("Values are limited to {0} characters".format(MAX_LENGTH))
+    try:
+        pk = int(pk) if pk else None
+        votes = int(votes) if votes else 0
+    except ValueError:
+        raise ValueError("course and votes have to be numbers")
+    if pk is not None and pk <= 0:
+        raise ValueError("course has to be positive")
+    return pk, title, (first_name, last_name), votes
+
+
+@contextmanager
+def deferred_indexes():
+    """
+    Drop the indexes of the course table and create them again afterwards
+    Building an index once is much faster than updating it for every inserted row,
+    but queries are slow without the indexes, so this is only meant for loading large files
+    :return:
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT name, sql FROM sqlite_master "
+                   "WHERE type = 'index' AND tbl_name = 'scorecard_course' AND sql IS NOT NULL")
+    indexes = cursor.fetchall()
+    for name, sql in indexes:
+        cursor.execute('DROP INDEX "{0}"'.format(name))
+    try:
+        yield
+    finally:
+        for name, sql in indexes:
+            cursor.execute(sql)
+
+
+def add_stats(stats, lecturer, courses, votes):
+    """
+    :param stats:       Dict of lecturer pk -> [courses, votes]
+    :param lecturer:    Primary key of the Lecturer
+    :param courses:     Number of courses to add, negative to remove courses
+    :param votes:       Sum of the votes of these courses
+    :return:
+    """
+    stats[lecturer][0] += courses
+    stats[lecturer][1] += votes
+
+
+class CourseImporter(object):
+    """
+    Import courses in chunks, each chunk in its own transaction
+    Lecturers are found by their name in a map of all lecturers, missing lecturers are created.
+    Rows with the primary key of an existing course update its title and lecturer, the votes are kept.
+    Other rows create new courses.
+    The statistics of the lecturers are corrected when the import ends.
+    """
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.report = ImportReport()
+        self.lecturers = dict(((first_name, last_name), pk)
+                              for pk, first_name, last_name in Lecturer.objects.values_list('pk', 'first_name',
+                                                                                            'last_name'))
+        # Lecturer pk -> [courses, votes] to add to the statistics
+        self.stats = defaultdict(lambda: [0, 0])
+
+    def run(self, rows):
+        """
+        :param rows:    Iterator over (line number, row) like read_csv
+        :return:        ImportReport
+        """
+        try:
+            chunk = []
+            for line, row in rows:
+                try:
+                    chunk.append((line,) + parse_row(row))
+                except ValueError as e:
+                    self.report.errors.append((line, str(e)))
+                if len(chunk) >= self.chunk_size:
+                    self.import_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk)
+        finally:
+            self.update_stats()
+        return self.report
+
+    def import_chunk(self, chunk):
+        """
+        Create the missing lecturers, insert the new courses and update the changed ones
+        :param chunk:   List of (line number, pk, title, name, votes)
+        :return:
+        """
+        # Lecturer pk -> [courses, votes] of this chunk, counted once the chunk is committed
+        stats = defaultdict(lambda: [0, 0])
+        with transaction.atomic():
+            self.create_lecturers(set(name for line, pk, title, name, votes in chunk) - set(self.lecturers))
+            pks = [pk for line, pk, title, name, votes in chunk if pk is not None]
+            stored = {}
+            for pks_chunk in chunks(pks):
+                stored.update((row[0], row[1:]) for row in Course.objects.filter(pk__in=pks_chunk).values_list(
+                    'pk', 'course_title', 'lecturer', 'votes'))
+            seen = set()
+            new = []
+            changed = []
+            for line, pk, title, name, votes in chunk:
+                if pk is not None and pk in seen:
+                    self.report.errors.append((line, "course {0} appears twice".format(pk)))
+                    continue
+                seen.add(pk)
+                lecturer = self.lecturers[name]
+                if pk not in stored:
+                    new.append((pk, title, lecturer, votes))
+                    add_stats(stats, lecturer, 1, votes)
+                elif stored[pk][:2] == (title, lecturer):
+                    self.report.courses_unchanged += 1
+                else:
+                    changed.append((pk, title, lecturer))
+                    add_stats(stats, stored[pk][1], -1, -stored[pk][2])
+                    add_stats(stats, lecturer, 1, stored[pk][2])
+            self.insert_courses(new)
+            self.update_courses(changed)
+        for lecturer, (courses, votes) in stats.items():
+            add_stats(self.stats, lecturer, courses, votes)
+
+    def create_lecturers(self, names):
+        """
+        Create lecturers and add them to the map
+        :param names:   Set of (first name, last name)
+        :return:
+        """
+        if not names:
+            return
+        last = Lecturer.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        Lecturer.objects.bulk_create([Lecturer(first_name=first_name, last_name=last_name)
+                                      for first_name, last_name in sorted(names)])
+        for pk, first_name, last_name in Lecturer.objects.filter(pk__gt=last).values_list('pk', 'first_name',
+                                                                                        'last_name'):
+            self.lecturers[(first_name, last_name)] = pk
+        # bulk_create does not send the signal counting the lecturers
+        Counter.objects.add(LECTURER_COUNTER, len(names))
+        self.report.lecturers_created += len(names)
+
+    def insert_courses(self, courses):
+        """
+        Insert courses without creating model instances
+        :param courses: List of (pk or None, title, lecturer pk, votes)
+        :return:
+        """
+        modified = connection.ops.value_to_db_datetime(timezone.now())
+        cursor = connection.cursor()
+        with_pk = [(pk, title, lecturer, votes, modified) for pk, title, lecturer, votes in courses if pk is not None]
+        if with_pk:
+            cursor.executemany(
+                'INSERT INTO "scorecard_course" ("id", "course_title", "lecturer_id", "votes", "modified") '
+                'VALUES (%s, %s, %s, %s, %s)', with_pk)
+        without_pk = [(title, lecturer, votes, modified) for pk, title, lecturer, votes in courses if pk is None]
+        if without_pk:
+            cursor.executemany(
+                'INSERT INTO "scorecard_course" ("course_title", "lecturer_id", "votes", "modified") '
+                'VALUES (%s, %s, %s, %s)', without_pk)
+        self.report.courses_created += len(courses)
+
+    def update_courses(self, courses):
+        """
+        Update titles and lecturers of many courses with few UPDATE statements
+        :param courses: List of (pk, title, lecturer pk)
+        :return:
+        """
+        modified = connection.ops.value_to_db_datetime(timezone.now())
+        cursor = connection.cursor()
+        for rows in chunks(courses, UPDATE_ROWS):
+            cases = ' '.join(['WHEN %s THEN %s'] * len(rows))
+            params = [value for pk, title, lecturer in rows for value in (pk, title)]
+            params += [value for pk, title, lecturer in rows for value in (pk, lecturer)]
+            params.append(modified)
+            params += [pk for pk, title, lecturer in rows]
+            cursor.execute(
+                'UPDATE "scorecard_course" SET "course_title" = CASE "id" {0} END, "lecturer_id" = CASE "id" {0} END, '
+                '"modified" = %s WHERE "id" IN ({1})'.format(cases, ', '.join(['%s'] * len(rows))), params)
+        self.report.courses_updated += len(courses)
+
+    def update_stats(self):
+        """
+        Move the imported courses into the statistics of their lecturers
+        :return:
+        """
+        changed = [(lecturer, courses, votes) for lecturer, (courses, votes) in self.stats.items() if courses or votes]
+        if len(changed) > REBUILD_STATS_THRESHOLD:
+            LecturerStats.objects.rebuild()
+        else:
+            with transaction.atomic():
+                for lecturer, courses, votes in changed:
+                    LecturerStats.objects.add_courses(lecturer, courses, votes)
+        self.stats.clear()
+        caching.bump_version()
+        leaderboard.reset()
+
+
+def import_courses(stream, chunk_size=IMPORT_CHUNK_SIZE, defer_indexes=False):
+    """
+    Import lecturers and courses from a CSV file
+    The columns are title, first_name and last_name, optional course (primary key) and votes,
+    so a file written by the export can be imported again
+    :param stream:          Binary file object
+    :param chunk_size:      Number of rows per transaction
+    :param defer_indexes:   Build the indexes of the course table after the import, see deferred_indexes
+    :return:                ImportReport
+    """
+    rows = read_csv(stream)
+    if not defer_indexes:
+        return CourseImporter(chunk_size).run(rows)
+    with deferred_indexes():
+        return CourseImporter(chunk_size).run(rows)
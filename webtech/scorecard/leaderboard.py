@@ -0,0 +1,324 @@
+import bisect
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+
+from scorecard import buffer, shards, votelog
+from scorecard.buffer import vote_buffer
+from scorecard.models import Course
+from scorecard.pagination import KeysetPage, make_cursor, parse_cursor
+from scorecard.stats import current_votes_sql
+
+# Free vote values kept below and above the known values, so the tree is rarely rebuilt
+MIN_MARGIN = 64
+
+
+class FenwickTree(object):
+    """
+    Binary indexed tree over a fixed number of slots,
+    prefix sums and updates take O(log size)
+    """
+
+    def __init__(self, counts):
+        """
+        Build the tree in O(size)
+        :param counts: List with the initial count of every slot
+        """
+        self.size = len(counts)
+        self.tree = [0] + list(counts)
+        for index in range(1, self.size + 1):
+            parent = index + (index & -index)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[index]
+
+    def add(self, slot, delta):
+        index = slot + 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, slot):
+        """
+        :param slot:    Slot number, -1 for an empty prefix
+        :return:        Sum of the slots 0 to slot
+        """
+        index = slot + 1
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def search(self, count):
+        """
+        :param count:   Number between 1 and the total count
+        :return:        Smallest slot whose prefix sum is at least count
+        """
+        index = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            if index + step <= self.size and self.tree[index + step] < count:
+                index += step
+                count -= self.tree[index]
+            step >>= 1
+        return index
+
+
+class Leaderboard(object):
+    """
+    All courses ordered by their votes, beginning with the most votes, courses with the same votes by primary key
+    The courses with the same votes are kept in a list sorted by primary key,
+    a Fenwick tree over the vote values counts the courses with more votes,
+    so the rank of a course and the position of a page are found in O(log n) without asking the database.
+    A vote moves the course into the list of the neighbouring vote value.
+    The votes include votes which are not yet written to Course.votes (vote log, shards and buffer).
+    The leaderboard only sees the votes counted by this process, so it is loaded from the database again
+    when it is older than get_max_age and the votes of the other processes show up after a few seconds.
+    It is loaded by the first request using it rather than at startup, because the apps are ready
+    before the migrations ran and in every management command as well.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all courses, they are loaded again when the leaderboard is used the next time
+        :return:
+        """
+        with self.lock:
+            self.loaded = None
+            self.votes = {}
+            self.buckets = {}
+            self.values = []
+            self.low = self.high = 0
+            self.tree = FenwickTree([])
+
+    def load(self, courses):
+        """
+        Replace all courses
+        :param courses: Iterable of (pk, votes)
+        :return:
+        """
+        with self.lock:
+            self.votes = dict(courses)
+            self.buckets = {}
+            for pk, votes in self.votes.items():
+                self.buckets.setdefault(votes, []).append(pk)
+            for bucket in self.buckets.values():
+                bucket.sort()
+            self.values = sorted(self.buckets)
+            self.rebuild_tree(self.values[0] if self.values else 0, self.values[-1] if self.values else 0)
+            self.loaded = time.time()
+
+    def rebuild_tree(self, low, high):
+        """
+        Build the tree for vote values from low to high with some margin
+        The slot of a vote value is high - votes, so the slots begin with the most votes
+        :return:
+        """
+        margin = max(MIN_MARGIN, (high - low) // 2)
+        self.low, self.high = low - margin, high + margin
+        counts = [0] * (self.high - self.low + 1)
+        for votes, bucket in self.buckets.items():
+            counts[self.high - votes] = len(bucket)
+        self.tree = FenwickTree(counts)
+
+    def ensure_loaded(self):
+        """
+        Load all courses from the database if they are not loaded or too old
+        :return:
+        """
+        max_age = get_max_age()
+        with self.lock:
+            if self.loaded is None or max_age is not None and time.time() - self.loaded > max_age:
+                self.load(load_current_votes())
+
+    def insert(self, pk, votes):
+        if votes > self.high or votes < self.low:
+            self.rebuild_tree(min(votes, self.low), max(votes, self.high))
+        bucket = self.buckets.get(votes)
+        if bucket is None:
+            bucket = self.buckets[votes] = []
+            bisect.insort(self.values, votes)
+        bisect.insort(bucket, pk)
+        self.votes[pk] = votes
+        self.tree.add(self.high - votes, 1)
+
+    def remove(self, pk):
+        """
+        Remove a course
+        :param pk:  Primary key of the Course
+        :return:    Votes of the removed course, None if it was not on the leaderboard
+        """
+        with self.lock:
+            votes = self.votes.pop(pk, None)
+            if votes is None:
+                return None
+            bucket = self.buckets[votes]
+            del bucket[bisect.bisect_left(bucket, pk)]
+            if not bucket:
+                del self.buckets[votes]
+                del self.values[bisect.bisect_left(self.values, votes)]
+            self.tree.add(self.high - votes, -1)
+            return votes
+
+    def set(self, pk, votes):
+        """
+        Add a course or change its votes
+        :param pk:      Primary key of the Course
+        :param votes:   Votes of the course
+        :return:
+        """
+        with self.lock:
+            if self.loaded is not None:
+                self.remove(pk)
+                self.insert(pk, votes)
+
+    def add_votes(self, pk, delta):
+        """
+        Count votes for a course, nothing happens if the leaderboard is not loaded
+        :param pk:      Primary key of the Course
+        :param delta:   Votes to add
+        :return:
+        """
+        with self.lock:
+            if self.loaded is not None and pk in self.votes:
+                self.insert(pk, self.remove(pk) + delta)
+
+    def count(self):
+        """
+        :return: Number of courses
+        """
+        with self.lock:
+            return len(self.votes)
+
+    def position(self, votes, pk):
+        """
+        :param votes:   Votes of a position
+        :param pk:      Primary key of a position
+        :return:        Number of courses ordered before (votes, pk)
+        """
+        with self.lock:
+            if votes > self.high:
+                return 0
+            before = self.tree.prefix(min(self.high - votes, self.tree.size) - 1)
+            return before + bisect.bisect_left(self.buckets.get(votes, ()), pk)
+
+    def rank(self, pk):
+        """
+        :param pk:  Primary key of the Course
+        :return:    Rank of the course beginning with 1, None if the course is unknown
+        """
+        with self.lock:
+            votes = self.votes.get(pk)
+            return None if votes is None else self.position(votes, pk) + 1
+
+    def page(self, start, size):
+        """
+        :param start:   Number of courses to skip
+        :param size:    Maximum number of courses
+        :return:        List of (pk, votes) of the courses with rank start + 1 to start + size
+        """
+        with self.lock:
+            if start >= len(self.votes) or size <= 0:
+                return []
+            start = max(start, 0)
+            slot = self.tree.search(start + 1)
+            votes = self.high - slot
+            offset = start - self.tree.prefix(slot - 1)
+            index = bisect.bisect_left(self.values, votes)
+            rows = []
+            while len(rows) < size and index >= 0:
+                votes = self.values[index]
+                bucket = self.buckets[votes]
+                rows.extend((pk, votes) for pk in bucket[offset:offset + size - len(rows)])
+                offset = 0
+                index -= 1
+            return rows
+
+    def top(self, size):
+        return self.page(0, size)
+
+
+def load_current_votes():
+    """
+    Read the votes of all courses including every vote not yet written to Course.votes
+    :return: List of (pk, votes)
+    """
+    corrections = []
+    if votelog.is_enabled():
+        corrections.append(votelog.PENDING_VOTES_SQL)
+    if shards.is_enabled():
+        corrections.append(shards.SHARD_VOTES_SQL)
+    cursor = connection.cursor()
+    cursor.execute('SELECT "scorecard_course"."id", {0} FROM "scorecard_course"'.format(current_votes_sql(corrections)))
+    courses = cursor.fetchall()
+    if buffer.is_enabled():
+        courses = [(pk, votes + vote_buffer.pending_votes(pk)) for pk, votes in courses]
+    return courses
+
+
+def is_enabled():
+    """
+    :return: True if the index page and the ranks should be served from the leaderboard
+    """
+    return getattr(settings, 'SCORECARD_LEADERBOARD', False)
+
+
+def get_max_age():
+    """
+    :return: Seconds the leaderboard is used before it is loaded again (SCORECARD_LEADERBOARD_MAX_AGE),
+             None to never load it again, which is only right with a single process
+    """
+    return getattr(settings, 'SCORECARD_LEADERBOARD_MAX_AGE', 5)
+
+
+def rank_label(rank, count):
+    """
+    :return: Text like #17 of 40,000
+    """
+    return "#{0} of {1:,}".format(rank, count)
+
+
+def get_page(size, after=None, before=None):
+    """
+    Get one page of the index from the leaderboard, with the same cursors as pagination.get_page
+    Every course gets its rank and a rank_label
+    :param size:    Number of courses on a page
+    :param after:   Cursor of the previous page
+    :param before:  Cursor of the next page
+    :return:        KeysetPage
+    """
+    leaderboard.ensure_loaded()
+    with leaderboard.lock:
+        count = leaderboard.count()
+        if before is not None:
+            end = leaderboard.position(*parse_cursor(before))
+            start = max(end - size, 0)
+        elif after is not None:
+            votes, pk = parse_cursor(after)
+            start = leaderboard.position(votes, pk) + (1 if leaderboard.votes.get(pk) == votes else 0)
+            end = start + size
+        else:
+            start, end = 0, size
+        rows = leaderboard.page(start, end - start)
+    courses = Course.objects.in_bulk([pk for pk, votes in rows]) if rows else {}
+    page = []
+    for rank, (pk, votes) in enumerate(rows, start + 1):
+        course = courses.get(pk)
+        if course is not None:
+            course.votes = votes
+            course.rank = rank
+            course.rank_label = rank_label(rank, count)
+            page.append(course)
+    return KeysetPage(
+        page,
+        make_cursor(page[0]) if page and start > 0 else None,
+        make_cursor(page[-1]) if page and start + len(rows) < count else None,
+    )
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,84 @@
+import json
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from scorecard.benchmark import benchmark_database, find_regressions, measure_latencies, scoreboard_scenarios, summarize
+from scorecard.models import Course
+from scorecard.seeding import DISTRIBUTIONS, seed_scorecard
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--sizes', action='store', dest='sizes', default='1000,10000',
+                    help='Comma separated numbers of courses, e.g. 1000,10000,100000,1000000.'),
+        make_option('--iterations', action='store', dest='iterations', type='int', default=100,
+                    help='Number of measured calls per scenario.'),
+        make_option('--warmup', action='store', dest='warmup', type='int', default=10,
+                    help='Number of calls per scenario before measuring.'),
+        make_option('--distribution', action='store', dest='distribution', type='choice',
+                    choices=sorted(DISTRIBUTIONS), default='uniform',
+                    help='Distribution of the votes: {0}.'.format(', '.join(sorted(DISTRIBUTIONS)))),
+        make_option('--scenario', action='append', dest='scenarios', default=None,
+                    help='Only run this scenario, can be given several times.'),
+        make_option('--json', action='store', dest='json', default=None,
+                    help='Write the results as JSON to this file.'),
+        make_option('--baseline', action='store', dest='baseline', default=None,
+                    help='Compare the results with the JSON results of an earlier run.'),
+        make_option('--threshold', action='store', dest='threshold', type='float', default=0.25,
+                    help='Allowed slowdown against the baseline, 0.25 allows 25% more time.'),
+    )
+    help = ('Measures the latency percentiles and SQL queries of the scoreboard functions and pages '
+            'on test databases of different sizes.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of numbers")
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+
+        results = {}
+        for size in sizes:
+            # JSON objects only have string keys
+            results[str(size)] = self.run_size(size, options)
+
+        if options['json']:
+            with open(options['json'], 'w') as json_file:
+                json.dump({'iterations': options['iterations'], 'warmup': options['warmup'],
+                           'distribution': options['distribution'], 'results': results},
+                          json_file, indent=2, sort_keys=True)
+        if baseline is not None:
+            regressions = find_regressions(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError("Regressions against {0}:\n{1}".format(options['baseline'], '\n'.join(regressions)))
+            self.stdout.write("No regressions against {0}".format(options['baseline']))
+
+    def run_size(self, size, options):
+        """
+        Measure all scenarios on a fresh test database
+        :param size:    Number of courses
+        :param options: Options of the command
+        :return:        Dict scenario -> summary
+        """
+        results = {}
+        # The statistics are measured without cache, otherwise only the cache lookup would be measured
+        with benchmark_database(), override_settings(SCORECARD_STATISTICS_CACHE=False):
+            seed_scorecard(max(size // 100, 10), size, options['distribution'])
+            # The course in the middle of the index
+            scenarios = scoreboard_scenarios(Course.objects.order_by('-votes', 'pk')[size // 2])
+            self.stdout.write("{0} courses".format(size))
+            for name, scenario in scenarios:
+                if options['scenarios'] and name not in options['scenarios']:
+                    continue
+                latencies = measure_latencies(scenario, options['iterations'], options['warmup'])
+                with CaptureQueriesContext(connection) as queries:
+                    scenario()
+                results[name] = summary = summarize(latencies, len(queries))
+                self.stdout.write("  {0:<32} p50 {1[p50]:>8.2f} ms  p95 {1[p95]:>8.2f} ms  p99 {1[p99]:>8.2f} ms  "
+                                  "{1[queries]:>3} queries".format(name, summary))
+        return results
@@ -0,0 +1,37 @@
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from scorecard.benchmark import (SESSION_MODES, benchmark_database, count_session_queries, create_courses,
+                                 measure_latencies, summarize, voter_visit)
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--visits', action='store', dest='visits', type='int', default=200,
+                    help='Number of measured voter visits per mode.'),
+        make_option('--warmup', action='store', dest='warmup', type='int', default=10,
+                    help='Number of visits per mode before measuring.'),
+        make_option('--courses', action='store', dest='courses', type='int', default=1000,
+                    help='Number of courses on the test database.'),
+        make_option('--vote-log', action='store_true', dest='vote_log', default=False,
+                    help='Log the votes, which needs a session for every voter.'),
+    )
+    help = ('Compares anonymous voter visits (index page, vote, index page with message) '
+            'with sessions and messages in the database and with cache sessions and cookie messages.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            course = create_courses(options['courses'])[0]
+            visit = voter_visit(course)
+            for name, mode_settings in SESSION_MODES.items():
+                with override_settings(SCORECARD_VOTE_LOG=options['vote_log'], **mode_settings):
+                    latencies = measure_latencies(visit, options['visits'], options['warmup'])
+                    with CaptureQueriesContext(connection) as queries:
+                        visit()
+                summary = summarize(latencies, len(queries))
+                self.stdout.write("{0:<10} {1:>7.0f} visits/s  p50 {p50:.2f} ms  p95 {p95:.2f} ms  "
+                                  "{queries} queries, {2} on django_session".format(
+                                      name + ':', len(latencies) / sum(latencies),
+                                      count_session_queries(queries.captured_queries), **summary))
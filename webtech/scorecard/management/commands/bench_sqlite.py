@@ -0,0 +1,76 @@
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.models import Sum
+from django.test.utils import override_settings
+
+from scorecard.benchmark import (SQLITE_MODES, benchmark_database, create_courses, mixed_requests, percentile,
+                                 run_mixed_requests)
+from scorecard.models import Course
+from scorecard.sqlite import get_pragma
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--requests', action='store', dest='requests', type='int', default=2000,
+                    help='Number of requests per mode.'),
+        make_option('--threads', action='store', dest='threads', type='int', default=8,
+                    help='Number of threads sending requests at the same time.'),
+        make_option('--write-ratio', action='store', dest='write_ratio', type='float', default=0.2,
+                    help='Share of votes among the requests.'),
+        make_option('--courses', action='store', dest='courses', type='int', default=100,
+                    help='Number of courses on the test database.'),
+    )
+    help = ('Compares a mixed read/write load from several threads on the default SQLite setup and on the '
+            'production profile (WAL, tuned PRAGMAs, persistent connections, retried votes).')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            courses = create_courses(options['courses'])
+            requests = mixed_requests(courses, options['requests'], options['write_ratio'])
+            conn_max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+            try:
+                for name, (mode_settings, max_age, journal_mode) in SQLITE_MODES.items():
+                    with override_settings(**mode_settings):
+                        self.prepare(max_age, journal_mode)
+                        before = Course.objects.aggregate(Sum('votes'))['votes__sum']
+                        rate, latencies, counted, errors = run_mixed_requests(requests, options['threads'])
+                        self.report(name, rate, latencies, errors)
+                        self.check_votes(name, before + counted)
+            finally:
+                connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+    def prepare(self, max_age, journal_mode):
+        """
+        Reconnect with the settings of a mode, the journal mode is stored in the database file
+        :param max_age:         CONN_MAX_AGE of the mode
+        :param journal_mode:    Journal mode of the mode
+        :return:
+        """
+        for conn in connections.all():
+            conn.close()
+        # All connections share the settings dict of the default database
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connection.cursor().execute('PRAGMA journal_mode = {0}'.format(journal_mode))
+
+    def report(self, name, rate, latencies, errors):
+        parts = ["{0:<11} {1:>6.0f} requests/s".format(name + ':', rate), get_pragma('journal_mode')]
+        for kind in ('read', 'write'):
+            if latencies[kind]:
+                parts.append("{0} p50 {1:.1f} ms p99 {2:.1f} ms".format(
+                    kind, percentile(latencies[kind], 50) * 1000, percentile(latencies[kind], 99) * 1000))
+        parts.append("{0} errors".format(len(errors)))
+        self.stdout.write('  '.join(parts))
+        for error in sorted(set(errors))[:5]:
+            self.stderr.write("  {0}".format(error))
+
+    def check_votes(self, mode, expected):
+        """
+        Make sure every counted vote was stored and no failed vote was
+        :param mode:        Name of the benchmarked mode
+        :param expected:    Expected sum of all votes
+        :return:
+        """
+        total = Course.objects.aggregate(Sum('votes'))['votes__sum']
+        if total != expected:
+            self.stderr.write("{0}: expected {1} votes, got {2}".format(mode, expected, total))
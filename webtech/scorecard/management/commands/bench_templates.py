@@ -0,0 +1,54 @@
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from scorecard.benchmark import index_renderer, measure_latencies, row_cache, summarize, unsaved_courses
+
+UNCACHED_LOADERS = (
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+)
+
+# The loaders of the production settings
+CACHED_LOADERS = (
+    ('django.template.loaders.cached.Loader', UNCACHED_LOADERS),
+)
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--sizes', action='store', dest='sizes', default='1000,10000,100000',
+                    help='Comma separated numbers of courses on the rendered page.'),
+        make_option('--iterations', action='store', dest='iterations', type='int', default=5,
+                    help='Number of measured renders per size and mode.'),
+    )
+    help = ('Measures rendering the index page with all courses on one page: without the cached template loader, '
+            'with it, and with the row fragments cached (cold and warm). No database is needed.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of numbers")
+        for size in sizes:
+            courses = unsaved_courses(size)
+            cache = row_cache(size)
+            modes = (
+                ('uncached loader', {'TEMPLATE_LOADERS': UNCACHED_LOADERS, 'SCORECARD_FRAGMENT_CACHE': False},
+                 None, 1),
+                ('cached loader', {'TEMPLATE_LOADERS': CACHED_LOADERS, 'SCORECARD_FRAGMENT_CACHE': False}, None, 1),
+                # Every render starts with an empty cache
+                ('fragments cold', {'TEMPLATE_LOADERS': CACHED_LOADERS}, cache.clear, 0),
+                ('fragments warm', {'TEMPLATE_LOADERS': CACHED_LOADERS}, None, 1),
+            )
+            for name, mode_settings, prepare, warmup in modes:
+                with override_settings(**mode_settings):
+                    render = index_renderer(courses, cache)
+
+                    def measured():
+                        if prepare is not None:
+                            prepare()
+                        render()
+                    summary = summarize(measure_latencies(measured, options['iterations'], warmup), 0)
+                self.stdout.write("{0:>7} courses, {1:<16} p50 {p50:9.1f} ms  p95 {p95:9.1f} ms".format(
+                    size, name + ':', **summary))
@@ -0,0 +1,66 @@
+import random
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.test.utils import override_settings
+
+from scorecard import shards
+from scorecard.benchmark import benchmark_database, create_courses, measure_rate
+from scorecard.buffer import vote_buffer
+from scorecard.models import Course
+from scorecard.views import update_vote
+
+MODES = (
+    ('synchronous', {}, None),
+    ('buffered', {'SCORECARD_VOTE_BUFFER': True}, vote_buffer.stop),
+    ('sharded', {'SCORECARD_SHARDED_VOTES': True}, shards.fold_shards),
+)
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--votes', action='store', dest='votes', type='int', default=5000,
+                    help='Number of votes per mode.'),
+        make_option('--courses', action='store', dest='courses', type='int', default=100,
+                    help='Number of courses to vote on.'),
+        make_option('--threads', action='store', dest='threads', type='int', default=1,
+                    help='Number of threads voting at the same time.'),
+        make_option('--hot', action='store_true', dest='hot', default=False,
+                    help='All threads vote on the same course.'),
+    )
+    help = 'Compares votes per second of the synchronous, buffered and sharded vote path on a test database.'
+
+    def handle(self, *args, **options):
+        count = options['votes']
+        rates = []
+        with benchmark_database():
+            courses = create_courses(options['courses'])
+            if options['hot']:
+                courses = courses[:1]
+            choices = [(random.choice(courses), random.choice((1, -1))) for i in range(count)]
+            delta = sum(v for c, v in choices)
+            expected = Course.objects.aggregate(Sum('votes'))['votes__sum']
+
+            def vote(i):
+                update_vote(*choices[i])
+
+            for name, mode_settings, finish in MODES:
+                with override_settings(**mode_settings):
+                    rates.append((name, measure_rate(vote, count, options['threads'], finish)))
+                expected += delta
+                self.check_votes(name, expected)
+
+        sync_rate = rates[0][1]
+        for name, rate in rates:
+            self.stdout.write("{0:<12} {1:>8.0f} votes/s ({2:.1f}x)".format(name + ':', rate, rate / sync_rate))
+
+    def check_votes(self, mode, expected):
+        """
+        Make sure no vote got lost during the benchmark
+        :param mode:        Name of the benchmarked mode
+        :param expected:    Expected sum of all votes
+        :return:
+        """
+        total = Course.objects.aggregate(Sum('votes'))['votes__sum']
+        if total != expected:
+            self.stderr.write("{0}: lost votes, expected {1}, got {2}".format(mode, expected, total))
@@ -0,0 +1,27 @@
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand
+
+from scorecard import shards
+from scorecard.votelog import compact_votes
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--interval', action='store', dest='interval', type='float', default=0,
+                    help='Keep running and compact every INTERVAL seconds.'),
+    )
+    help = 'Folds unprocessed votes of the vote log and votes counted in shards into Course.votes.'
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        verbosity = int(options['verbosity'])
+        while True:
+            compacted = compact_votes()
+            folded = shards.fold_shards()
+            if verbosity >= 1:
+                self.stdout.write("Compacted {0} votes".format(compacted))
+                self.stdout.write("Folded shards of {0} courses".format(folded))
+            if not interval:
+                break
+            time.sleep(interval)
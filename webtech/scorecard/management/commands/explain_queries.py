@@ -0,0 +1,75 @@
+import re
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from scorecard.benchmark import (benchmark_database, capture_queries, create_courses, explain_query,
+                                 scoreboard_scenarios)
+
+# Only these statements have a plan worth looking at
+EXPLAINED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+
+# A scan in the order of an index
+INDEX_SCAN = re.compile(r'\bUSING (COVERING )?INDEX\b')
+
+
+def is_suspicious(step, tables):
+    """
+    A scan along an index, like the first page of the index ordered by the (votes DESC, id) index, is fine
+    :param step:    Step of an SQLite query plan
+    :param tables:  Names of the tables in the database
+    :return:        True if the step reads a whole table without an index, or sorts in a temporary b-tree
+    """
+    words = step.split()
+    if words[0] == 'SCAN' and len(words) > 1:
+        # Older SQLite versions write SCAN TABLE name, subqueries and constant rows are no tables
+        scanned = words[2] if words[1] == 'TABLE' and len(words) > 2 else words[1]
+        return scanned in tables and INDEX_SCAN.search(step) is None
+    return 'USE TEMP B-TREE' in step
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--courses', action='store', dest='courses', type='int', default=10000,
+                    help='Number of courses in the test database.'),
+        make_option('--lecturers', action='store', dest='lecturers', type='int', default=100,
+                    help='Number of lecturers in the test database.'),
+    )
+    help = 'Prints the SQLite query plan of every query issued by the scorecard views on a test database.'
+
+    def handle(self, *args, **options):
+        suspicious = 0
+        with benchmark_database(), override_settings(SCORECARD_STATISTICS_CACHE=False):
+            courses = create_courses(options['courses'], options['lecturers'])
+            tables = connection.introspection.table_names()
+            course = courses[len(courses) // 2]
+            scenarios = scoreboard_scenarios(course)
+            statistics = dict(scenarios)['statistics']
+            scenarios.append(('statistics with counters', self.with_counters(statistics)))
+            for name, scenario in scenarios:
+                with capture_queries() as queries:
+                    scenario()
+                self.stdout.write("== {0} ({1} queries)".format(name, len(queries)))
+                for sql, params in queries:
+                    if not sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+                        continue
+                    self.stdout.write(sql if not params else "{0} -- {1!r}".format(sql, tuple(params)))
+                    for step in explain_query(sql, params):
+                        if is_suspicious(step, tables):
+                            suspicious += 1
+                            self.stdout.write("  !! {0}".format(step))
+                        else:
+                            self.stdout.write("     {0}".format(step))
+                self.stdout.write("")
+        self.stdout.write("{0} steps scan a table without an index or sort in a temporary b-tree".format(suspicious))
+
+    def with_counters(self, scenario):
+        """
+        :param scenario:    Function requesting a page
+        :return:            Function requesting the page with SCORECARD_STATISTICS_COUNTERS enabled
+        """
+        def run():
+            with override_settings(SCORECARD_STATISTICS_COUNTERS=True):
+                return scenario()
+        return run
@@ -0,0 +1,25 @@
+from optparse import make_option
+from django.core.management.base import BaseCommand
+
+from scorecard.export import EXPORT_CHUNK_SIZE, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--format', action='store', dest='format', type='choice', choices=list(FORMATS),
+                    default='csv', help='Format of the export: {0}.'.format(', '.join(FORMATS))),
+        make_option('--output', action='store', dest='output', default=None,
+                    help='File to write the export to, defaults to stdout.'),
+        make_option('--chunk-size', action='store', dest='chunk_size', type='int', default=EXPORT_CHUNK_SIZE,
+                    help='Number of courses read per query.'),
+    )
+    help = 'Exports all courses with their lecturers and votes as CSV or NDJSON.'
+
+    def handle(self, *args, **options):
+        lines = export_lines(options['format'], options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+        else:
+            with open(options['output'], 'w') as output:
+                output.writelines(lines)
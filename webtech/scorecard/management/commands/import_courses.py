@@ -0,0 +1,33 @@
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+
+from scorecard.importing import IMPORT_CHUNK_SIZE, import_courses
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--chunk-size', action='store', dest='chunk_size', type='int', default=IMPORT_CHUNK_SIZE,
+                    help='Number of rows imported per transaction.'),
+        make_option('--defer-indexes', action='store_true', dest='defer_indexes', default=False,
+                    help='Build the indexes of the course table after the import. Much faster for large files, '
+                         'but queries of the running site are slow until the import is done.'),
+    )
+    args = '<file.csv>'
+    help = ('Imports lecturers and courses from a CSV file with the columns title, first_name, last_name '
+            'and optionally course and votes. Rows with the primary key of an existing course update it.')
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Expected exactly one CSV file")
+        if options['chunk_size'] <= 0:
+            raise CommandError("--chunk-size must be positive")
+        start = time.time()
+        with open(args[0], 'rb') as stream:
+            try:
+                report = import_courses(stream, options['chunk_size'], options['defer_indexes'])
+            except ValueError as e:
+                raise CommandError(str(e))
+        for line, message in report.errors:
+            self.stderr.write("line {0}: {1}".format(line, message))
+        self.stdout.write("{0} in {1:.1f} s".format(report, time.time() - start))
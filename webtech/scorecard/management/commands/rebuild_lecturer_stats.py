@@ -0,0 +1,34 @@
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from scorecard.models import Counter, Lecturer, LecturerStats, LECTURER_COUNTER
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--check', action='store_true', dest='check', default=False,
+                    help='Only compare the statistics with the courses, do not rebuild them.'),
+    )
+    help = 'Rebuilds the lecturer statistics and counters and checks them against the live aggregate.'
+
+    def handle(self, *args, **options):
+        verbosity = int(options['verbosity'])
+        if not options['check']:
+            with transaction.atomic():
+                rebuilt = LecturerStats.objects.rebuild()
+                Counter.objects.rebuild()
+            if verbosity >= 1:
+                self.stdout.write("Rebuilt statistics of {0} lecturers".format(rebuilt))
+        differences = LecturerStats.objects.differences()
+        for lecturer, stored, live in differences:
+            self.stderr.write("Lecturer {0}: stored (courses, votes) {1}, live {2}".format(lecturer, stored, live))
+        lecturer_count = Counter.objects.filter(name=LECTURER_COUNTER).values_list('value', flat=True).first()
+        live_lecturer_count = Lecturer.objects.count()
+        if lecturer_count != live_lecturer_count:
+            self.stderr.write("Lecturer counter: stored {0}, live {1}".format(lecturer_count, live_lecturer_count))
+            differences.append(LECTURER_COUNTER)
+        if differences:
+            raise CommandError("{0} statistics differ from the live aggregate".format(len(differences)))
+        if verbosity >= 1:
+            self.stdout.write("Statistics match the courses")
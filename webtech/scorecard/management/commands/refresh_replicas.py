@@ -0,0 +1,38 @@
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from scorecard.routers import get_replicas
+from scorecard.sqlite import copy_database
+
+
+class Command(BaseCommand):
+    args = '[replica ...]'
+    option_list = BaseCommand.option_list + (
+        make_option('--interval', action='store', dest='interval', type='float', default=0,
+                    help='Keep running and refresh every INTERVAL seconds.'),
+    )
+    help = ('Replaces the SQLite replicas (all of SCORECARD_REPLICAS if none are given) with a copy of the '
+            'primary database, a stand-in for replication while developing.')
+
+    def handle(self, *args, **options):
+        aliases = args or get_replicas()
+        if not aliases:
+            raise CommandError("No replicas configured, set SCORECARD_REPLICAS or use webtech.settings_replica")
+        for alias in aliases:
+            if alias == DEFAULT_DB_ALIAS or alias not in connections.databases:
+                raise CommandError("'{0}' is not a replica".format(alias))
+            if connections[alias].vendor != 'sqlite' or connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+                raise CommandError("Only SQLite databases can be copied, '{0}' needs real replication".format(alias))
+        interval = options['interval']
+        verbosity = int(options['verbosity'])
+        while True:
+            for alias in aliases:
+                connections[alias].close()
+                size = copy_database(connections[alias].settings_dict['NAME'], connections[DEFAULT_DB_ALIAS])
+                if verbosity >= 1:
+                    self.stdout.write("Refreshed {0} ({1} bytes)".format(alias, size))
+            if not interval:
+                break
+            time.sleep(interval)
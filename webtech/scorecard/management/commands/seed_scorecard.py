@@ -0,0 +1,44 @@
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+
+from scorecard.seeding import DISTRIBUTIONS, SEED_CHUNK_SIZE, clear_scorecard, seed_scorecard
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--lecturers', action='store', dest='lecturers', type='int', default=1000,
+                    help='Number of lecturers to create.'),
+        make_option('--courses', action='store', dest='courses', type='int', default=100000,
+                    help='Number of courses to create.'),
+        make_option('--distribution', action='store', dest='distribution', type='choice',
+                    choices=sorted(DISTRIBUTIONS), default='uniform',
+                    help='Distribution of the votes: {0}.'.format(', '.join(sorted(DISTRIBUTIONS)))),
+        make_option('--seed', action='store', dest='seed', type='int', default=0,
+                    help='Seed of the random numbers, the same seed creates the same data.'),
+        make_option('--chunk-size', action='store', dest='chunk_size', type='int', default=SEED_CHUNK_SIZE,
+                    help='Number of rows inserted per transaction.'),
+        make_option('--clear', action='store_true', dest='clear', default=False,
+                    help='Delete all lecturers, courses and votes first.'),
+    )
+    help = 'Fills the database with synthetic lecturers and courses for load tests.'
+
+    def handle(self, *args, **options):
+        if options['courses'] > 0 and options['lecturers'] <= 0:
+            raise CommandError("Courses need at least one lecturer")
+        if options['chunk_size'] <= 0:
+            raise CommandError("--chunk-size must be positive")
+        verbosity = int(options['verbosity'])
+        start = time.time()
+        if options['clear']:
+            clear_scorecard()
+
+        def progress(model, count):
+            if verbosity > 1:
+                self.stdout.write("{0}: {1}".format(model.__name__, count))
+
+        seed_scorecard(options['lecturers'], options['courses'], options['distribution'], options['seed'],
+                       options['chunk_size'], progress)
+        if verbosity > 0:
+            self.stdout.write("Created {0} lecturers and {1} courses in {2:.1f} s".format(
+                options['lecturers'], options['courses'], time.time() - start))
@@ -0,0 +1,184 @@
+import bisect
+import threading
+from collections import OrderedDict
+from timeit import default_timer
+from django.db.backends.utils import CursorWrapper
+
+from scorecard.caching import statistics_cache
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNRESOLVED = 'unresolved'
+
+# Upper bounds of the histogram buckets, the last bucket (+Inf) is added automatically
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help, buckets)
+HISTOGRAMS = OrderedDict([
+    ('scorecard_request_duration_seconds', ("Wall time of the requests", SECONDS_BUCKETS)),
+    ('scorecard_request_db_duration_seconds', ("Time spent in SQL queries per request", SECONDS_BUCKETS)),
+    ('scorecard_request_queries', ("SQL queries per request", QUERY_BUCKETS)),
+    ('scorecard_response_size_bytes', ("Size of the response bodies, streamed responses are not measured",
+                                       BYTES_BUCKETS)),
+])
+
+
+class Histogram(object):
+    """
+    Histogram with fixed buckets as used by Prometheus
+    Every bucket counts the values up to its bound, the buckets are only summed up for the output
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        :return: List of (upper bound, number of values up to the bound), the last bound is +Inf
+        """
+        bounds = [format_value(bound) for bound in self.buckets] + ['+Inf']
+        total = 0
+        result = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class QueryTimer(threading.local):
+    """
+    Number and duration of the SQL queries of the current thread
+    """
+    count = 0
+    duration = 0.0
+
+    def reset(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+query_timer = QueryTimer()
+
+
+def timed(execute):
+    """
+    Wrap a cursor method, so its calls are counted by query_timer
+    """
+    def timed_execute(self, *args, **kwargs):
+        start = default_timer()
+        try:
+            return execute(self, *args, **kwargs)
+        finally:
+            query_timer.duration += default_timer() - start
+            query_timer.count += 1
+    timed_execute.timed = True
+    return timed_execute
+
+
+def install_query_timer():
+    """
+    Count all queries of all database connections, even if DEBUG is off and connection.queries is empty
+    :return:
+    """
+    for name in ('execute', 'executemany'):
+        execute = getattr(CursorWrapper, name)
+        if not getattr(execute, 'timed', False):
+            setattr(CursorWrapper, name, timed(execute))
+
+
+class Metrics(object):
+    """
+    Histograms of the requests of this process per view
+    Every process has its own metrics, so a deployment with several processes has to scrape each of them
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = dict((name, {}) for name in HISTOGRAMS)
+            self.responses = {}
+
+    def observe(self, view, status, duration, db_duration, queries, size):
+        """
+        Record one request
+        :param view:        URL name of the view like scorecard:index
+        :param status:      Status code of the response
+        :param duration:    Wall time in seconds
+        :param db_duration: Time spent in SQL queries in seconds
+        :param queries:     Number of SQL queries
+        :param size:        Size of the response body in bytes, None if it is not known
+        :return:
+        """
+        values = zip(HISTOGRAMS, (duration, db_duration, queries, size))
+        with self.lock:
+            for name, value in values:
+                if value is None:
+                    continue
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = self.histograms[name][view] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+            key = (view, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self):
+        """
+        :return: All metrics in the Prometheus text format
+        """
+        lines = []
+        with self.lock:
+            for name in HISTOGRAMS:
+                lines.append('# HELP {0} {1}'.format(name, HISTOGRAMS[name][0]))
+                lines.append('# TYPE {0} histogram'.format(name))
+                for view, histogram in sorted(self.histograms[name].items()):
+                    label = 'view="{0}"'.format(escape_label(view))
+                    for bound, count in histogram.cumulative():
+                        lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(name, label, bound, count))
+                    lines.append('{0}_sum{{{1}}} {2}'.format(name, label, format_value(histogram.sum)))
+                    lines.append('{0}_count{{{1}}} {2}'.format(name, label, histogram.count))
+            lines.append('# HELP scorecard_responses_total Responses per view and status code')
+            lines.append('# TYPE scorecard_responses_total counter')
+            for (view, status), count in sorted(self.responses.items()):
+                lines.append('scorecard_responses_total{{view="{0}",status="{1}"}} {2}'.format(
+                    escape_label(view), status, count))
+        for name, value in sorted(statistics_cache.counters().items()):
+            lines.append('# TYPE scorecard_statistics_cache_{0}_total counter'.format(name))
+            lines.append('scorecard_statistics_cache_{0}_total {1}'.format(name, value))
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    """
+    :return: Number without a trailing .0 for whole numbers, like Prometheus writes it
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return repr(value)
+
+
+def get_view_name(request):
+    """
+    :param request:
+    :return:        URL name of the view like scorecard:index, the view path if the URL has no name
+    """
+    match = getattr(request, 'resolver_match', None)
+    return UNRESOLVED if match is None else match.view_name
+
+
+metrics = Metrics()
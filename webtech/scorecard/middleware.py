@@ -0,0 +1,49 @@
+from timeit import default_timer
+
+from scorecard.metrics import get_view_name, install_query_timer, metrics, query_timer
+from scorecard.routers import PIN_COOKIE_NAME, PIN_COOKIE_SALT, get_pin_seconds, get_replicas, primary_pin
+
+
+class MetricsMiddleware(object):
+    """
+    Record wall time, time in SQL queries, number of queries and response size of every request per view
+    Should be the first middleware, so the time of the other middlewares is included
+    The queries are counted by a thin wrapper around the cursors, which costs a few microseconds per query
+    """
+
+    def __init__(self):
+        install_query_timer()
+
+    def process_request(self, request):
+        request.metrics_start = default_timer()
+        query_timer.reset()
+
+    def process_response(self, request, response):
+        start = getattr(request, 'metrics_start', None)
+        if start is None:
+            # An earlier middleware answered before process_request was called
+            return response
+        size = None if response.streaming else len(response.content)
+        metrics.observe(get_view_name(request), response.status_code, default_timer() - start,
+                        query_timer.duration, query_timer.count, size)
+        return response
+
+
+class PrimaryPinMiddleware(object):
+    """
+    Read from the primary database for a while after a visitor wrote to it, like after a vote
+    The time of the last write is kept in a signed cookie, so the sessions stay out of the database
+    Should come before the session middleware, so saving a session counts as a write
+    """
+
+    def process_request(self, request):
+        pinned = request.get_signed_cookie(PIN_COOKIE_NAME, default=None, salt=PIN_COOKIE_SALT,
+                                           max_age=get_pin_seconds()) is not None
+        primary_pin.reset(pinned)
+
+    def process_response(self, request, response):
+        if primary_pin.wrote and get_replicas():
+            response.set_signed_cookie(PIN_COOKIE_NAME, '1', salt=PIN_COOKIE_SALT, max_age=get_pin_seconds(),
+                                       httponly=True)
+        primary_pin.reset()
+        return response
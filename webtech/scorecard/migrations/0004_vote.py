@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scorecard', '0003_auto_20150329_1649'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('delta', models.SmallIntegerField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('session_key', models.CharField(max_length=40, blank=True)),
+                ('processed', models.BooleanField(default=False, db_index=True)),
+                ('course', models.ForeignKey(to='scorecard.Course')),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+    ]
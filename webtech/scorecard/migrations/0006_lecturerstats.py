@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.db.models import Count, Sum
+
+
+def build_lecturer_stats(apps, schema_editor):
+    """
+    Compute the statistics of the existing courses
+    """
+    Course = apps.get_model('scorecard', 'Course')
+    LecturerStats = apps.get_model('scorecard', 'LecturerStats')
+    rows = Course.objects.values('lecturer').annotate(course_count=Count('id'), vote_sum=Sum('votes')).order_by()
+    LecturerStats.objects.bulk_create([
+        LecturerStats(lecturer_id=row['lecturer'], course_count=row['course_count'], vote_sum=row['vote_sum'],
+                      mean=float(row['vote_sum']) / row['course_count'])
+        for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scorecard', '0005_courseshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LecturerStats',
+            fields=[
+                ('lecturer', models.OneToOneField(related_name='stats', primary_key=True, serialize=False, to='scorecard.Lecturer')),
+                ('course_count', models.IntegerField(default=0)),
+                ('vote_sum', models.IntegerField(default=0)),
+                ('mean', models.FloatField(null=True, db_index=True)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.RunPython(build_lecturer_stats, lambda apps, schema_editor: None),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+def count_lecturers(apps, schema_editor):
+    """
+    Start the lecturer counter with the existing lecturers
+    """
+    Counter = apps.get_model('scorecard', 'Counter')
+    Lecturer = apps.get_model('scorecard', 'Lecturer')
+    Counter.objects.create(name='lecturers', value=Lecturer.objects.count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scorecard', '0006_lecturerstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('name', models.CharField(max_length=50, serialize=False, primary_key=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.RunPython(count_lecturers, lambda apps, schema_editor: None),
+    ]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+# Indexes with a descending column, which index_together cannot declare
+SORTED_INDEXES = (
+    # The index page and its keyset pagination read the courses ordered by (votes DESC, id)
+    ('scorecard_course_votes_id', 'scorecard_course', '"votes" DESC, "id"'),
+    # The best lecturer is the first row ordered by (mean DESC, lecturer_id)
+    ('scorecard_lecturerstats_mean_lecturer', 'scorecard_lecturerstats', '"mean" DESC, "lecturer_id"'),
+)
+
+
+def create_sorted_indexes(apps, schema_editor):
+    for name, table, columns in SORTED_INDEXES:
+        schema_editor.execute('CREATE INDEX "{0}" ON "{1}" ({2})'.format(name, table, columns))
+
+
+def drop_sorted_indexes(apps, schema_editor):
+    for name, table, columns in SORTED_INDEXES:
+        schema_editor.execute('DROP INDEX "{0}"'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scorecard', '0007_counter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='lecturer',
+            field=models.ForeignKey(to='scorecard.Lecturer', db_index=False),
+            preserve_default=True,
+        ),
+        migrations.AlterField(
+            model_name='lecturerstats',
+            name='mean',
+            field=models.FloatField(null=True),
+            preserve_default=True,
+        ),
+        migrations.AlterIndexTogether(
+            name='course',
+            index_together=set([('lecturer', 'votes')]),
+        ),
+        migrations.RunPython(create_sorted_indexes, drop_sorted_indexes),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.utils.timezone
+
+
+def create_votes_index(apps, schema_editor):
+    # SQLite copies the table to add or remove a column and loses the index created in 0008
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "scorecard_course_votes_id" ON "scorecard_course" ("votes" DESC, "id")')
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scorecard', '0008_indexes'),
+    ]
+
+    operations = [
+        # Runs last when the migration is reversed
+        migrations.RunPython(noop, create_votes_index),
+        migrations.AddField(
+            model_name='course',
+            name='modified',
+            field=models.DateTimeField(default=django.utils.timezone.now, auto_now=True),
+            preserve_default=False,
+        ),
+        migrations.RunPython(create_votes_index, noop),
+    ]
@@ -1,4 +1,41 @@
-from django.db import models
+from collections import defaultdict
+from django.db import connections, models, router, transaction, IntegrityError
+from django.db.models import F, Count, Sum
+from django.utils import timezone
+
+from scorecard import caching
+
+# Keep the number of parameters per UPDATE below the limit of sqlite
+UPDATE_CHUNK_SIZE = 500
+
+# Name of the Counter counting the lecturers
+LECTURER_COUNTER = 'lecturers'
+# Name of the Counter holding the scoreboard version, see caching.get_version
+VERSION_COUNTER = 'scoreboard_version'
+
+
+def chunks(items, size=UPDATE_CHUNK_SIZE):
+    """
+    Split a list into chunks
+    :param items:   List to split
+    :param size:    Maximum length of a chunk
+    :return:        Iterator over the chunks
+    """
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def group_by_delta(deltas):
+    """
+    Group primary keys getting the same delta, so they can share one UPDATE statement
+    :param deltas:  Dict of pk -> delta
+    :return:        List of (delta, pks) tuples with at most UPDATE_CHUNK_SIZE pks each
+    """
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(pk)
+    return [(delta, chunk) for delta, pks in by_delta.items() for chunk in chunks(pks)]
 
 
 class Lecturer(models.Model):
@@ -19,17 +56,51 @@ class Lecturer(models.Model):
         return "{0} {1}".format(self.first_name, self.last_name)
 
 
+class CourseQuerySet(models.QuerySet):
+
+    def add_votes(self, deltas):
+        """
+        Add votes to many courses at once
+        Courses getting the same number of votes share one UPDATE statement
+        The statistics of the lecturers are updated as well
+        The scoreboard version changes as well, so call it in the transaction of the whole change,
+        like a flush of the vote buffer or a compaction of the vote log
+        :param deltas:  Dict of course pk -> votes to add
+        :return:        Number of courses updated
+        """
+        updated = 0
+        for delta, pks in group_by_delta(deltas):
+            updated += self.filter(pk__in=pks).update(votes=F('votes') + delta, modified=timezone.now())
+        lecturer_deltas = defaultdict(int)
+        for pks in chunks([pk for pk, delta in deltas.items() if delta]):
+            for pk, lecturer in Course.objects.filter(pk__in=pks).values_list('pk', 'lecturer'):
+                lecturer_deltas[lecturer] += deltas[pk]
+        LecturerStats.objects.add_votes(lecturer_deltas)
+        caching.bump_version()
+        return updated
+
+
 class Course(models.Model):
     """
     This class stores the information about one course
     course_title    is the field which stores the title of a course
     vote            is the number of votes a course got
     lecturer        refers to the Lecturer model and identifies the lecturer responsible for the course
+    modified        is the time the course, its votes or its lecturer changed the last time
     pk              is created automatically as the primary key
     """
     course_title = models.CharField(max_length=200)
     votes = models.IntegerField(default=0)
-    lecturer = models.ForeignKey(Lecturer)
+    modified = models.DateTimeField(auto_now=True)
+    # Lookups by lecturer use the (lecturer, votes) index
+    lecturer = models.ForeignKey(Lecturer, db_index=False)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        # The (votes DESC, id) index for the index page is created in migration 0008
+        # SQLite drops it whenever a migration copies the table, so such migrations have to create it again
+        index_together = [('lecturer', 'votes')]
 
     def __str__(self):
         """
@@ -44,4 +115,251 @@ class Course(models.Model):
         Great courses have more than 100 positive votes
         :return: True if votes > 100, Fales otherwise
         """
-        return self.votes > 100
\ No newline at end of file
+        return self.votes > 100
+
+
+class Vote(models.Model):
+    """
+    This class stores one vote as an append-only event
+    course          refers to the Course the vote was given for
+    delta           is 1 for an up-vote and -1 for a down-vote
+    created         is the time the vote was given
+    session_key     identifies the session of the voter
+    processed       is True once the vote is compacted into Course.votes
+    pk              is created automatically as the primary key
+    """
+    course = models.ForeignKey(Course)
+    delta = models.SmallIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+    session_key = models.CharField(max_length=40, blank=True)
+    processed = models.BooleanField(default=False, db_index=True)
+
+    def __str__(self):
+        """
+        Convert a Vote to a human readable string
+        :return: Returns the delta and the course
+        """
+        return "{0:+d} for {1}".format(self.delta, self.course_id)
+
+
+class CourseShard(models.Model):
+    """
+    This class stores one shard of the vote counter of a hot course
+    Votes for a sharded course are spread over several rows, so they do not all wait for the same row lock
+    course          refers to the Course the shard belongs to
+    shard           is the number of the shard
+    votes           is the number of votes counted in this shard, on top of Course.votes
+    pk              is created automatically as the primary key
+    """
+    course = models.ForeignKey(Course)
+    shard = models.PositiveSmallIntegerField()
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('course', 'shard')
+
+    def __str__(self):
+        """
+        Convert a CourseShard to a human readable string
+        :return: Returns the course and the number of the shard
+        """
+        return "{0} #{1}".format(self.course_id, self.shard)
+
+
+class LecturerStatsQuerySet(models.QuerySet):
+
+    def add_votes(self, deltas):
+        """
+        Add votes to the statistics of many lecturers at once
+        :param deltas:  Dict of lecturer pk -> votes to add
+        :return:
+        """
+        for delta, pks in group_by_delta(deltas):
+            self.filter(lecturer__in=pks).update(
+                vote_sum=F('vote_sum') + delta,
+                mean=(F('vote_sum') + delta) * 1.0 / F('course_count'))
+
+    def add_courses(self, lecturer_pk, courses, votes):
+        """
+        Add or remove courses of a lecturer
+        :param lecturer_pk: Primary key of the Lecturer
+        :param courses:     Number of courses to add, negative to remove courses
+        :param votes:       Sum of the votes of these courses, negative if courses are removed
+        :return:
+        """
+        stats = self.filter(lecturer=lecturer_pk)
+        if not stats.update(course_count=F('course_count') + courses, vote_sum=F('vote_sum') + votes):
+            if courses <= 0:
+                # The lecturer is being deleted with its courses
+                return
+            try:
+                with transaction.atomic():
+                    self.create(lecturer_id=lecturer_pk, course_count=courses, vote_sum=votes,
+                                mean=float(votes) / courses)
+                return
+            except IntegrityError:
+                # Another process created the statistics in the meantime
+                stats.update(course_count=F('course_count') + courses, vote_sum=F('vote_sum') + votes)
+        stats.filter(course_count__gt=0).update(mean=F('vote_sum') * 1.0 / F('course_count'))
+        stats.filter(course_count__lte=0).update(mean=None)
+
+    def best(self):
+        """
+        :return: Statistics of the lecturer with the highest mean votes, None if there are no courses
+        """
+        return self.filter(mean__isnull=False).select_related('lecturer').order_by('-mean', 'lecturer').first()
+
+    def live(self):
+        """
+        Compute the statistics of all lecturers from the courses
+        :return: Dict of lecturer pk -> (course_count, vote_sum)
+        """
+        rows = Course.objects.values('lecturer').annotate(course_count=Count('id'), vote_sum=Sum('votes')).order_by()
+        return dict((row['lecturer'], (row['course_count'], row['vote_sum'])) for row in rows)
+
+    def rebuild(self):
+        """
+        Replace all statistics with statistics computed from the courses
+        :return: Number of lecturers with statistics
+        """
+        live = self.live()
+        self.all().delete()
+        self.bulk_create([
+            LecturerStats(lecturer_id=lecturer, course_count=course_count, vote_sum=vote_sum,
+                          mean=float(vote_sum) / course_count)
+            for lecturer, (course_count, vote_sum) in live.items()])
+        return len(live)
+
+    def differences(self):
+        """
+        Compare the statistics with statistics computed from the courses
+        :return: List of (lecturer pk, stored (course_count, vote_sum), live (course_count, vote_sum))
+        """
+        live = self.live()
+        stored = dict((stats.lecturer_id, (stats.course_count, stats.vote_sum))
+                      for stats in self.filter(course_count__gt=0))
+        return [(lecturer, stored.get(lecturer), live.get(lecturer))
+                for lecturer in sorted(set(live) | set(stored))
+                if stored.get(lecturer) != live.get(lecturer)]
+
+
+class LecturerStats(models.Model):
+    """
+    This class stores the vote statistics of one lecturer
+    It is updated on every vote and every change of a course, so the best lecturer can be looked up in the index
+    lecturer        refers to the Lecturer the statistics belong to
+    course_count    is the number of courses of the lecturer
+    vote_sum        is the sum of the votes of these courses
+    mean            is the mean votes of these courses, None if the lecturer has no courses
+    """
+    lecturer = models.OneToOneField(Lecturer, primary_key=True, related_name='stats')
+    course_count = models.IntegerField(default=0)
+    vote_sum = models.IntegerField(default=0)
+    # The (mean DESC, lecturer) index for the best lecturer is created in migration 0008
+    mean = models.FloatField(null=True)
+
+    objects = LecturerStatsQuerySet.as_manager()
+
+    def __str__(self):
+        """
+        Convert LecturerStats to a human readable string
+        :return: Returns the lecturer and the mean
+        """
+        return "{0}: {1}".format(self.lecturer_id, self.mean)
+
+
+class CounterQuerySet(models.QuerySet):
+
+    def add(self, name, value):
+        """
+        Add to a counter, creating it if necessary
+        :param name:    Name of the counter
+        :param value:   Value to add, may be negative
+        :return:
+        """
+        counter = self.filter(name=name)
+        if counter.update(value=F('value') + value):
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, value=value)
+        except IntegrityError:
+            # Another process created the counter in the meantime
+            counter.update(value=F('value') + value)
+
+    def advance(self, name, value):
+        """
+        Set a counter to value, or to one more than its current value if that is not smaller, in one UPDATE
+        So the counter never goes back, even if the clocks of two processes differ
+        :param name:    Name of the counter
+        :param value:   New value
+        :return:
+        """
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        cursor = connection.cursor()
+        cursor.execute('UPDATE {0} SET {1} = CASE WHEN {1} < %s THEN %s ELSE {1} + 1 END WHERE {2} = %s'.format(
+            quote(self.model._meta.db_table), quote('value'), quote('name')), [value, value, name])
+        if cursor.rowcount:
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, value=value)
+        except IntegrityError:
+            # Another process created the counter in the meantime
+            self.advance(name, value)
+
+    def raise_to(self, name, value):
+        """
+        Set a counter to value if it is smaller, creating it if necessary
+        Unlike advance nothing is written if the counter is at value already,
+        so many processes raising it to the same value write the row only once
+        :param name:    Name of the counter
+        :param value:   New value
+        :return:
+        """
+        counter = self.filter(name=name)
+        if counter.filter(value__gte=value).exists():
+            return
+        if counter.filter(value__lt=value).update(value=value) or counter.exists():
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, value=value)
+        except IntegrityError:
+            # Another process created the counter in the meantime
+            self.raise_to(name, value)
+
+    def get_value(self, name):
+        """
+        :param name:    Name of the counter
+        :return:        Value of the counter, 0 if it does not exist
+        """
+        return self.filter(name=name).values_list('value', flat=True).first() or 0
+
+    def rebuild(self):
+        """
+        Set all counters counting rows to the number of rows they count
+        :return:
+        """
+        self.filter(name=LECTURER_COUNTER).delete()
+        self.create(name=LECTURER_COUNTER, value=Lecturer.objects.count())
+
+
+class Counter(models.Model):
+    """
+    This class stores a counter which is maintained instead of counting rows
+    name            is the name of the counter and the primary key
+    value           is the current value of the counter
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    objects = CounterQuerySet.as_manager()
+
+    def __str__(self):
+        """
+        Convert a Counter to a human readable string
+        :return: Returns name and value
+        """
+        return "{0}: {1}".format(self.name, self.value)
@@ -0,0 +1,89 @@
+import re
+from collections import namedtuple
+from django.db.models import Q
+from django.http import Http404
+
+from scorecard.stats import current_votes_sql
+
+CURSOR_RE = re.compile(r'^(-?\d+)_(\d+)$')
+
+
+class KeysetPage(namedtuple('KeysetPage', ['courses', 'previous_cursor', 'next_cursor'])):
+    """
+    This class stores one page of courses ordered by their votes
+    courses             is the list of courses on the page
+    previous_cursor     is the cursor for the previous page, None on the first page
+    next_cursor         is the cursor for the next page, None on the last page
+    """
+    __slots__ = ()
+
+
+def make_cursor(course):
+    """
+    :param course:  Course at the border of a page
+    :return:        Cursor string with the votes and primary key of the course
+    """
+    return '{0}_{1}'.format(course.votes, course.pk)
+
+
+def parse_cursor(cursor):
+    """
+    :param cursor:  Cursor string from make_cursor
+    :return:        votes, primary key
+    """
+    match = CURSOR_RE.match(cursor)
+    if match is None:
+        raise Http404("Invalid cursor")
+    return int(match.group(1)), int(match.group(2))
+
+
+def get_page(courses, size, after=None, before=None, corrections=()):
+    """
+    Get one page of courses ordered by their votes, beginning with the course with most votes
+    Courses with the same votes are ordered by their primary key, so the order is stable
+    The page is selected by the votes and primary key of the last course of the previous page (after)
+    or the first course of the next page (before), so every page costs the same and no OFFSET is needed.
+    Votes for courses on other pages do not shift the pages.
+    :param courses:     Course QuerySet
+    :param size:        Number of courses on a page
+    :param after:       Cursor of the previous page
+    :param before:      Cursor of the next page
+    :param corrections: SQL subqueries from get_vote_corrections
+    :return:            KeysetPage
+    """
+    backward = before is not None
+    cursor = before if backward else after
+    if corrections:
+        votes_sql = current_votes_sql(corrections)
+        courses = courses.extra(select={'current_votes': votes_sql})
+        if cursor is not None:
+            votes, pk = parse_cursor(cursor)
+            condition = '({0} {1}= %s AND ({0} {1} %s OR "scorecard_course"."id" {2} %s))'.format(
+                votes_sql, '>' if backward else '<', '<' if backward else '>')
+            courses = courses.extra(where=[condition], params=[votes, votes, pk])
+        ordering = ('current_votes', '-pk') if backward else ('-current_votes', 'pk')
+    else:
+        if cursor is not None:
+            votes, pk = parse_cursor(cursor)
+            # The outer range lets the (votes DESC, id) index seek to the cursor instead of scanning
+            if backward:
+                courses = courses.filter(Q(votes__gte=votes), Q(votes__gt=votes) | Q(pk__lt=pk))
+            else:
+                courses = courses.filter(Q(votes__lte=votes), Q(votes__lt=votes) | Q(pk__gt=pk))
+        ordering = ('votes', '-pk') if backward else ('-votes', 'pk')
+    # One course more than needed tells if there is another page
+    rows = list(courses.order_by(*ordering)[:size + 1])
+    more = len(rows) > size
+    rows = rows[:size]
+    if backward:
+        rows.reverse()
+    if corrections:
+        for course in rows:
+            course.votes = course.current_votes
+    has_previous = more if backward else cursor is not None
+    has_next = cursor is not None if backward else more
+    return KeysetPage(
+        rows,
+        make_cursor(rows[0]) if rows and has_previous else None,
+        make_cursor(rows[-1]) if rows and has_next else None,
+    )
@@ -0,0 +1,71 @@
+import random
+import threading
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE_NAME = 'scorecard_primary'
+PIN_COOKIE_SALT = 'scorecard.routers'
+
+
+class PrimaryPin(threading.local):
+    """
+    Whether the reads of the current thread have to go to the primary database
+    pinned is set for the requests of a visitor who wrote shortly before, wrote as soon as this thread writes
+    """
+    pinned = False
+    wrote = False
+
+    def reset(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+    def uses_primary(self):
+        return self.pinned or self.wrote
+
+
+primary_pin = PrimaryPin()
+
+
+def get_replicas():
+    """
+    :return: Aliases of the read replicas from SCORECARD_REPLICAS, empty if everything is read from the primary
+    """
+    return getattr(settings, 'SCORECARD_REPLICAS', ())
+
+
+def is_replica(alias):
+    return alias in get_replicas()
+
+
+def get_pin_seconds():
+    """
+    :return: Seconds a visitor reads from the primary after writing, should cover the lag of the replicas
+    """
+    return getattr(settings, 'SCORECARD_PRIMARY_PIN_SECONDS', 30)
+
+
+class ReplicaRouter(object):
+    """
+    Send reads to a randomly chosen replica and writes to the primary (the default database)
+    Reads stay on the primary while this thread is in a transaction of the primary, after it wrote,
+    and for the requests of a visitor who wrote a short while ago (see PrimaryPinMiddleware),
+    so everybody sees the own votes even if the replicas are behind.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if not replicas or primary_pin.uses_primary() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        primary_pin.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, model):
+        # A replica gets the tables with the copy of the primary
+        return not is_replica(db)
@@ -0,0 +1,107 @@
+import random
+from django.db import connection, transaction
+
+from scorecard import caching
+from scorecard.leaderboard import leaderboard
+from scorecard.models import Course, Counter, Lecturer, LecturerStats
+
+SEED_CHUNK_SIZE = 10000
+# Votes of a Zipf distributed course are capped, so a rare huge value still fits into Course.votes
+MAX_ZIPF_VOTES = 10 ** 6
+# Tables of the scorecard app in the order they can be emptied
+SCORECARD_TABLES = ('scorecard_vote', 'scorecard_courseshard', 'scorecard_course', 'scorecard_lecturerstats',
+                    'scorecard_lecturer', 'scorecard_counter')
+
+
+def uniform_votes(rng):
+    """
+    :param rng: random.Random to draw from
+    :return:    Votes between -100 and 200, all equally likely
+    """
+    return rng.randint(-100, 200)
+
+
+def zipf_votes(rng):
+    """
+    :param rng: random.Random to draw from
+    :return:    Votes following a power law, most courses get a few votes and some get very many
+    """
+    return min(int(rng.paretovariate(1.2)) - 1, MAX_ZIPF_VOTES)
+
+
+def normal_votes(rng):
+    """
+    :param rng: random.Random to draw from
+    :return:    Votes around 50 with a standard deviation of 50
+    """
+    return int(round(rng.gauss(50, 50)))
+
+
+DISTRIBUTIONS = {
+    'uniform': uniform_votes,
+    'zipf': zipf_votes,
+    'normal': normal_votes,
+}
+
+
+def bulk_insert(model, count, make, chunk_size=SEED_CHUNK_SIZE, progress=None):
+    """
+    Insert rows in chunks, every chunk in its own transaction
+    :param model:       Model of the rows
+    :param count:       Number of rows
+    :param make:        Function getting the number of a row and returning the unsaved instance
+    :param chunk_size:  Number of rows per chunk
+    :param progress:    Function called with the number of rows inserted so far after every chunk
+    :return:
+    """
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        with transaction.atomic():
+            model.objects.bulk_create([make(i) for i in range(start, stop)])
+        if progress is not None:
+            progress(stop)
+
+
+def clear_scorecard():
+    """
+    Delete all scorecard data without loading it or sending signals
+    :return:
+    """
+    cursor = connection.cursor()
+    with transaction.atomic():
+        for table in SCORECARD_TABLES:
+            cursor.execute('DELETE FROM "{0}"'.format(table))
+    caching.bump_version()
+    leaderboard.reset()
+
+
+def seed_scorecard(lecturer_count, course_count, distribution='uniform', seed=0, chunk_size=SEED_CHUNK_SIZE,
+                   progress=None):
+    """
+    Create lecturers and courses with synthetic votes
+    The same seed creates the same lecturers and courses, the courses refer to the lecturers
+    by their position, so only the primary keys depend on the data already in the database
+    :param lecturer_count:  Number of lecturers
+    :param course_count:    Number of courses, each gets a random lecturer
+    :param distribution:    Name of the vote distribution in DISTRIBUTIONS
+    :param seed:            Seed of the random numbers
+    :param chunk_size:      Number of rows inserted per transaction
+    :param progress:        Function called with the model and the number of rows inserted so far
+    :return:
+    """
+    draw_votes = DISTRIBUTIONS[distribution]
+    rng = random.Random(seed)
+    first_new = (Lecturer.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+    bulk_insert(Lecturer, lecturer_count,
+                lambda i: Lecturer(first_name="First {0}".format(i), last_name="Last {0}".format(i)),
+                chunk_size, progress and (lambda n: progress(Lecturer, n)))
+    lecturers = list(Lecturer.objects.filter(pk__gte=first_new).order_by('pk').values_list('pk', flat=True))
+    bulk_insert(Course, course_count,
+                lambda i: Course(course_title="Course {0}".format(i), votes=draw_votes(rng),
+                                 lecturer_id=lecturers[rng.randrange(len(lecturers))]),
+                chunk_size, progress and (lambda n: progress(Course, n)))
+    # bulk_create does not send the signals maintaining the statistics
+    LecturerStats.objects.rebuild()
+    Counter.objects.rebuild()
+    caching.bump_version()
+    leaderboard.reset()
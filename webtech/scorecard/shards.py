@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import F, Sum
+
+from scorecard.models import Course, CourseShard, chunks
+
+# Votes of a course which are counted in its shards
+SHARD_VOTES_SQL = (
+    'SELECT COALESCE(SUM("scorecard_courseshard"."votes"), 0) FROM "scorecard_courseshard" '
+    'WHERE "scorecard_courseshard"."course_id" = "scorecard_course"."id"'
+)
+
+
+class VoteRate(object):
+    """
+    Counts the votes per course within the current time window of this process
+    """
+
+    def __init__(self, window=1.0):
+        """
+        :param window: Length of the time window in seconds
+        """
+        self.window = float(window)
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.counts = {}
+        self.last_counts = {}
+
+    def count(self, pk):
+        """
+        Count a vote for the course with primary key pk
+        :param pk:  Primary key of the Course
+        :return:    Votes per second of the course in the last complete window
+        """
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.window:
+                elapsed = now - self.window_start
+                # A window without any vote in between means the old rates are outdated
+                self.last_counts = self.counts if elapsed < 2 * self.window else {}
+                self.counts = {}
+                self.window_start = now
+            self.counts[pk] = self.counts.get(pk, 0) + 1
+            return max(self.last_counts.get(pk, 0), self.counts[pk]) / self.window
+
+
+vote_rate = VoteRate()
+
+
+def is_enabled():
+    """
+    :return: True if votes may be counted in shards
+    """
+    return getattr(settings, 'SCORECARD_SHARDED_VOTES', False)
+
+
+def shard_count():
+    """
+    :return: Number of shards a course is split into
+    """
+    return getattr(settings, 'SCORECARD_VOTE_SHARDS', 8)
+
+
+def is_hot(course_pk):
+    """
+    Count a vote and decide if it should go to a shard
+    Without a threshold every course is sharded,
+    otherwise only courses getting at least SCORECARD_SHARD_RATE_THRESHOLD votes per second
+    :param course_pk:   Primary key of the Course
+    :return:            True if the vote should go to a shard
+    """
+    threshold = getattr(settings, 'SCORECARD_SHARD_RATE_THRESHOLD', None)
+    if threshold is None:
+        return True
+    return vote_rate.count(course_pk) >= threshold
+
+
+def add_vote(course_pk, vote):
+    """
+    Count a vote in a randomly chosen shard of the course
+    :param course_pk:   Primary key of the Course
+    :param vote:        1 or -1 depending on up/down-vote
+    :return:
+    """
+    shard = random.randrange(shard_count())
+    shards = CourseShard.objects.filter(course_id=course_pk, shard=shard)
+    if shards.update(votes=F('votes') + vote):
+        return
+    try:
+        with transaction.atomic():
+            CourseShard.objects.create(course_id=course_pk, shard=shard, votes=vote)
+    except IntegrityError:
+        # Another vote created the shard in the meantime
+        shards.update(votes=F('votes') + vote)
+
+
+def shard_votes(course_pk):
+    """
+    :param course_pk:   Primary key of the Course
+    :return:            Sum of the votes counted in the shards of the course
+    """
+    votes = CourseShard.objects.filter(course_id=course_pk).aggregate(Sum('votes'))['votes__sum']
+    return votes or 0
+
+
+def fold_shards():
+    """
+    Move the votes counted in shards into Course.votes
+    :return: Number of courses updated
+    """
+    with transaction.atomic():
+        shards = list(CourseShard.objects.select_for_update().exclude(votes=0).values_list('id', 'course', 'votes'))
+        deltas = {}
+        for shard_id, course_pk, votes in shards:
+            deltas[course_pk] = deltas.get(course_pk, 0) + votes
+        updated = Course.objects.add_votes(deltas)
+        ids = [shard_id for shard_id, course_pk, votes in shards]
+        for chunk in chunks(ids):
+            CourseShard.objects.filter(id__in=chunk).update(votes=0)
+        return updated
@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from scorecard import caching
+from scorecard.leaderboard import leaderboard
+from scorecard.models import Course, Counter, Lecturer, LecturerStats, LECTURER_COUNTER
+
+
+@receiver(pre_save, sender=Course)
+def remember_stored_course(sender, instance, **kwargs):
+    """
+    Remember lecturer and votes of a course before it is saved,
+    so the statistics of a former lecturer can be corrected
+    """
+    instance._stored = None
+    if instance.pk is not None:
+        instance._stored = Course.objects.filter(pk=instance.pk).values_list('lecturer', 'votes').first()
+
+
+@receiver(post_save, sender=Course)
+def update_stats_on_save(sender, instance, **kwargs):
+    """
+    Move a created or changed course into the statistics of its lecturer
+    """
+    votes = instance.votes
+    if not isinstance(votes, int):
+        # Votes were saved as an expression like F('votes') + 1
+        votes = Course.objects.values_list('votes', flat=True).get(pk=instance.pk)
+    caching.bump_version()
+    stored = getattr(instance, '_stored', None)
+    if stored is None:
+        leaderboard.set(instance.pk, votes)
+    else:
+        # The leaderboard may include votes which are not in Course.votes yet
+        leaderboard.add_votes(instance.pk, votes - stored[1])
+    if stored == (instance.lecturer_id, votes):
+        return
+    with transaction.atomic():
+        if stored is not None:
+            LecturerStats.objects.add_courses(stored[0], -1, -stored[1])
+        LecturerStats.objects.add_courses(instance.lecturer_id, 1, votes)
+
+
+@receiver(post_delete, sender=Course)
+def update_stats_on_delete(sender, instance, **kwargs):
+    """
+    Remove a deleted course from the statistics of its lecturer
+    """
+    caching.bump_version()
+    leaderboard.remove(instance.pk)
+    LecturerStats.objects.add_courses(instance.lecturer_id, -1, -instance.votes)
+
+
+@receiver(post_save, sender=Lecturer)
+def count_created_lecturer(sender, instance, created, **kwargs):
+    """
+    Count a new lecturer
+    """
+    caching.bump_version()
+    if created:
+        Counter.objects.add(LECTURER_COUNTER, 1)
+
+
+@receiver(post_save, sender=Lecturer)
+def touch_courses_of_lecturer(sender, instance, created, **kwargs):
+    """
+    The pages of the courses show the lecturer, so they change with the lecturer
+    """
+    if not created:
+        Course.objects.filter(lecturer=instance).update(modified=timezone.now())
+
+
+@receiver(post_delete, sender=Lecturer)
+def count_deleted_lecturer(sender, instance, **kwargs):
+    """
+    Stop counting a deleted lecturer
+    """
+    caching.bump_version()
+    Counter.objects.add(LECTURER_COUNTER, -1)
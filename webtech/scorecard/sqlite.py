@@ -0,0 +1,121 @@
+import os
+import random
+import time
+from collections import OrderedDict
+from functools import wraps
+from django.conf import settings
+from django.db import OperationalError, connection
+
+from scorecard.routers import is_replica
+
+# Applied to every new connection in this order, see configure_connection
+TUNED_PRAGMAS = OrderedDict([
+    # Wait for a lock instead of failing at once, set first so switching to WAL waits as well
+    ('busy_timeout', 5000),
+    # Readers do not block the writer and the writer does not block readers
+    ('journal_mode', 'WAL'),
+    # With WAL only a checkpoint has to reach the disk, a power loss may lose the last commits but never corrupts
+    ('synchronous', 'NORMAL'),
+    # Negative values are KiB, 20 MB of pages per connection
+    ('cache_size', -20000),
+    # Read the database through a memory map of up to 256 MB instead of read() calls
+    ('mmap_size', 256 * 1024 * 1024),
+])
+
+
+def is_enabled():
+    """
+    :return: True if the tuned PRAGMAs should be set on every SQLite connection
+    """
+    return getattr(settings, 'SCORECARD_SQLITE_TUNING', False)
+
+
+def get_pragmas():
+    """
+    :return: OrderedDict of the PRAGMAs, TUNED_PRAGMAS with the values of SCORECARD_SQLITE_PRAGMAS
+    """
+    pragmas = OrderedDict(TUNED_PRAGMAS)
+    pragmas.update(getattr(settings, 'SCORECARD_SQLITE_PRAGMAS', {}))
+    return pragmas
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Handler of connection_created setting the PRAGMAs on a new SQLite connection
+    With CONN_MAX_AGE the connection is reused by many requests, so this runs once per connection and not per request
+    Connections to a replica are read-only and keep the journal mode of the copy, see copy_database
+    :param sender:      Class of the database wrapper
+    :param connection:  New connection
+    :return:
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_pragmas() if is_enabled() else OrderedDict()
+    if is_replica(connection.alias):
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 1
+    cursor = connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute('PRAGMA {0} = {1}'.format(name, value))
+
+
+def get_pragma(name, using=None):
+    """
+    :param name:    Name of a PRAGMA like journal_mode
+    :param using:   Database connection, the default connection if None
+    :return:        Current value on the connection
+    """
+    cursor = (using or connection).cursor()
+    cursor.execute('PRAGMA {0}'.format(name))
+    return cursor.fetchone()[0]
+
+
+def copy_database(target, using=None):
+    """
+    Write a consistent copy of a SQLite database to a file while other connections keep writing to it
+    VACUUM INTO (SQLite 3.27) copies one snapshot into a new file in rollback journal mode,
+    which then replaces the target at once. Connections to the target which are already open
+    keep reading the old file until they are closed.
+    :param target:  Path of the copy
+    :param using:   Connection of the database to copy, the default connection if None
+    :return:        Size of the copy in bytes
+    """
+    partial = target + '.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+    (using or connection).cursor().execute('VACUUM INTO %s', [partial])
+    os.rename(partial, target)
+    return os.path.getsize(target)
+
+
+def is_locked_error(error):
+    """
+    :param error:   Exception raised by the database
+    :return:        True if another connection held the lock for longer than the busy timeout
+    """
+    return isinstance(error, OperationalError) and 'locked' in str(error)
+
+
+def retry_on_lock(func):
+    """
+    Run a write transaction again if the database is locked, waiting longer before each attempt
+    Only a function opening its own transaction is retried, in an outer transaction the error is raised,
+    because the outer transaction is broken and has to be rolled back as a whole.
+    SCORECARD_SQLITE_RETRIES limits the attempts after the first one (default 4),
+    SCORECARD_SQLITE_RETRY_DELAY is the wait before the first retry in seconds (default 0.01),
+    it doubles with every retry and is randomized, so the waiting writers do not collide again.
+    :param func:    Function doing one write transaction
+    :return:        Function retrying func
+    """
+    @wraps(func)
+    def retrying(*args, **kwargs):
+        retries = 0 if connection.in_atomic_block else getattr(settings, 'SCORECARD_SQLITE_RETRIES', 4)
+        delay = getattr(settings, 'SCORECARD_SQLITE_RETRY_DELAY', 0.01)
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                if attempt == retries or not is_locked_error(e):
+                    raise
+            time.sleep(delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+    return retrying
@@ -0,0 +1,116 @@
+from collections import namedtuple
+from django.conf import settings
+from django.db import connections, router
+
+from scorecard import shards, votelog
+from scorecard.models import Course, Lecturer, LECTURER_COUNTER
+
+
+class Statistics(namedtuple('Statistics', ['lecturer_count', 'courses_count', 'courses_votes_mean',
+                                           'lecturer_best', 'lecturer_best_votes_mean'])):
+    """
+    This class stores the figures of the statistics page
+    lecturer_count              is the number of lecturers
+    courses_count               is the number of courses
+    courses_votes_mean          is the mean votes of all courses, None if there are no courses
+    lecturer_best               is the Lecturer with the highest mean votes, None if there are no courses
+    lecturer_best_votes_mean    is the mean votes of the courses of the best lecturer
+    """
+    __slots__ = ()
+
+
+def get_vote_corrections():
+    """
+    Get the SQL subqueries for the votes of a course which are stored outside of Course.votes
+    :return: List of SQL subqueries, empty if Course.votes is complete
+    """
+    corrections = []
+    if votelog.include_pending():
+        corrections.append(votelog.PENDING_VOTES_SQL)
+    if shards.is_enabled():
+        corrections.append(shards.SHARD_VOTES_SQL)
+    return corrections
+
+
+def current_votes_sql(corrections):
+    """
+    :param corrections: SQL subqueries from get_vote_corrections
+    :return:            SQL expression for the votes of a course including the corrections
+    """
+    return ' + '.join(['"scorecard_course"."votes"'] + ['({0})'.format(sql) for sql in corrections])
+
+
+def use_counters():
+    """
+    :return: True if maintained counters should be used instead of counting all rows
+    """
+    return getattr(settings, 'SCORECARD_STATISTICS_COUNTERS', False)
+
+
+def get_variant():
+    """
+    :return: Name of the way get_statistics computes the figures with the current settings
+    """
+    parts = ['counters' if use_counters() else 'rows']
+    if votelog.include_pending():
+        parts.append('pending')
+    if shards.is_enabled():
+        parts.append('shards')
+    return '-'.join(parts)
+
+
+def statistics_sql(counters, corrections):
+    """
+    Build the query computing all figures of the statistics page
+    :param counters:    Use the maintained counters and lecturer statistics instead of scanning the courses
+    :param corrections: SQL subqueries from get_vote_corrections
+    :return:            SQL query returning exactly one row
+    """
+    if counters:
+        lecturer_count = 'SELECT "value" FROM "scorecard_counter" WHERE "name" = \'{0}\''.format(LECTURER_COUNTER)
+        courses_count = 'SELECT COALESCE(SUM("course_count"), 0) FROM "scorecard_lecturerstats"'
+    else:
+        lecturer_count = 'SELECT COUNT(*) FROM "scorecard_lecturer"'
+        courses_count = 'SELECT COUNT(*) FROM "scorecard_course"'
+    if corrections:
+        # The lecturer statistics only know Course.votes, so the courses have to be aggregated
+        votes = current_votes_sql(corrections)
+        votes_mean = 'SELECT AVG({0}) FROM "scorecard_course"'.format(votes)
+        best = (
+            'SELECT "scorecard_course"."lecturer_id" AS "lecturer_id", AVG({0}) AS "mean" FROM "scorecard_course" '
+            'GROUP BY "scorecard_course"."lecturer_id" ORDER BY "mean" DESC, "lecturer_id" LIMIT 1'.format(votes))
+    else:
+        if counters:
+            votes_mean = (
+                'SELECT SUM("vote_sum") * 1.0 / NULLIF(SUM("course_count"), 0) FROM "scorecard_lecturerstats"')
+        else:
+            votes_mean = 'SELECT AVG("votes") FROM "scorecard_course"'
+        best = (
+            'SELECT "lecturer_id", "mean" FROM "scorecard_lecturerstats" WHERE "mean" IS NOT NULL '
+            'ORDER BY "mean" DESC, "lecturer_id" LIMIT 1')
+    return (
+        'SELECT ({0}), ({1}), ({2}), '
+        '"scorecard_lecturer"."id", "scorecard_lecturer"."first_name", "scorecard_lecturer"."last_name", "best"."mean" '
+        'FROM (SELECT 1) AS "one" '
+        'LEFT JOIN ({3}) AS "best" ON 1 = 1 '
+        'LEFT JOIN "scorecard_lecturer" ON "scorecard_lecturer"."id" = "best"."lecturer_id"'
+    ).format(lecturer_count, courses_count, votes_mean, best)
+
+
+def get_statistics(counters=None):
+    """
+    Compute all figures of the statistics page in one query,
+    so they all come from the same snapshot of the database
+    The query goes to the database the router picks for reading courses, a replica if there are any
+    :param counters:    Use the maintained counters, defaults to the SCORECARD_STATISTICS_COUNTERS setting
+    :return:            Statistics
+    """
+    if counters is None:
+        counters = use_counters()
+    cursor = connections[router.db_for_read(Course)].cursor()
+    cursor.execute(statistics_sql(counters, get_vote_corrections()))
+    lecturer_count, courses_count, votes_mean, best_id, first_name, last_name, best_mean = cursor.fetchone()
+    best = None
+    if best_id is not None:
+        best = Lecturer(id=best_id, first_name=first_name, last_name=last_name)
+    return Statistics(lecturer_count or 0, courses_count, votes_mean, best, best_mean)
@@ -0,0 +1,91 @@
+import gzip
+import io
+import os
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    # Without brotli only the gzip variants are written
+    brotli = None
+
+# Types worth compressing, images and web fonts like woff are compressed already
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.eot', '.ttf', '.json', '.txt', '.html')
+
+
+def gzip_compress(content):
+    """
+    :param content: Bytes to compress
+    :return:        Gzip data without a time stamp, so the same file always gives the same bytes
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buffer, compresslevel=9, mtime=0) as compressed:
+        compressed.write(content)
+    return buffer.getvalue()
+
+
+def brotli_compress(content):
+    return brotli.compress(content)
+
+
+# Content-Encoding -> (file suffix, compressor), in the order they are preferred
+ENCODINGS = [('br', '.br', brotli_compress)] if brotli is not None else []
+ENCODINGS.append(('gzip', '.gz', gzip_compress))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Static files storage writing files with the hash of their content in the name, like style.55e7cbb9ba48.css,
+    and a gzip and brotli compressed copy next to every compressible file, like style.55e7cbb9ba48.css.gz
+    Files which are not collected yet keep their name, so pages can be rendered before collectstatic was run.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super(CompressedManifestStaticFilesStorage, self).stored_name(name)
+        except ValueError:
+            # Not collected yet, the development server finds the file with its plain name
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        """
+        Hash the files like ManifestStaticFilesStorage, then compress the plain and the hashed files
+        """
+        for post_processed in super(CompressedManifestStaticFilesStorage, self).post_process(
+                paths, dry_run, **options):
+            yield post_processed
+        if dry_run:
+            return
+        self.__dict__.pop('hashed_names', None)
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        """
+        Write the compressed copies of a file, a copy which is not smaller than the file is left out
+        :param name:    Name of the file in the storage
+        :return:        List of the names of the written copies
+        """
+        with self.open(name) as original:
+            content = original.read()
+        written = []
+        for encoding, suffix, compressor in ENCODINGS:
+            compressed = compressor(content)
+            path = self.path(name + suffix)
+            if len(compressed) < len(content):
+                with open(path, 'wb') as compressed_file:
+                    compressed_file.write(compressed)
+                written.append(name + suffix)
+            elif os.path.exists(path):
+                os.remove(path)
+        return written
+
+    def is_hashed(self, name):
+        """
+        :param name:    Name of a file in the storage
+        :return:        True if the name contains the hash of the content, so it never changes
+        """
+        if not hasattr(self, 'hashed_names'):
+            self.hashed_names = frozenset(self.hashed_files.values())
+        return name in self.hashed_names
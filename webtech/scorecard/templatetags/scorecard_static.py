@@ -0,0 +1,14 @@
+from django import template
+from django.contrib.staticfiles.templatetags.staticfiles import static
+
+from scorecard.assets import minified_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def minified_static(name):
+    """
+    Like the static tag, but with the minified build of the file if there is one, see assets.minified_name
+    """
+    return static(minified_name(name))
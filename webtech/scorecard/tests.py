@@ -1,12 +1,7 @@
-import random
 from django.test import TestCase
 from django.core.urlresolvers import reverse
 
-from datetime import datetime
-from numpy import mean
-
 from scorecard.models import Course, Lecturer
-from scorecard.views import get_best_lecturer_with_mean, get_best_lecturer_with_mean_2
 
 class ScoreboardTest(TestCase):
     lecturer_1 = Lecturer()
@@ -42,12 +37,21 @@ class ScoreboardTest(TestCase):
         :return: old_votes, new_votes
         """
         response = self.client.get(reverse('scorecard:index'))
-        old_votes = response.context['object_list'].get(pk=course.pk).votes
+        old_votes = self.listed_course(response, course).votes
         self.client.get(reverse('scorecard:vote', kwargs={'pk': course.pk, 'vote': up_down}))
         response = self.client.get(reverse('scorecard:index'))
-        new_votes = response.context['object_list'].get(pk=course.pk).votes
+        new_votes = self.listed_course(response, course).votes
         return old_votes, new_votes
 
+    def listed_course(self, response, course):
+        """
+        Find a course in the course list of the index page
+        :param response: Response of the index page
+        :param course: Course object
+        :return: Course object from the list
+        """
+        return [listed for listed in response.context['object_list'] if listed.pk == course.pk][0]
+
     def vote_again(self):
         """
         Reset has_already_voted hook
@@ -151,24 +155,3 @@ class ScoreboardTest(TestCase):
         response = self.client.get(reverse('scorecard:statistics'))
         self.assertEqual(response.context['lecturer_best'], self.lecturer_1)
         self.assertEqual(response.context['lecturer_best_votes_mean'], 2)
-
-    def test_means_time(self):
-        for i in range(2, 1000):
-            l = Lecturer(first_name="Test {0}".format(i), last_name="Test {0}".format(i))
-            l.save()
-        for i in range(3, 10000):
-            random.seed("")
-            j = random.randint(0, 10)
-            c = Course(course_title="Test {0}".format(i), votes=(random.randint(-100, 200)), lecturer=Lecturer.objects.get(pk=j))
-            c.save()
-        times = []
-        for i in range(0, 1000):
-            t = datetime.now()
-            get_best_lecturer_with_mean()
-            times.append(datetime.now() - t)
-        print("get_lecturer_with_mean: {0}".format(mean(times)))
-        for i in range(0, 1000):
-            t = datetime.now()
-            get_best_lecturer_with_mean_2()
-            times.append(datetime.now() - t)
-        print("get_lecturer_with_mean_2: {0}".format(mean(times)))
\ No newline at end of file
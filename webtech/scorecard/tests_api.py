@@ -0,0 +1,105 @@
+import json
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from scorecard.models import Course, Lecturer, LecturerStats, Vote
+from scorecard.views import get_current_votes
+
+
+class VoteApiTest(TestCase):
+
+    def setUp(self):
+        """
+        Create a lecturer with two courses
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course_1 = Course.objects.create(course_title="Web Technologies", votes=1, lecturer=self.lecturer)
+        self.course_2 = Course.objects.create(course_title="Databases", votes=5, lecturer=self.lecturer)
+
+    def vote(self, course, vote):
+        return self.client.post(reverse('scorecard:api_vote', args=(course.pk, vote)))
+
+    def vote_batch(self, votes):
+        return self.client.post(reverse('scorecard:api_votes'), json.dumps({'votes': votes}),
+                                content_type='application/json')
+
+    def votes(self, course):
+        return Course.objects.get(pk=course.pk).votes
+
+    def test_vote(self):
+        response = self.vote(self.course_1, 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {'course': self.course_1.pk, 'votes': 2})
+        self.assertEqual(self.votes(self.course_1), 2)
+
+    def test_vote_only_once(self):
+        """
+        The API shares the voted courses with the vote view
+        """
+        self.client.get(reverse('scorecard:vote', args=(self.course_1.pk, 1)))
+        response = self.vote(self.course_1, 1)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.votes(self.course_1), 2)
+        self.assertEqual(self.vote(self.course_2, 1).status_code, 200)
+        self.client.get(reverse('scorecard:vote_again'))
+        self.assertEqual(self.vote(self.course_1, -1).status_code, 200)
+        self.assertEqual(self.votes(self.course_1), 1)
+
+    def test_vote_invalid(self):
+        self.assertEqual(self.vote(self.course_1, 3).status_code, 400)
+        self.assertEqual(self.client.post(reverse('scorecard:api_vote', args=(1000, 1))).status_code, 404)
+        self.assertEqual(self.client.get(reverse('scorecard:api_vote', args=(self.course_1.pk, 1))).status_code, 405)
+        self.assertEqual(self.votes(self.course_1), 1)
+
+    def test_batch(self):
+        response = self.vote_batch([[self.course_1.pk, 1], [self.course_2.pk, -1]])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'votes': {str(self.course_1.pk): 2, str(self.course_2.pk): 4}})
+        self.assertEqual(LecturerStats.objects.differences(), [])
+        # Every course of the batch counts as voted
+        self.assertEqual(self.vote_batch([[self.course_1.pk, 1]]).status_code, 403)
+
+    def test_batch_all_or_nothing(self):
+        """
+        A batch with an invalid vote or an unknown course counts no vote at all
+        """
+        for votes in ([[self.course_1.pk, 1], [self.course_2.pk, 2]],
+                      [[self.course_1.pk, 1], [1000, 1]],
+                      [[self.course_1.pk, True]],
+                      [[self.course_1.pk]],
+                      []):
+            self.assertEqual(self.vote_batch(votes).status_code, 400)
+        response = self.client.post(reverse('scorecard:api_votes'), 'no json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.votes(self.course_1), 1)
+
+    def test_batch_with_a_course_twice(self):
+        """
+        One vote per course and voter, repeating a course in the batch does not count it more often
+        """
+        self.assertEqual(self.vote_batch([[self.course_1.pk, 1]] * 50).status_code, 400)
+        self.assertEqual(self.vote_batch([[self.course_1.pk, 1], [self.course_2.pk, 1],
+                                          [self.course_1.pk, -1]]).status_code, 400)
+        self.assertEqual(self.votes(self.course_1), 1)
+        self.assertEqual(self.votes(self.course_2), 5)
+        self.assertEqual(self.vote_batch([[self.course_1.pk, 1]]).status_code, 200)
+
+    @override_settings(SCORECARD_API_BATCH_SIZE=2)
+    def test_batch_size(self):
+        self.assertEqual(self.vote_batch([[self.course_1.pk, 1]] * 3).status_code, 400)
+
+    @override_settings(SCORECARD_VOTE_LOG=True, SCORECARD_VOTE_LOG_INCLUDE_PENDING=True)
+    def test_batch_logged(self):
+        """
+        Logged votes of a batch refer to the session and are included in the answer
+        """
+        response = self.vote_batch([[self.course_1.pk, 1], [self.course_2.pk, 1]])
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['votes'][str(self.course_1.pk)], 2)
+        self.assertEqual(Vote.objects.filter(session_key=self.client.session.session_key).count(), 2)
+        self.assertEqual(self.votes(self.course_1), 1)
+
+    def test_get_current_votes(self):
+        self.assertEqual(get_current_votes([self.course_1.pk, self.course_2.pk, 1000]),
+                         {self.course_1.pk: 1, self.course_2.pk: 5})
@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+
+from scorecard.benchmark import find_regressions, measure_latencies, percentile, summarize
+
+
+class BenchmarkTest(SimpleTestCase):
+
+    def test_percentile(self):
+        """
+        Percentiles use the nearest rank, so they are always one of the measured values
+        """
+        values = list(range(100, 0, -1))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_measure_latencies_warmup(self):
+        """
+        Warmup calls are made but not measured
+        """
+        calls = []
+        latencies = measure_latencies(lambda: calls.append(1), 5, warmup=3)
+        self.assertEqual(len(calls), 8)
+        self.assertEqual(len(latencies), 5)
+
+    def test_summarize(self):
+        summary = summarize([0.001, 0.002, 0.004], 3)
+        self.assertEqual(summary['queries'], 3)
+        self.assertAlmostEqual(summary['p50'], 2)
+        self.assertAlmostEqual(summary['p99'], 4)
+
+    def test_find_regressions(self):
+        """
+        Slower percentiles past the threshold and additional queries are regressions
+        """
+        baseline = {'1000': {'index': {'p50': 10, 'p95': 20, 'p99': 30, 'queries': 1}}}
+        self.assertEqual(find_regressions(
+            {'1000': {'index': {'p50': 12, 'p95': 24, 'p99': 90, 'queries': 1}}}, baseline, 0.25), [])
+        self.assertEqual(len(find_regressions(
+            {'1000': {'index': {'p50': 13, 'p95': 20, 'p99': 30, 'queries': 2}}}, baseline, 0.25)), 2)
+
+    def test_find_regressions_ignores_unknown(self):
+        """
+        Sizes and scenarios missing in the baseline cannot regress
+        """
+        results = {'1000': {'vote': {'p50': 10, 'p95': 20, 'p99': 30, 'queries': 1}},
+                   '10000': {'index': {'p50': 10, 'p95': 20, 'p99': 30, 'queries': 1}}}
+        self.assertEqual(find_regressions(results, {'1000': {}}, 0.25), [])
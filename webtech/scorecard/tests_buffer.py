@@ -0,0 +1,136 @@
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard import caching
+from scorecard.buffer import VoteBuffer, vote_buffer
+from scorecard.models import Course, Lecturer
+from scorecard.views import update_vote
+
+
+class VoteBufferTest(TestCase):
+
+    def setUp(self):
+        """
+        Create some courses & lecturers
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course_1 = Course.objects.create(course_title="EADS", votes=0, lecturer=self.lecturer)
+        self.course_2 = Course.objects.create(course_title="ITSec", votes=5, lecturer=self.lecturer)
+        # No periodic flushing within the tests
+        self.buffer = VoteBuffer(flush_interval=3600, flush_size=10)
+
+    def tearDown(self):
+        self.buffer.stop()
+        vote_buffer.stop()
+
+    def votes(self, course):
+        return Course.objects.get(pk=course.pk).votes
+
+    def test_votes_are_not_written_before_flush(self):
+        """
+        Buffered votes are only pending until the buffer is flushed
+        """
+        self.buffer.add(self.course_1.pk, 1)
+        self.buffer.add(self.course_1.pk, 1)
+        self.assertEqual(self.votes(self.course_1), 0)
+        self.assertEqual(self.buffer.pending_votes(self.course_1.pk), 2)
+
+    def test_flush_writes_all_courses(self):
+        """
+        A flush writes the summed up votes of every course
+        """
+        self.buffer.add(self.course_1.pk, 1)
+        self.buffer.add(self.course_2.pk, -1)
+        self.buffer.add(self.course_2.pk, -1)
+        self.buffer.flush()
+        self.assertEqual(self.votes(self.course_1), 1)
+        self.assertEqual(self.votes(self.course_2), 3)
+        self.assertEqual(self.buffer.pending_votes(self.course_2.pk), 0)
+
+    def test_flush_at_size_threshold(self):
+        """
+        The buffer is flushed as soon as flush_size votes are pending
+        """
+        for i in range(self.buffer.flush_size):
+            self.buffer.add(self.course_1.pk, 1)
+        self.assertEqual(self.votes(self.course_1), self.buffer.flush_size)
+
+    def test_failed_flush_keeps_count(self):
+        """
+        After a failed flush the next one still comes after flush_size votes
+        """
+        def locked(deltas):
+            del Course.objects.add_votes
+            raise OperationalError("database is locked")
+        Course.objects.add_votes = locked
+        self.addCleanup(lambda: Course.objects.__dict__.pop('add_votes', None))
+        for i in range(3):
+            self.buffer.add(self.course_1.pk, 1)
+        with self.assertRaises(OperationalError):
+            self.buffer.flush()
+        self.assertEqual(self.buffer.pending_count, 3)
+        for i in range(self.buffer.flush_size - 3):
+            self.buffer.add(self.course_1.pk, 1)
+        self.assertEqual(self.votes(self.course_1), self.buffer.flush_size)
+
+    def test_stop_flushes(self):
+        """
+        Stopping the buffer at shutdown writes the remaining votes
+        """
+        self.buffer.add(self.course_1.pk, -1)
+        self.buffer.stop()
+        self.assertEqual(self.votes(self.course_1), -1)
+
+    @override_settings(SCORECARD_VOTE_BUFFER=True)
+    def test_details_include_pending_votes(self):
+        """
+        The details page shows votes which are not yet written
+        """
+        update_vote(self.course_2, 1)
+        response = self.client.get(reverse('scorecard:details', kwargs={'pk': self.course_2.pk}))
+        self.assertEqual(response.context['course'].votes, 6)
+
+    @override_settings(SCORECARD_VOTE_BUFFER=True)
+    def test_vote_writes_nothing(self):
+        """
+        A buffered vote does not even change the scoreboard version, the flush does
+        """
+        with self.assertNumQueries(0):
+            update_vote(self.course_2, 1)
+        version = caching.get_version()
+        vote_buffer.flush()
+        self.assertGreater(caching.get_version(), version)
+
+
+@override_settings(SCORECARD_VOTE_BUFFER=True, SCORECARD_SQLITE_RETRY_DELAY=0)
+class LockedFlushTest(TransactionTestCase):
+    """
+    Outside of a transaction, so the vote path retries writes failing with "database is locked"
+    """
+
+    def setUp(self):
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="EADS", votes=0, lecturer=lecturer)
+        flush_size = vote_buffer.flush_size
+        vote_buffer.flush_size = 1
+        self.addCleanup(setattr, vote_buffer, 'flush_size', flush_size)
+        self.addCleanup(vote_buffer.stop)
+
+    def lock_once(self):
+        """
+        Let the next flush fail as if another connection held the lock
+        """
+        def locked(deltas):
+            del Course.objects.add_votes
+            raise OperationalError("database is locked")
+        Course.objects.add_votes = locked
+        self.addCleanup(lambda: Course.objects.__dict__.pop('add_votes', None))
+
+    def test_vote_counted_once(self):
+        self.lock_once()
+        self.assertTrue(update_vote(self.course, 1))
+        self.assertEqual(vote_buffer.pending_votes(self.course.pk), 1)
+        vote_buffer.stop()
+        self.assertEqual(Course.objects.get(pk=self.course.pk).votes, 1)
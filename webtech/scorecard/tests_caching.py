@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard import caching
+from scorecard.caching import statistics_cache
+from scorecard.models import Counter, Course, Lecturer, VERSION_COUNTER
+from scorecard.stats import get_variant
+from scorecard.views import update_vote
+
+
+class StatisticsCacheTest(TestCase):
+
+    def setUp(self):
+        """
+        Create some courses & lecturers
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="EADS", votes=0, lecturer=self.lecturer)
+
+    def statistics(self):
+        return self.client.get(reverse('scorecard:statistics'))
+
+    def vote(self):
+        self.client.get(reverse('scorecard:vote', kwargs={'pk': self.course.pk, 'vote': 1}))
+        self.client.get(reverse('scorecard:vote_again'))
+
+    def test_second_request_is_a_hit(self):
+        """
+        Without changes the statistics are computed only once
+        """
+        counters = statistics_cache.counters()
+        self.assertEqual(self.statistics()['X-Statistics-Cache'], 'miss')
+        # Only the scoreboard version is read
+        with self.assertNumQueries(1):
+            response = self.statistics()
+        self.assertEqual(response['X-Statistics-Cache'], 'hit')
+        self.assertEqual(response.context['lecturer_best'], self.lecturer)
+        self.assertEqual(statistics_cache.counters()['hits'], counters['hits'] + 1)
+        self.assertEqual(statistics_cache.counters()['misses'], counters['misses'] + 1)
+
+    def test_vote_invalidates(self):
+        """
+        A vote changes the scoreboard version, so the statistics are computed again
+        """
+        self.statistics()
+        self.vote()
+        response = self.statistics()
+        self.assertEqual(response['X-Statistics-Cache'], 'miss')
+        self.assertEqual(response.context['lecturer_best_votes_mean'], 1)
+
+    def test_course_change_invalidates(self):
+        self.statistics()
+        Course.objects.create(course_title="ITSec", votes=0, lecturer=self.lecturer)
+        response = self.statistics()
+        self.assertEqual(response['X-Statistics-Cache'], 'miss')
+        self.assertEqual(response.context['courses_count'], 2)
+
+    def test_change_in_other_process_invalidates(self):
+        """
+        The version is kept in the database, so a vote counted by another worker outdates this cache as well
+        """
+        self.statistics()
+        # The vote of the other worker only writes to the database, the cache of this process is not touched
+        update_vote(self.course, 1)
+        self.assertNotEqual(cache.get(statistics_cache.key.format(get_variant())), None)
+        response = self.statistics()
+        self.assertEqual(response['X-Statistics-Cache'], 'miss')
+        self.assertEqual(response.context['lecturer_best_votes_mean'], 1)
+
+    def test_version_never_goes_back(self):
+        caching.bump_version()
+        version = caching.get_version()
+        # A process with a clock running behind
+        Counter.objects.advance(VERSION_COUNTER, version - 10 ** 9)
+        self.assertEqual(caching.get_version(), version + 1)
+        self.assertEqual(caching.get_modified(), caching.version_modified(version + 1))
+        Counter.objects.rebuild()
+        self.assertEqual(caching.get_version(), version + 1)
+
+    @override_settings(SCORECARD_VERSION_INTERVAL=3600)
+    def test_version_interval(self):
+        """
+        Only the first change of an interval writes the version, the version of the interval is returned once it is over
+        """
+        interval = 3600 * 1000000
+        update_vote(self.course, 1)
+        start = caching.get_version()
+        self.assertEqual(start % interval, 0)
+        self.assertEqual(Counter.objects.get_value(VERSION_COUNTER), start + interval)
+        with CaptureQueriesContext(connection) as queries:
+            update_vote(self.course, 1)
+        self.assertEqual([query for query in queries if 'UPDATE "scorecard_counter"' in query['sql']], [])
+        self.assertEqual(caching.get_version(), start)
+        # The interval is over
+        Counter.objects.filter(name=VERSION_COUNTER).update(value=start)
+        self.assertEqual(caching.get_version(), start)
+
+    @override_settings(SCORECARD_STATISTICS_STALENESS=3600)
+    def test_staleness_budget(self):
+        """
+        Within the staleness budget votes do not invalidate the cache
+        """
+        self.statistics()
+        self.vote()
+        response = self.statistics()
+        self.assertEqual(response['X-Statistics-Cache'], 'hit')
+        self.assertEqual(response.context['lecturer_best_votes_mean'], 0)
+
+    @override_settings(SCORECARD_STATISTICS_CACHE=False)
+    def test_disabled(self):
+        self.statistics()
+        self.assertEqual(self.statistics()['X-Statistics-Cache'], 'miss')
@@ -0,0 +1,128 @@
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from scorecard import caching
+from scorecard.buffer import vote_buffer
+from scorecard.models import Counter, Course, Lecturer, VERSION_COUNTER
+from scorecard.views import update_vote
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        """
+        Create a lecturer with two courses
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course_1 = Course.objects.create(course_title="Web Technologies", votes=1, lecturer=self.lecturer)
+        self.course_2 = Course.objects.create(course_title="Databases", votes=2, lecturer=self.lecturer)
+
+    def revalidate(self, url, response, **params):
+        """
+        Request a page again with the ETag of an earlier response
+        :return: The new response
+        """
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def assertNotModified(self, response):
+        self.assertEqual(response.status_code, 304)
+        # Nothing was rendered
+        self.assertEqual(response.templates, [])
+
+    def test_index(self):
+        url = reverse('scorecard:index')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotModified(self.revalidate(url, response))
+        update_vote(self.course_2, 1)
+        changed = self.revalidate(url, response)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_index_changed_by_other_process(self):
+        """
+        The validators come from the database, so a change made by another worker is not answered with 304
+        """
+        url = reverse('scorecard:index')
+        response = self.client.get(url)
+        Course.objects.filter(pk=self.course_1.pk).update(votes=5)
+        Counter.objects.advance(VERSION_COUNTER, caching.get_version() + 1)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'],
+                                  HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_index_pages_differ(self):
+        url = reverse('scorecard:index')
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response, after='2_{0}'.format(self.course_2.pk)).status_code, 200)
+
+    def test_index_after_vote(self):
+        """
+        The page showing the message of a vote is always rendered
+        """
+        url = reverse('scorecard:index')
+        response = self.client.get(url)
+        self.client.get(reverse('scorecard:vote', args=(self.course_1.pk, 1)))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Vote Successful!")
+        self.assertFalse(response.has_header('ETag'))
+        # The voted state of the session is part of the page
+        response = self.client.get(url)
+        self.client.get(reverse('scorecard:vote_again'))
+        self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_details(self):
+        url = reverse('scorecard:details', args=(self.course_1.pk,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+        # Votes for other courses do not change the page
+        update_vote(self.course_2, 1)
+        self.assertNotModified(self.revalidate(url, response))
+        update_vote(self.course_1, 1)
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(self.revalidate(url, response))
+        # The page shows the name of the lecturer
+        self.lecturer.last_name = "Huber"
+        self.lecturer.save()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    @override_settings(SCORECARD_VOTE_BUFFER=True)
+    def test_details_buffered(self):
+        """
+        Buffered votes do not change the course, so every vote changes the page
+        """
+        self.addCleanup(vote_buffer.stop)
+        url = reverse('scorecard:details', args=(self.course_1.pk,))
+        response = self.client.get(url)
+        update_vote(self.course_1, 1)
+        response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['course'].votes, 2)
+
+    def test_details_missing(self):
+        response = self.client.get(reverse('scorecard:details', args=(1000,)), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_statistics(self):
+        url = reverse('scorecard:statistics')
+        response = self.client.get(url)
+        self.assertNotModified(self.revalidate(url, response))
+        update_vote(self.course_1, 1)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    @override_settings(SCORECARD_STATISTICS_STALENESS=60)
+    def test_statistics_stale(self):
+        """
+        Statistics which may be outdated get no validators
+        """
+        response = self.client.get(reverse('scorecard:statistics'))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
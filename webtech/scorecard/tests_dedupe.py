@@ -0,0 +1,99 @@
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard.dedupe import COOKIE_NAME, VotedCourses
+from scorecard.models import Course, Lecturer
+
+
+class VotedCoursesTest(SimpleTestCase):
+
+    def test_voted_courses_are_recognized(self):
+        voted = VotedCourses()
+        self.assertFalse(voted)
+        for pk in range(1, 100001, 200):
+            voted.add(pk)
+        self.assertTrue(voted)
+        self.assertTrue(all(pk in voted for pk in range(1, 100001, 200)))
+        loaded = VotedCourses.loads(voted.dumps())
+        self.assertTrue(all(pk in loaded for pk in range(1, 100001, 200)))
+
+    def test_false_positives_are_rare(self):
+        """
+        After 500 votes less than 1% of the other courses count as voted
+        """
+        voted = VotedCourses()
+        for pk in range(500):
+            voted.add(pk)
+        false_positives = sum(1 for pk in range(500, 100500) if pk in voted)
+        self.assertLess(false_positives, 1000)
+
+    def test_size_is_bounded(self):
+        """
+        The cookie stays small for few votes and never grows with the number of courses
+        """
+        voted = VotedCourses()
+        voted.add(99999)
+        self.assertLess(len(voted.dumps()), 100)
+        for pk in range(0, 100000, 7):
+            voted.add(pk)
+        self.assertLess(len(voted.dumps()), 1500)
+
+    def test_invalid_values_are_empty(self):
+        self.assertFalse(VotedCourses.loads('not a filter'))
+        self.assertFalse(VotedCourses.loads(VotedCourses(bits=64).dumps()))
+
+
+class VoteDedupeTest(TestCase):
+
+    def setUp(self):
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course_1 = Course.objects.create(course_title="EADS", votes=0, lecturer=self.lecturer)
+        self.course_2 = Course.objects.create(course_title="ITSec", votes=0, lecturer=self.lecturer)
+
+    def vote(self, course):
+        return self.client.get(reverse('scorecard:vote', args=(course.pk, 1)), follow=True)
+
+    def votes(self, course):
+        return Course.objects.get(pk=course.pk).votes
+
+    def test_one_vote_per_course(self):
+        self.assertContains(self.vote(self.course_1), "Vote Successful!")
+        self.assertContains(self.vote(self.course_2), "Vote Successful!")
+        self.assertContains(self.vote(self.course_1), "You have already voted!")
+        self.assertEqual((self.votes(self.course_1), self.votes(self.course_2)), (1, 1))
+
+    def test_voted_courses_are_marked(self):
+        self.vote(self.course_1)
+        response = self.client.get(reverse('scorecard:index'))
+        marked = dict((course.pk, course.has_voted) for course in response.context['object_list'])
+        self.assertEqual(marked, {self.course_1.pk: True, self.course_2.pk: False})
+        self.assertContains(response, "Vote Again?")
+
+    def test_check_needs_no_database(self):
+        """
+        The voted courses live in the cookie, the session is neither read nor written
+        """
+        self.vote(self.course_1)
+        with self.assertNumQueries(1):
+            # Only the course is looked up
+            self.client.get(reverse('scorecard:vote', args=(self.course_1.pk, 1)))
+        self.assertNotIn('sessionid', self.client.cookies)
+
+    def test_tampered_cookie_is_ignored(self):
+        self.vote(self.course_1)
+        self.client.cookies[COOKIE_NAME] = self.client.cookies[COOKIE_NAME].value + 'x'
+        self.assertContains(self.vote(self.course_1), "Vote Successful!")
+
+    def test_vote_again_forgets_the_courses(self):
+        self.vote(self.course_1)
+        self.client.get(reverse('scorecard:vote_again'))
+        self.assertEqual(self.client.cookies[COOKIE_NAME].value, '')
+        self.assertContains(self.vote(self.course_1), "Vote Successful!")
+
+    @override_settings(SCORECARD_VOTED_FILTER_BITS=1024)
+    def test_changed_filter_size_forgets_the_courses(self):
+        self.client.cookies[COOKIE_NAME] = ''
+        self.vote(self.course_1)
+        with self.settings(SCORECARD_VOTED_FILTER_BITS=2048):
+            self.assertContains(self.vote(self.course_1), "Vote Successful!")
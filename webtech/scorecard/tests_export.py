@@ -0,0 +1,69 @@
+import csv
+import json
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils.six import StringIO
+
+from scorecard.export import COLUMNS, export_rows
+from scorecard.models import Course, Lecturer
+from scorecard.views import update_vote
+
+
+class ExportTest(TestCase):
+
+    def setUp(self):
+        """
+        Create two lecturers with some courses and a staff user
+        """
+        lecturer_1 = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        lecturer_2 = Lecturer.objects.create(first_name="Max", last_name="Mueller")
+        self.courses = [Course.objects.create(course_title="Course {0}".format(i), votes=i,
+                                              lecturer=lecturer_1 if i % 2 else lecturer_2) for i in range(7)]
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+
+    def test_rows_in_chunks(self):
+        """
+        Reading in chunks returns every course exactly once, with its lecturer joined in
+        """
+        for chunk_size in (1, 3, 7, 100):
+            rows = list(export_rows(chunk_size))
+            self.assertEqual([row[0] for row in rows], [course.pk for course in self.courses])
+        self.assertEqual(rows[1][1:3], ("Course 1", 1))
+        self.assertEqual(rows[1][4:], ("Janosch", "Maier"))
+        with self.assertNumQueries(1):
+            list(export_rows(100))
+
+    @override_settings(SCORECARD_SHARDED_VOTES=True)
+    def test_rows_include_shards(self):
+        update_vote(self.courses[0], 1)
+        self.assertEqual(next(export_rows())[2], 1)
+
+    def test_csv_endpoint(self):
+        url = reverse('scorecard:export', args=('csv',))
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.login(username='admin', password='secret')
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(tuple(rows[0]), COLUMNS)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1][5], "Mueller")
+
+    def test_ndjson_endpoint(self):
+        self.client.login(username='admin', password='secret')
+        response = self.client.get(reverse('scorecard:export', args=('ndjson',)))
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[3]), {'course': self.courses[3].pk, 'title': "Course 3", 'votes': 3,
+                                                'lecturer': self.courses[3].lecturer_id,
+                                                'first_name': "Janosch", 'last_name': "Maier"})
+
+    def test_command(self):
+        out = StringIO()
+        call_command('export_courses', format='ndjson', chunk_size=2, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 7)
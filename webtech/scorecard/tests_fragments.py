@@ -0,0 +1,66 @@
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+
+from scorecard.benchmark import index_renderer, row_cache, unsaved_courses
+from scorecard.fragments import get_fragment_cache, render_rows, row_key
+from scorecard.models import Course, Lecturer
+
+
+class RowFragmentTest(SimpleTestCase):
+
+    def setUp(self):
+        self.courses = unsaved_courses(3)
+        self.cache = row_cache(10)
+
+    def test_cached_rows_are_the_same(self):
+        with override_settings(SCORECARD_FRAGMENT_CACHE=False):
+            uncached = render_rows(self.courses)
+        self.assertEqual(render_rows(self.courses, self.cache), uncached)
+        self.assertEqual(render_rows(self.courses, self.cache), uncached)
+        self.assertIn('href="{0}"'.format(reverse('scorecard:vote', args=(1, -1))), uncached[0])
+        self.assertIn('href="{0}"'.format(reverse('scorecard:details', args=(3,))), uncached[2])
+
+    def test_rows_are_cached(self):
+        render_rows(self.courses, self.cache)
+        self.cache.set(row_key(self.courses[0]), 'cached row')
+        self.assertEqual(render_rows(self.courses, self.cache)[0], 'cached row')
+
+    def test_own_cache(self):
+        """
+        Many rows must not push the other entries out of the default cache
+        """
+        self.assertIsNot(get_fragment_cache(), caches['default'])
+        get_fragment_cache().set('scorecard:test', 1)
+        self.assertIsNone(caches['default'].get('scorecard:test'))
+
+    def test_key_changes_with_the_row(self):
+        course = self.courses[0]
+        keys = set([row_key(course)])
+        course.votes += 1
+        keys.add(row_key(course))
+        course.has_voted = True
+        keys.add(row_key(course))
+        course.rank_label = "#1 of 3"
+        keys.add(row_key(course))
+        self.assertEqual(len(keys), 4)
+        self.assertNotIn(' ', row_key(course))
+
+    def test_index_page(self):
+        html = index_renderer(self.courses, self.cache)()
+        self.assertIn("Course 1</a></strong> has 2 votes", html)
+        self.assertIn("Course 3</a></strong> has 0 votes", html)
+
+
+class IndexFragmentTest(TestCase):
+
+    def test_vote_changes_the_row(self):
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        course = Course.objects.create(course_title="EADS", votes=1, lecturer=lecturer)
+        self.assertContains(self.client.get(reverse('scorecard:index')), "has 1 vote\n")
+        self.client.get(reverse('scorecard:vote', args=(course.pk, 1)))
+        response = self.client.get(reverse('scorecard:index'))
+        self.assertContains(response, "has 2 votes")
+        self.assertContains(response, "voted)")
+        self.assertContains(response, 'href="{0}">Statistics</a>'.format(reverse('scorecard:statistics')))
@@ -0,0 +1,138 @@
+import tempfile
+from io import BytesIO
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from scorecard.export import csv_lines, export_rows
+from scorecard.importing import import_courses
+from scorecard.models import Counter, Course, Lecturer, LecturerStats, LECTURER_COUNTER
+
+
+def csv_file(*lines):
+    return BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+class ImportTest(TestCase):
+
+    def setUp(self):
+        """
+        Create a lecturer with a course
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="Web Technologies", votes=4, lecturer=self.lecturer)
+
+    def assertStatsUpToDate(self):
+        self.assertEqual(LecturerStats.objects.differences(), [])
+        self.assertEqual(Counter.objects.get(name=LECTURER_COUNTER).value, Lecturer.objects.count())
+
+    def test_create(self):
+        """
+        Lecturers are found by name or created, courses without primary key are created
+        """
+        report = import_courses(csv_file(
+            'title,first_name,last_name,votes',
+            'Databases,Janosch,Maier,3',
+            'Compilers,Max,Huber,',
+            'Networks,Max,Huber,-2',
+        ), chunk_size=2)
+        self.assertEqual((report.lecturers_created, report.courses_created, report.errors), (1, 3, []))
+        self.assertEqual(Lecturer.objects.count(), 2)
+        huber = Lecturer.objects.get(last_name="Huber")
+        self.assertEqual(sorted(Course.objects.filter(lecturer=huber).values_list('course_title', 'votes')),
+                         [("Compilers", 0), ("Networks", -2)])
+        self.assertEqual(Course.objects.get(course_title="Databases").lecturer, self.lecturer)
+        self.assertStatsUpToDate()
+
+    def test_update(self):
+        """
+        Rows with the primary key of a course update its title and lecturer, but not its votes
+        """
+        report = import_courses(csv_file(
+            'course,title,first_name,last_name,votes',
+            '{0},Web Engineering,Max,Huber,100'.format(self.course.pk),
+        ))
+        self.assertEqual((report.courses_updated, report.courses_created), (1, 0))
+        course = Course.objects.get(pk=self.course.pk)
+        self.assertEqual((course.course_title, course.lecturer.last_name, course.votes), ("Web Engineering", "Huber", 4))
+        self.assertTrue(course.modified > self.course.modified)
+        self.assertStatsUpToDate()
+        report = import_courses(csv_file(
+            'course,title,first_name,last_name',
+            '{0},Web Engineering,Max,Huber'.format(self.course.pk),
+        ))
+        self.assertEqual((report.courses_updated, report.courses_unchanged), (0, 1))
+
+    def test_errors(self):
+        """
+        Invalid rows are reported with their line and skipped
+        """
+        report = import_courses(csv_file(
+            'course,title,first_name,last_name,votes',
+            ',Databases,Janosch,,1',
+            ',Databases,Janosch,Maier,many',
+            'x,Databases,Janosch,Maier,1',
+            ',{0},Janosch,Maier,1'.format('x' * 201),
+            '1000,Compilers,Janosch,Maier,1',
+            '1000,Compilers,Janosch,Maier,1',
+        ))
+        self.assertEqual([line for line, message in report.errors], [2, 3, 4, 5, 7])
+        self.assertEqual(report.courses_created, 1)
+        self.assertTrue(Course.objects.filter(pk=1000).exists())
+        self.assertStatsUpToDate()
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValueError):
+            import_courses(csv_file('title,votes', 'Databases,1'))
+
+    def test_export_import(self):
+        """
+        An export can be imported again without changing anything
+        """
+        exported = ''.join(csv_lines(export_rows()))
+        report = import_courses(BytesIO(exported.encode('utf-8')))
+        self.assertEqual((report.courses_unchanged, report.courses_created), (1, 0))
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as stream:
+            stream.write(b'title,first_name,last_name\nDatabases,Max,Huber\nCompilers,Max,\n')
+            stream.flush()
+            out = StringIO()
+            err = StringIO()
+            call_command('import_courses', stream.name, chunk_size=1, stdout=out, stderr=err)
+        self.assertIn("1 lecturers created, 1 courses created", out.getvalue())
+        self.assertIn("line 3:", err.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('import_courses')
+
+    def test_admin_upload(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.login(username='admin', password='secret')
+        url = reverse('admin:scorecard_course_import')
+        self.assertContains(self.client.get(reverse('admin:scorecard_course_changelist')), url)
+        upload = SimpleUploadedFile('courses.csv', b'title,first_name,last_name\nDatabases,Max,Huber\n,Max,Huber\n')
+        response = self.client.post(url, {'file': upload}, follow=True)
+        self.assertContains(response, "1 courses created")
+        self.assertContains(response, "Line 3:")
+        self.assertTrue(Course.objects.filter(course_title="Databases").exists())
+
+    def test_deferred_indexes(self):
+        """
+        The indexes of the course table are back after an import without them
+        """
+        def indexes():
+            return list(connection.cursor().execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'scorecard_course'"))
+
+        before = indexes()
+        report = import_courses(csv_file('title,first_name,last_name', 'Databases,Max,Huber'), defer_indexes=True)
+        self.assertEqual(report.courses_created, 1)
+        self.assertEqual(sorted(indexes()), sorted(before))
+        with self.assertRaises(ValueError):
+            import_courses(csv_file('title'), defer_indexes=True)
+        self.assertEqual(sorted(indexes()), sorted(before))
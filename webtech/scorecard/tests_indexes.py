@@ -0,0 +1,74 @@
+from django.test import SimpleTestCase, TestCase
+
+from scorecard.benchmark import capture_queries, explain_query
+from scorecard.management.commands.explain_queries import is_suspicious
+from scorecard.models import Course, Lecturer, LecturerStats
+from scorecard.pagination import get_page, make_cursor
+
+
+class IndexTest(TestCase):
+
+    def setUp(self):
+        """
+        Create a lecturer with some courses
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.courses = [Course.objects.create(course_title="Course {0}".format(i), votes=i % 7, lecturer=self.lecturer)
+                        for i in range(20)]
+
+    def plan(self, func):
+        """
+        :param func:    Function issuing exactly one query
+        :return:        Query plan of the query as one string
+        """
+        with capture_queries() as queries:
+            func()
+        self.assertEqual(len(queries), 1)
+        return '\n'.join(explain_query(*queries[0]))
+
+    def test_keyset_pages_seek_index(self):
+        """
+        Pages after or before a cursor are found in the (votes DESC, id) index without sorting
+        """
+        cursor = make_cursor(self.courses[10])
+        for direction in ('after', 'before'):
+            plan = self.plan(lambda: get_page(Course.objects.all(), 5, **{direction: cursor}))
+            self.assertIn('SEARCH', plan)
+            self.assertIn('scorecard_course_votes_id', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_best_lecturer_uses_index(self):
+        """
+        The best lecturer is read from the (mean DESC, lecturer) index without sorting
+        """
+        plan = self.plan(LecturerStats.objects.best)
+        self.assertIn('scorecard_lecturerstats_mean_lecturer', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_courses_of_lecturer_use_index(self):
+        """
+        The courses of a lecturer are found in the (lecturer, votes) index
+        """
+        plan = self.plan(lambda: list(Course.objects.filter(lecturer=self.lecturer).order_by('votes')))
+        self.assertIn('SEARCH', plan)
+        self.assertIn('lecturer_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class SuspiciousStepTest(SimpleTestCase):
+    tables = ['scorecard_course', 'scorecard_lecturer']
+
+    def test_scan_without_index(self):
+        self.assertTrue(is_suspicious('SCAN scorecard_course', self.tables))
+        self.assertTrue(is_suspicious('SCAN TABLE scorecard_course', self.tables))
+        self.assertTrue(is_suspicious('USE TEMP B-TREE FOR ORDER BY', self.tables))
+
+    def test_scan_along_index(self):
+        """
+        The ordered pages read the (votes DESC, id) index and stop after the page
+        """
+        self.assertFalse(is_suspicious('SCAN scorecard_course USING INDEX scorecard_course_votes_id', self.tables))
+        self.assertFalse(is_suspicious('SCAN TABLE scorecard_course USING COVERING INDEX scorecard_course_lecturer',
+                                       self.tables))
+        self.assertFalse(is_suspicious('SEARCH scorecard_lecturer USING INTEGER PRIMARY KEY (rowid=?)', self.tables))
+        self.assertFalse(is_suspicious('SCAN subquery', self.tables))
@@ -0,0 +1,209 @@
+import random
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard.leaderboard import FenwickTree, Leaderboard, leaderboard
+from scorecard.models import Course, Lecturer
+from scorecard.views import update_vote, update_votes
+
+
+class FenwickTreeTest(SimpleTestCase):
+
+    def test_prefix_and_search(self):
+        counts = [2, 0, 1, 3, 0, 1]
+        tree = FenwickTree(counts)
+        for slot in range(len(counts)):
+            self.assertEqual(tree.prefix(slot), sum(counts[:slot + 1]))
+        self.assertEqual([tree.search(count) for count in range(1, 8)], [0, 0, 2, 3, 3, 3, 5])
+        tree.add(1, 4)
+        self.assertEqual(tree.prefix(1), 6)
+        self.assertEqual(tree.search(3), 1)
+
+
+class LeaderboardTest(SimpleTestCase):
+
+    def setUp(self):
+        self.board = Leaderboard()
+        self.board.load([(1, 5), (2, 3), (3, 3), (4, -1), (5, 7)])
+
+    def expected(self, votes):
+        return sorted(votes.items(), key=lambda item: (-item[1], item[0]))
+
+    def test_rank_and_page(self):
+        self.assertEqual([self.board.rank(pk) for pk in range(1, 6)], [2, 3, 4, 5, 1])
+        self.assertEqual(self.board.rank(6), None)
+        self.assertEqual(self.board.top(2), [(5, 7), (1, 5)])
+        self.assertEqual(self.board.page(2, 10), [(2, 3), (3, 3), (4, -1)])
+        self.assertEqual(self.board.page(5, 10), [])
+        self.assertEqual(self.board.count(), 5)
+
+    def test_position_between_courses(self):
+        self.assertEqual(self.board.position(3, 3), 3)
+        self.assertEqual(self.board.position(4, 0), 2)
+        self.assertEqual(self.board.position(1000, 1), 0)
+        self.assertEqual(self.board.position(-1000, 1), 5)
+
+    def test_votes_outside_of_the_tree(self):
+        """
+        Votes far away from the loaded votes grow the tree
+        """
+        self.board.add_votes(4, -10000)
+        self.board.set(6, 10000)
+        self.assertEqual(self.board.rank(6), 1)
+        self.assertEqual(self.board.rank(4), 6)
+        self.assertEqual(self.board.page(5, 1), [(4, -10001)])
+
+    def test_random_changes_keep_the_order(self):
+        """
+        The leaderboard always agrees with sorting all courses
+        """
+        generator = random.Random(0)
+        votes = dict((pk, generator.randint(-20, 20)) for pk in range(200))
+        self.board.load(votes.items())
+        for i in range(2000):
+            pk = generator.randrange(220)
+            if generator.random() < 0.05:
+                votes.pop(pk, None)
+                self.board.remove(pk)
+            elif pk in votes:
+                delta = generator.choice((1, -1))
+                votes[pk] += delta
+                self.board.add_votes(pk, delta)
+            else:
+                votes[pk] = generator.randint(-20, 20)
+                self.board.set(pk, votes[pk])
+        expected = self.expected(votes)
+        self.assertEqual(self.board.page(0, len(expected)), expected)
+        self.assertEqual(self.board.page(37, 20), expected[37:57])
+        for rank, (pk, course_votes) in enumerate(expected, 1):
+            self.assertEqual(self.board.rank(pk), rank)
+
+    def test_not_loaded(self):
+        """
+        Changes are ignored until the leaderboard is loaded
+        """
+        self.board.reset()
+        self.board.set(1, 3)
+        self.board.add_votes(1, 1)
+        self.assertEqual(self.board.count(), 0)
+
+
+@override_settings(SCORECARD_LEADERBOARD=True, SCORECARD_INDEX_PAGE_SIZE=3)
+class LeaderboardViewTest(TestCase):
+
+    def setUp(self):
+        """
+        Create courses, some of them with the same votes
+        """
+        leaderboard.reset()
+        self.addCleanup(leaderboard.reset)
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.courses = [Course.objects.create(course_title="Course {0}".format(i), votes=votes, lecturer=self.lecturer)
+                        for i, votes in enumerate([5, 3, 3, 3, -1, 0, 3, 7])]
+
+    def index(self, **params):
+        return self.client.get(reverse('scorecard:index'), params)
+
+    def titles(self, response):
+        return [course.course_title for course in response.context['object_list']]
+
+    def walk_forward(self):
+        """
+        Follow the next links from the first to the last page
+        :return: List of (titles, previous cursor, next cursor) of every page
+        """
+        pages = []
+        response = self.index()
+        while True:
+            pages.append((self.titles(response), response.context['previous_cursor'], response.context['next_cursor']))
+            if not response.context['next_cursor']:
+                return pages
+            response = self.index(after=response.context['next_cursor'])
+
+    def test_pages_match_the_database(self):
+        """
+        The leaderboard pages and cursors are the same as the pages read from the database
+        """
+        pages = self.walk_forward()
+        with override_settings(SCORECARD_LEADERBOARD=False):
+            self.assertEqual(pages, self.walk_forward())
+        self.assertEqual(sum([titles for titles, previous, next in pages], []),
+                         ["Course 7", "Course 0", "Course 1", "Course 2", "Course 3", "Course 6", "Course 5", "Course 4"])
+        back = self.index(before=pages[-1][1])
+        self.assertEqual(self.titles(back), pages[-2][0])
+
+    def test_rank_labels(self):
+        response = self.index()
+        self.assertContains(response, "#1 of 8")
+        self.assertContains(response, "#3 of 8")
+        response = self.client.get(reverse('scorecard:details', args=(self.courses[4].pk,)))
+        self.assertContains(response, "#8 of 8")
+
+    def test_details_revalidated_on_rank_change(self):
+        """
+        A vote for another course changes the rank on the details page, which is not answered with 304 then
+        """
+        url = reverse('scorecard:details', args=(self.courses[0].pk,))
+        response = self.client.get(url)
+        self.assertContains(response, "#2 of 8")
+        update_votes([(self.courses[1].pk, 1)] * 3)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'],
+                                   HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "#3 of 8")
+
+    def test_votes_of_other_processes(self):
+        """
+        By default the leaderboard is loaded again after a few seconds, with the votes of the other processes
+        """
+        leaderboard.ensure_loaded()
+        # A vote counted by another process only changes the database
+        Course.objects.filter(pk=self.courses[4].pk).update(votes=10)
+        leaderboard.ensure_loaded()
+        self.assertEqual(leaderboard.rank(self.courses[4].pk), 8)
+        leaderboard.loaded -= 3600
+        leaderboard.ensure_loaded()
+        self.assertEqual(leaderboard.rank(self.courses[4].pk), 1)
+
+    def test_votes_move_courses(self):
+        """
+        Votes change the ranks without loading the courses again
+        """
+        self.index()
+        update_vote(self.courses[4], 1)
+        update_votes([(self.courses[4].pk, 1), (self.courses[5].pk, -1)])
+        self.assertEqual(leaderboard.rank(self.courses[4].pk), 7)
+        self.assertEqual(leaderboard.rank(self.courses[5].pk), 8)
+        # The scoreboard version and the courses of the page
+        with self.assertNumQueries(2):
+            response = self.index(after='1_0')
+        self.assertEqual(self.titles(response), ["Course 4", "Course 5"])
+        self.assertEqual([course.votes for course in response.context['object_list']], [1, -1])
+
+    def test_created_changed_and_deleted_courses(self):
+        self.index()
+        course = Course.objects.create(course_title="Course 8", votes=6, lecturer=self.lecturer)
+        self.assertEqual(leaderboard.rank(course.pk), 2)
+        course.votes = 10
+        course.save()
+        self.assertEqual(leaderboard.rank(course.pk), 1)
+        self.courses[7].delete()
+        self.assertEqual(leaderboard.rank(self.courses[7].pk), None)
+        self.assertEqual(leaderboard.count(), 8)
+        self.lecturer.delete()
+        self.assertEqual(leaderboard.count(), 0)
+
+    @override_settings(SCORECARD_VOTE_LOG=True)
+    def test_logged_votes_are_counted(self):
+        """
+        Votes which are not compacted yet count on the leaderboard
+        """
+        update_vote(self.courses[5], 1)
+        update_vote(self.courses[5], 1)
+        self.assertEqual(leaderboard.rank(self.courses[5].pk), None)
+        self.index()
+        self.assertEqual(leaderboard.rank(self.courses[5].pk), 7)
+        update_vote(self.courses[5], 1)
+        # Ties are ordered by primary key, so course 5 passes course 6
+        self.assertEqual(leaderboard.rank(self.courses[5].pk), 6)
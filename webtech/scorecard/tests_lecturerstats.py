@@ -0,0 +1,106 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.urlresolvers import reverse
+from django.utils.six import StringIO
+
+from scorecard.models import Course, Lecturer, LecturerStats, LecturerStatsQuerySet
+from scorecard.views import update_vote
+
+
+class LecturerStatsTest(TestCase):
+
+    def setUp(self):
+        """
+        Create some courses & lecturers
+        """
+        self.lecturer_1 = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.lecturer_2 = Lecturer.objects.create(first_name="A", last_name="B")
+        self.course_1 = Course.objects.create(course_title="EADS", votes=4, lecturer=self.lecturer_1)
+        self.course_2 = Course.objects.create(course_title="ITSec", votes=1, lecturer=self.lecturer_2)
+        self.course_3 = Course.objects.create(course_title="Webtech", votes=2, lecturer=self.lecturer_2)
+
+    def stats(self, lecturer):
+        stats = LecturerStats.objects.get(lecturer=lecturer)
+        return stats.course_count, stats.vote_sum, stats.mean
+
+    def test_create(self):
+        """
+        Creating courses adds them to the statistics of their lecturer
+        """
+        self.assertEqual(self.stats(self.lecturer_1), (1, 4, 4))
+        self.assertEqual(self.stats(self.lecturer_2), (2, 3, 1.5))
+
+    def test_created_by_other_process(self):
+        """
+        The first course of a lecturer is added to the statistics another process created
+        after the update of this process found no statistics
+        """
+        lecturer = Lecturer.objects.create(first_name="C", last_name="D")
+
+        def update_before_other_process(queryset, **kwargs):
+            del LecturerStatsQuerySet.update
+            LecturerStats.objects.create(lecturer=lecturer, course_count=1, vote_sum=3, mean=3)
+            return 0
+
+        LecturerStatsQuerySet.update = update_before_other_process
+        try:
+            LecturerStats.objects.add_courses(lecturer.pk, 1, 5)
+        finally:
+            if 'update' in vars(LecturerStatsQuerySet):
+                del LecturerStatsQuerySet.update
+        self.assertEqual(self.stats(lecturer), (2, 8, 4))
+
+    def test_vote(self):
+        """
+        Votes are added to the statistics
+        """
+        update_vote(self.course_2, 1)
+        self.assertEqual(self.stats(self.lecturer_2), (2, 4, 2))
+
+    def test_reassign(self):
+        """
+        A course moved to another lecturer is moved in the statistics as well
+        """
+        self.course_3.lecturer = self.lecturer_1
+        self.course_3.save()
+        self.assertEqual(self.stats(self.lecturer_1), (2, 6, 3))
+        self.assertEqual(self.stats(self.lecturer_2), (1, 1, 1))
+
+    def test_delete(self):
+        """
+        Deleting courses removes them from the statistics
+        """
+        self.course_1.delete()
+        self.assertEqual(self.stats(self.lecturer_1), (0, 0, None))
+        self.assertEqual(LecturerStats.objects.best().lecturer, self.lecturer_2)
+        self.lecturer_2.delete()
+        self.assertEqual(LecturerStats.objects.best(), None)
+
+    def test_bulk_votes(self):
+        """
+        Votes added in bulk are added to the statistics
+        """
+        Course.objects.add_votes({self.course_1.pk: -2, self.course_2.pk: 3, self.course_3.pk: 3})
+        self.assertEqual(self.stats(self.lecturer_1), (1, 2, 2))
+        self.assertEqual(self.stats(self.lecturer_2), (2, 9, 4.5))
+
+    def test_statistics_use_stats(self):
+        """
+        The statistics page looks the best lecturer up in the statistics
+        """
+        response = self.client.get(reverse('scorecard:statistics'))
+        self.assertEqual(response.context['lecturer_best'], self.lecturer_1)
+        self.assertEqual(response.context['lecturer_best_votes_mean'], 4)
+
+    def test_rebuild_command(self):
+        """
+        The command rebuilds statistics which got out of sync and checks them
+        """
+        LecturerStats.objects.filter(lecturer=self.lecturer_2).update(vote_sum=100)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_lecturer_stats', check=True, stdout=StringIO(), stderr=StringIO())
+        out = StringIO()
+        call_command('rebuild_lecturer_stats', stdout=out)
+        self.assertIn("Statistics match the courses", out.getvalue())
+        self.assertEqual(self.stats(self.lecturer_2), (2, 3, 1.5))
@@ -0,0 +1,61 @@
+from django.test import SimpleTestCase, TestCase
+from django.core.urlresolvers import reverse
+
+from scorecard.metrics import Histogram, Metrics, metrics
+from scorecard.models import Course, Lecturer
+
+
+class HistogramTest(SimpleTestCase):
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram((1, 5, 10))
+        for value in (0, 1, 3, 7, 100):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [('1', 2), ('5', 3), ('10', 4), ('+Inf', 5)])
+        self.assertEqual((histogram.sum, histogram.count), (111, 5))
+
+    def test_render(self):
+        registry = Metrics()
+        registry.observe('scorecard:index', 200, 0.003, 0.001, 2, 1000)
+        registry.observe('scorecard:index', 200, 0.02, 0.01, 2, 1000)
+        registry.observe('scorecard:vote', 302, 0.5, 0.2, 4, None)
+        text = registry.render()
+        self.assertIn('# TYPE scorecard_request_duration_seconds histogram\n', text)
+        self.assertIn('scorecard_request_duration_seconds_bucket{view="scorecard:index",le="0.005"} 1\n', text)
+        self.assertIn('scorecard_request_duration_seconds_bucket{view="scorecard:index",le="+Inf"} 2\n', text)
+        self.assertIn('scorecard_request_queries_sum{view="scorecard:index"} 4\n', text)
+        self.assertIn('scorecard_responses_total{view="scorecard:vote",status="302"} 1\n', text)
+        # Responses without a known size are not measured
+        self.assertNotIn('scorecard_response_size_bytes_count{view="scorecard:vote"}', text)
+
+
+class MetricsMiddlewareTest(TestCase):
+
+    def setUp(self):
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="EADS", votes=0, lecturer=lecturer)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse('scorecard:index'))
+        self.client.get(reverse('scorecard:details', args=(self.course.pk,)))
+        self.client.get(reverse('scorecard:details', args=(self.course.pk,)))
+        self.client.get('/scorecard/missing')
+        response = self.client.get(reverse('scorecard:metrics'))
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode('utf-8')
+        self.assertIn('scorecard_request_duration_seconds_count{view="scorecard:details"} 2\n', text)
+        self.assertIn('scorecard_responses_total{view="scorecard:index",status="200"} 1\n', text)
+        self.assertIn('scorecard_responses_total{view="unresolved",status="404"} 1\n', text)
+
+    def test_queries_are_counted_without_debug(self):
+        """
+        The queries are counted even though connection.queries is empty without DEBUG
+        """
+        self.client.get(reverse('scorecard:details', args=(self.course.pk,)))
+        histogram = metrics.histograms['scorecard_request_queries']['scorecard:details']
+        self.assertEqual(histogram.count, 1)
+        self.assertGreaterEqual(histogram.sum, 2)
+        self.assertGreater(metrics.histograms['scorecard_request_db_duration_seconds']['scorecard:details'].sum, 0)
+        self.assertGreater(metrics.histograms['scorecard_response_size_bytes']['scorecard:details'].sum, 0)
@@ -0,0 +1,88 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard.models import Course, Lecturer
+from scorecard.views import update_vote
+
+
+@override_settings(SCORECARD_INDEX_PAGE_SIZE=3)
+class KeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        """
+        Create courses, some of them with the same votes
+        """
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.courses = [Course.objects.create(course_title="Course {0}".format(i), votes=votes, lecturer=lecturer)
+                        for i, votes in enumerate([5, 3, 3, 3, -1, 0, 3, 7])]
+
+    def index(self, **params):
+        return self.client.get(reverse('scorecard:index'), params)
+
+    def titles(self, response):
+        return [course.course_title for course in response.context['object_list']]
+
+    def walk_forward(self):
+        """
+        Follow the next links from the first to the last page
+        :return: List of course titles in the order of the pages
+        """
+        titles = []
+        response = self.index()
+        while True:
+            titles += self.titles(response)
+            if not response.context['next_cursor']:
+                return titles
+            response = self.index(after=response.context['next_cursor'])
+
+    def test_order_is_stable_for_ties(self):
+        """
+        Courses with the same votes are ordered by their primary key
+        """
+        self.assertEqual(self.walk_forward(), ["Course 7", "Course 0", "Course 1", "Course 2", "Course 3",
+                                               "Course 6", "Course 5", "Course 4"])
+
+    def test_first_and_last_page(self):
+        response = self.index()
+        self.assertEqual(response.context['previous_cursor'], None)
+        self.assertContains(response, '?after={0}'.format(response.context['next_cursor']))
+        response = self.index(after='0_{0}'.format(self.courses[5].pk))
+        self.assertEqual(self.titles(response), ["Course 4"])
+        self.assertEqual(response.context['next_cursor'], None)
+        self.assertNotEqual(response.context['previous_cursor'], None)
+
+    def test_previous_page(self):
+        """
+        Going back from the second page leads to the first page
+        """
+        first = self.index()
+        second = self.index(after=first.context['next_cursor'])
+        back = self.index(before=second.context['previous_cursor'])
+        self.assertEqual(self.titles(back), self.titles(first))
+        self.assertEqual(back.context['previous_cursor'], None)
+        self.assertEqual(back.context['next_cursor'], first.context['next_cursor'])
+
+    def test_votes_on_other_pages_do_not_shift(self):
+        """
+        Votes for courses on the first page do not duplicate or skip courses on the second page
+        """
+        first = self.index()
+        # Course 6 moves from the second to the first page
+        update_vote(self.courses[6], 1)
+        update_vote(self.courses[6], 1)
+        update_vote(self.courses[6], 1)
+        second = self.index(after=first.context['next_cursor'])
+        self.assertEqual(self.titles(second), ["Course 2", "Course 3", "Course 5"])
+
+    def test_page_query_does_not_depend_on_depth(self):
+        """
+        Deep pages need the same single query as the first page, besides reading the scoreboard version
+        """
+        with self.assertNumQueries(2):
+            self.index()
+        with self.assertNumQueries(2):
+            self.index(after='0_{0}'.format(self.courses[5].pk))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.index(after='1;DROP').status_code, 404)
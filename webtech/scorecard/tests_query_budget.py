@@ -0,0 +1,145 @@
+import json
+from collections import OrderedDict
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from scorecard.dedupe import COOKIE_NAME
+from scorecard.models import Course, Vote
+from scorecard.pagination import make_cursor
+from scorecard.seeding import clear_scorecard, seed_scorecard
+
+# Numbers of courses every page is requested with, a page reading rows one by one needs more queries for more courses
+SIZES = (1, 10, 100)
+
+# Exact number of SQL queries of every request, the same for every size
+# The conditional pages read the scoreboard version and the votes change it, one query each
+VIEW_BUDGETS = {
+    'index': 2,
+    'index next page': 2,
+    'details': 2,
+    'statistics': 2,
+    'vote': 6,
+    'vote again': 0,
+    'export': 3,
+    'metrics': 0,
+}
+API_BUDGETS = {
+    'api vote': 7,
+    'api votes': 8,
+}
+ADMIN_BUDGETS = {
+    'admin index': 3,
+    'course list': 4,
+    'course change': 6,
+    'course import': 2,
+    'lecturer list': 4,
+    'vote list': 4,
+}
+
+
+@override_settings(SCORECARD_STATISTICS_CACHE=False)
+class QueryBudgetTest(TestCase):
+    """
+    Every page needs the same number of queries no matter how many courses there are,
+    so reading related rows one by one (N+1 queries) fails here
+    """
+    maxDiff = None
+
+    def populate(self, size):
+        """
+        Replace all lecturers and courses, every course has a logged vote
+        :param size:    Number of courses
+        :return:        First course on the index page
+        """
+        clear_scorecard()
+        seed_scorecard(max(size // 5, 1), size)
+        Vote.objects.bulk_create([Vote(course_id=pk, delta=1) for pk in Course.objects.values_list('pk', flat=True)])
+        return Course.objects.order_by('-votes', 'pk')[0]
+
+    def measure(self, requests):
+        """
+        :param requests:    Dict name -> function doing the request
+        :return:            Dict name -> number of queries
+        """
+        counts = {}
+        for name, request in requests.items():
+            # Fill the caches of the process like the content types first, they are not part of the budget
+            self.client.cookies.pop(COOKIE_NAME, None)
+            request()
+            # Every request comes from a voter who has not voted yet
+            self.client.cookies.pop(COOKIE_NAME, None)
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            self.assertLess(response.status_code, 400, name)
+            counts[name] = len(queries)
+        return counts
+
+    def assertBudgets(self, budgets, make_requests):
+        """
+        Compare the queries of the requests with the budgets at every size
+        :param budgets:         Dict name -> exact number of queries
+        :param make_requests:   Function getting the first course and returning a dict name -> request function
+        :return:
+        """
+        failures = []
+        for size in SIZES:
+            counts = self.measure(make_requests(self.populate(size)))
+            for name, count in sorted(counts.items()):
+                if count != budgets[name]:
+                    failures.append("{0} with {1} courses: {2} queries instead of {3}".format(
+                        name, size, count, budgets[name]))
+        self.assertEqual(failures, [])
+
+    def test_views(self):
+        """
+        The pages of an anonymous voter, the export needs a staff member
+        """
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        staff = Client()
+        staff.login(username='admin', password='secret')
+
+        def requests(course):
+            get = self.client.get
+            return OrderedDict([
+                ('index', lambda: get(reverse('scorecard:index'))),
+                ('index next page', lambda: get(reverse('scorecard:index'), {'after': make_cursor(course)})),
+                ('details', lambda: get(reverse('scorecard:details', args=(course.pk,)))),
+                ('statistics', lambda: get(reverse('scorecard:statistics'))),
+                ('vote', lambda: get(reverse('scorecard:vote', args=(course.pk, 1)))),
+                ('vote again', lambda: get(reverse('scorecard:vote_again'))),
+                ('export', lambda: staff.get(reverse('scorecard:export', args=('csv',)))),
+                ('metrics', lambda: get(reverse('scorecard:metrics'))),
+            ])
+        self.assertBudgets(VIEW_BUDGETS, requests)
+
+    def test_api(self):
+        def requests(course):
+            # Courses of one lecturer, so the grouped updates do not depend on the random votes
+            pks = list(Course.objects.filter(lecturer=course.lecturer_id).values_list('pk', flat=True)[:10])
+            return OrderedDict([
+                ('api vote', lambda: self.client.post(reverse('scorecard:api_vote', args=(course.pk, 1)))),
+                ('api votes', lambda: self.client.post(reverse('scorecard:api_votes'),
+                                                      json.dumps({'votes': [[pk, 1] for pk in pks]}),
+                                                      content_type='application/json')),
+            ])
+        self.assertBudgets(API_BUDGETS, requests)
+
+    def test_admin(self):
+        def requests(course):
+            get = self.client.get
+            return OrderedDict([
+                ('admin index', lambda: get(reverse('admin:index'))),
+                ('course list', lambda: get(reverse('admin:scorecard_course_changelist'))),
+                ('course change', lambda: get(reverse('admin:scorecard_course_change', args=(course.pk,)))),
+                ('course import', lambda: get(reverse('admin:scorecard_course_import'))),
+                ('lecturer list', lambda: get(reverse('admin:scorecard_lecturer_changelist'))),
+                ('vote list', lambda: get(reverse('admin:scorecard_vote_changelist'))),
+            ])
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.login(username='admin', password='secret')
+        self.assertBudgets(ADMIN_BUDGETS, requests)
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.six import StringIO
+
+from scorecard.models import Course, Lecturer
+from scorecard.routers import PIN_COOKIE_NAME, ReplicaRouter, primary_pin
+from scorecard.sqlite import get_pragma
+from scorecard.stats import get_statistics
+
+REPLICA = 'test_replica'
+
+
+@override_settings(SCORECARD_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        primary_pin.reset()
+        self.addCleanup(primary_pin.reset)
+
+    def test_reads_from_replicas(self):
+        reads = set(self.router.db_for_read(Course) for i in range(50))
+        self.assertEqual(reads, set(['replica_1', 'replica_2']))
+        self.assertEqual(self.router.db_for_write(Course), DEFAULT_DB_ALIAS)
+
+    def test_reads_from_primary_after_write(self):
+        self.router.db_for_write(Course)
+        self.assertEqual(self.router.db_for_read(Course), DEFAULT_DB_ALIAS)
+
+    def test_reads_from_primary_when_pinned(self):
+        primary_pin.reset(pinned=True)
+        self.assertEqual(self.router.db_for_read(Course), DEFAULT_DB_ALIAS)
+
+    def test_without_replicas(self):
+        with override_settings(SCORECARD_REPLICAS=[]):
+            self.assertEqual(self.router.db_for_read(Course), DEFAULT_DB_ALIAS)
+
+    def test_no_migrations_on_replicas(self):
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, Course))
+        self.assertFalse(self.router.allow_migrate('replica_1', Course))
+
+
+class ReplicaTest(TransactionTestCase):
+    """
+    A second SQLite file as replica, refreshed with the command
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        connections.databases[REPLICA] = dict(connections.databases[DEFAULT_DB_ALIAS],
+                                              NAME=os.path.join(directory, 'replica.sqlite3'))
+        self.addCleanup(self.remove_replica)
+        settings = override_settings(SCORECARD_REPLICAS=[REPLICA])
+        settings.enable()
+        self.addCleanup(settings.disable)
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="Webtech", votes=0, lecturer=lecturer)
+        self.refresh()
+        primary_pin.reset()
+
+    def remove_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        primary_pin.reset()
+
+    def refresh(self):
+        call_command('refresh_replicas', stdout=StringIO())
+
+    def votes_on_details(self, client):
+        return client.get(reverse('scorecard:details', args=(self.course.pk,))).context['course'].votes
+
+    def test_voter_reads_own_vote(self):
+        voter = Client()
+        response = voter.get(reverse('scorecard:vote', args=(self.course.pk, 1)))
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
+        self.assertEqual(self.votes_on_details(voter), 1)
+        # Everybody else reads the replica, which does not have the vote yet
+        self.assertEqual(self.votes_on_details(Client()), 0)
+        self.refresh()
+        self.assertEqual(self.votes_on_details(Client()), 1)
+
+    def test_reads_without_writes_not_pinned(self):
+        response = self.client.get(reverse('scorecard:details', args=(self.course.pk,)))
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_replica_is_read_only(self):
+        self.assertEqual(get_pragma('query_only', connections[REPLICA]), 1)
+        self.assertEqual(Course.objects.using(REPLICA).get(pk=self.course.pk).votes, 0)
+
+    def statistics_queries(self, alias):
+        """
+        :param alias:   Database alias
+        :return:        Number of queries for the statistics sent to the database
+        """
+        with CaptureQueriesContext(connections[alias]) as queries:
+            get_statistics()
+        return len([query for query in queries if 'scorecard_lecturer' in query['sql']])
+
+    def test_statistics_from_replica(self):
+        self.assertEqual(self.statistics_queries(REPLICA), 1)
+        self.assertEqual(self.statistics_queries(DEFAULT_DB_ALIAS), 0)
+
+    def test_statistics_from_primary_after_write(self):
+        Course.objects.filter(pk=self.course.pk).update(votes=3)
+        self.assertEqual(self.statistics_queries(REPLICA), 0)
+        self.assertEqual(get_statistics().courses_votes_mean, 3)
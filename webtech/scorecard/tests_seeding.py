@@ -0,0 +1,64 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from scorecard.models import Counter, Course, Lecturer, LecturerStats, LECTURER_COUNTER
+from scorecard.seeding import DISTRIBUTIONS, clear_scorecard, seed_scorecard
+
+
+class SeedingTest(TestCase):
+
+    def courses(self):
+        """
+        :return: List of title, votes and lecturer position of every course
+        """
+        first = Lecturer.objects.order_by('pk').values_list('pk', flat=True).first()
+        return [(title, votes, lecturer - first)
+                for title, votes, lecturer in Course.objects.order_by('pk').values_list('course_title', 'votes',
+                                                                                       'lecturer_id')]
+
+    def test_counts_and_statistics(self):
+        """
+        The seeded data comes with up to date lecturer statistics and counters
+        """
+        seed_scorecard(7, 250, chunk_size=40)
+        self.assertEqual(Lecturer.objects.count(), 7)
+        self.assertEqual(Course.objects.count(), 250)
+        self.assertEqual(LecturerStats.objects.differences(), [])
+        self.assertEqual(Counter.objects.get(name=LECTURER_COUNTER).value, 7)
+
+    def test_deterministic(self):
+        """
+        The same seed creates the same data, another seed different data
+        """
+        seed_scorecard(5, 100, seed=42)
+        first = self.courses()
+        clear_scorecard()
+        seed_scorecard(5, 100, seed=42, chunk_size=30)
+        self.assertEqual(self.courses(), first)
+        clear_scorecard()
+        seed_scorecard(5, 100, seed=43)
+        self.assertNotEqual(self.courses(), first)
+
+    def test_distributions(self):
+        for distribution in sorted(DISTRIBUTIONS):
+            clear_scorecard()
+            seed_scorecard(3, 200, distribution)
+            self.assertEqual(Course.objects.count(), 200)
+
+    def test_zipf(self):
+        """
+        Zipf distributed votes are never negative and mostly small
+        """
+        seed_scorecard(3, 200, 'zipf')
+        votes = sorted(Course.objects.values_list('votes', flat=True))
+        self.assertTrue(votes[0] >= 0)
+        self.assertTrue(votes[100] < 5)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('seed_scorecard', lecturers=3, courses=20, distribution='normal', stdout=out)
+        call_command('seed_scorecard', lecturers=2, courses=10, clear=True, stdout=out)
+        self.assertEqual(Lecturer.objects.count(), 2)
+        self.assertEqual(Course.objects.count(), 10)
+        self.assertIn("Created 2 lecturers and 10 courses", out.getvalue())
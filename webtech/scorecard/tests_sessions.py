@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard.benchmark import SESSION_MODES, count_session_queries
+from scorecard.models import Course, Lecturer, Vote
+
+
+class SessionFreeVoteTest(TestCase):
+
+    def setUp(self):
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="EADS", votes=0, lecturer=self.lecturer)
+
+    def visit(self):
+        """
+        Show the index page, vote and show the message of the vote
+        :return: Number of queries using the session table, response with the message
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('scorecard:index'))
+            response = self.client.get(reverse('scorecard:vote', args=(self.course.pk, 1)), follow=True)
+        return count_session_queries(queries.captured_queries), response
+
+    def test_voting_needs_no_session(self):
+        """
+        With the default settings an anonymous voter never touches the session table
+        """
+        session_queries, response = self.visit()
+        self.assertEqual(session_queries, 0)
+        self.assertContains(response, "Vote Successful!")
+        self.assertNotIn('sessionid', self.client.cookies)
+
+    @override_settings(SCORECARD_VOTE_LOG=True, **SESSION_MODES['cookie'])
+    def test_logged_votes_with_cache_sessions(self):
+        """
+        The vote log needs a session for the voter, the cache session engine keeps it out of the database
+        """
+        session_queries, response = self.visit()
+        self.assertEqual(session_queries, 0)
+        self.assertContains(response, "Vote Successful!")
+        self.assertEqual(Vote.objects.get().session_key, self.client.cookies['sessionid'].value)
+
+    @override_settings(SCORECARD_VOTE_LOG=True, **SESSION_MODES['database'])
+    def test_logged_votes_with_database_sessions(self):
+        session_queries, response = self.visit()
+        self.assertGreater(session_queries, 0)
+        self.assertContains(response, "Vote Successful!")
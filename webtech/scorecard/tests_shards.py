@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard import shards
+from scorecard.models import Course, CourseShard, Lecturer
+from scorecard.views import update_vote
+
+
+@override_settings(SCORECARD_SHARDED_VOTES=True, SCORECARD_VOTE_SHARDS=4)
+class ShardedVotesTest(TestCase):
+
+    def setUp(self):
+        """
+        Create some courses & lecturers
+        """
+        # A long window, so the measured vote rate does not depend on the speed of the test
+        self.vote_rate = shards.vote_rate
+        shards.vote_rate = shards.VoteRate(window=3600)
+        self.lecturer_1 = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.lecturer_2 = Lecturer.objects.create(first_name="A", last_name="B")
+        self.course_1 = Course.objects.create(course_title="EADS", votes=1, lecturer=self.lecturer_1)
+        self.course_2 = Course.objects.create(course_title="ITSec", votes=2, lecturer=self.lecturer_2)
+
+    def tearDown(self):
+        shards.vote_rate = self.vote_rate
+
+    def test_votes_go_to_shards(self):
+        """
+        Votes are spread over the shards and do not touch the course row
+        """
+        for i in range(20):
+            update_vote(self.course_1, 1)
+        self.assertEqual(Course.objects.get(pk=self.course_1.pk).votes, 1)
+        self.assertTrue(1 <= CourseShard.objects.filter(course=self.course_1).count() <= 4)
+        self.assertEqual(shards.shard_votes(self.course_1.pk), 20)
+
+    def test_views_show_sum_of_shards(self):
+        """
+        Index, details and statistics show the course votes plus the votes of its shards
+        """
+        for i in range(3):
+            update_vote(self.course_1, 1)
+        response = self.client.get(reverse('scorecard:index'))
+        courses = response.context['object_list']
+        self.assertEqual([(course.pk, course.votes) for course in courses], [(self.course_1.pk, 4), (self.course_2.pk, 2)])
+        response = self.client.get(reverse('scorecard:details', kwargs={'pk': self.course_1.pk}))
+        self.assertEqual(response.context['course'].votes, 4)
+        response = self.client.get(reverse('scorecard:statistics'))
+        self.assertEqual(response.context['lecturer_best'], self.lecturer_1)
+        self.assertEqual(response.context['lecturer_best_votes_mean'], 4)
+        self.assertEqual(response.context['courses_votes_mean'], 3)
+
+    def test_fold_shards(self):
+        """
+        Folding moves the votes of the shards into the course
+        """
+        for i in range(5):
+            update_vote(self.course_1, -1)
+        shards.fold_shards()
+        self.assertEqual(Course.objects.get(pk=self.course_1.pk).votes, -4)
+        self.assertEqual(shards.shard_votes(self.course_1.pk), 0)
+
+    @override_settings(SCORECARD_SHARD_RATE_THRESHOLD=3.0 / 3600)
+    def test_only_hot_courses_are_sharded(self):
+        """
+        With a threshold, votes only go to shards once a course gets enough votes per time
+        """
+        update_vote(self.course_1, 1)
+        update_vote(self.course_1, 1)
+        self.assertFalse(CourseShard.objects.exists())
+        update_vote(self.course_1, 1)
+        self.assertEqual(shards.shard_votes(self.course_1.pk), 1)
+        self.assertEqual(Course.objects.get(pk=self.course_1.pk).votes, 3)
@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+from django.db import DatabaseError, OperationalError, connection, connections
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+
+from scorecard import caching
+from scorecard.benchmark import mixed_requests
+from scorecard.dedupe import COOKIE_NAME
+from scorecard.models import Course, Lecturer
+from scorecard.sqlite import get_pragma, retry_on_lock
+
+
+class PragmaTest(SimpleTestCase):
+    """
+    The PRAGMAs are set when a connection is created, so every test opens its own connection to a new file
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.settings_dict = dict(connection.settings_dict, NAME=os.path.join(directory, 'pragmas.sqlite3'))
+
+    def connect(self):
+        conn = connections['default'].__class__(self.settings_dict, alias='pragmas')
+        self.addCleanup(conn.close)
+        conn.cursor()
+        return conn
+
+    @override_settings(SCORECARD_SQLITE_TUNING=True)
+    def test_tuned_pragmas(self):
+        conn = self.connect()
+        self.assertEqual(get_pragma('journal_mode', conn), 'wal')
+        # NORMAL
+        self.assertEqual(get_pragma('synchronous', conn), 1)
+        self.assertEqual(get_pragma('busy_timeout', conn), 5000)
+        self.assertEqual(get_pragma('cache_size', conn), -20000)
+
+    @override_settings(SCORECARD_SQLITE_TUNING=True, SCORECARD_SQLITE_PRAGMAS={'cache_size': -1000})
+    def test_changed_pragma(self):
+        conn = self.connect()
+        self.assertEqual(get_pragma('cache_size', conn), -1000)
+        self.assertEqual(get_pragma('journal_mode', conn), 'wal')
+
+    @override_settings(SCORECARD_SQLITE_TUNING=False)
+    def test_default_pragmas(self):
+        self.assertEqual(get_pragma('journal_mode', self.connect()), 'delete')
+
+
+@override_settings(SCORECARD_SQLITE_RETRIES=2, SCORECARD_SQLITE_RETRY_DELAY=0)
+class RetryTest(SimpleTestCase):
+    """
+    Outside of a transaction, like a request without ATOMIC_REQUESTS
+    """
+
+    def failing(self, errors):
+        """
+        :param errors:  Exceptions raised by the first calls
+        :return:        Function raising the errors one after another, then returning the number of calls
+        """
+        calls = []
+
+        @retry_on_lock
+        def write():
+            calls.append(1)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return len(calls)
+        return write
+
+    def test_retried_while_locked(self):
+        locked = OperationalError("database is locked")
+        self.assertEqual(self.failing([locked, locked])(), 3)
+
+    def test_bounded(self):
+        locked = OperationalError("database is locked")
+        with self.assertRaises(OperationalError):
+            self.failing([locked, locked, locked])()
+
+    def test_other_errors_not_retried(self):
+        with self.assertRaises(OperationalError):
+            self.failing([OperationalError("no such table: scorecard_course")])()
+        with self.assertRaises(DatabaseError):
+            self.failing([DatabaseError("database is locked")])()
+
+
+class RetryInTransactionTest(TestCase):
+
+    @override_settings(SCORECARD_SQLITE_RETRIES=2, SCORECARD_SQLITE_RETRY_DELAY=0)
+    def test_not_retried_in_outer_transaction(self):
+        calls = []
+
+        @retry_on_lock
+        def write():
+            calls.append(1)
+            raise OperationalError("database is locked")
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_mixed_requests(self):
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        courses = [Course.objects.create(course_title="Webtech", lecturer=lecturer) for i in range(3)]
+        requests = mixed_requests(courses, 1000, 0.2)
+        self.assertEqual(requests, mixed_requests(courses, 1000, 0.2))
+        writes = [vote for kind, url, vote in requests if kind == 'write']
+        self.assertTrue(150 < len(writes) < 250)
+        self.assertEqual(set(writes), set([1, -1]))
+
+
+@override_settings(SCORECARD_SQLITE_RETRY_DELAY=0)
+class LockedVoteTest(TransactionTestCase):
+    """
+    Outside of a transaction, so the vote view retries writes failing with "database is locked"
+    """
+
+    def test_version_locked(self):
+        """
+        The scoreboard version is changed in the transaction of the vote, both are written again
+        """
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        course = Course.objects.create(course_title="Webtech", votes=0, lecturer=lecturer)
+        bump_version = caching.bump_version
+
+        def locked():
+            caching.bump_version = bump_version
+            raise OperationalError("database is locked")
+
+        caching.bump_version = locked
+        self.addCleanup(setattr, caching, 'bump_version', bump_version)
+        version = caching.get_version()
+        response = self.client.get(reverse('scorecard:vote', kwargs={'pk': course.pk, 'vote': 1}))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(COOKIE_NAME, response.cookies)
+        self.assertEqual(Course.objects.get(pk=course.pk).votes, 1)
+        self.assertGreater(caching.get_version(), version)
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.utils.functional import empty
+
+from scorecard import assets
+from scorecard.assets import FAR_FUTURE_CACHE_CONTROL, PLAIN_CACHE_CONTROL, minified_name
+
+BOOTSTRAP = 'scorecard/bootstrap/css/bootstrap.css'
+BOOTSTRAP_MIN = 'scorecard/bootstrap/css/bootstrap.min.css'
+
+
+class StaticPipelineTest(SimpleTestCase):
+    """
+    collectstatic into a temporary STATIC_ROOT, then serve the collected files like production does
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        settings = override_settings(STATIC_ROOT=self.root, DEBUG=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.root)
+        # The storage is created once and does not notice the changed settings
+        staticfiles_storage._wrapped = empty
+        self.addCleanup(setattr, staticfiles_storage, '_wrapped', empty)
+        assets.minified_names.clear()
+        self.addCleanup(assets.minified_names.clear)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def get(self, name, **headers):
+        return self.client.get(reverse('static', args=(name,)), **headers)
+
+    def test_files_are_hashed_and_compressed(self):
+        self.assertTrue(os.path.isfile(os.path.join(self.root, 'staticfiles.json')))
+        hashed = staticfiles_storage.stored_name(BOOTSTRAP_MIN)
+        self.assertNotEqual(hashed, BOOTSTRAP_MIN)
+        self.assertTrue(os.path.isfile(staticfiles_storage.path(hashed)))
+        self.assertTrue(os.path.isfile(staticfiles_storage.path(hashed) + '.gz'))
+        # Already compressed fonts are not compressed again
+        woff = staticfiles_storage.stored_name('scorecard/bootstrap/fonts/glyphicons-halflings-regular.woff')
+        self.assertFalse(os.path.isfile(staticfiles_storage.path(woff) + '.gz'))
+        with staticfiles_storage.open(hashed) as css:
+            self.assertIn(os.path.basename(woff).encode('ascii'), css.read())
+
+    def test_minified_build(self):
+        self.assertEqual(minified_name(BOOTSTRAP), BOOTSTRAP_MIN)
+        self.assertEqual(minified_name(BOOTSTRAP_MIN), BOOTSTRAP_MIN)
+        self.assertEqual(minified_name('scorecard/style.css'), 'scorecard/style.css')
+        assets.minified_names.clear()
+        with override_settings(DEBUG=True):
+            self.assertEqual(minified_name(BOOTSTRAP), BOOTSTRAP)
+
+    def test_serve_compressed_hashed_file(self):
+        hashed = staticfiles_storage.stored_name(BOOTSTRAP_MIN)
+        response = self.get(hashed, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], FAR_FUTURE_CACHE_CONTROL)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), os.path.getsize(staticfiles_storage.path(hashed) + '.gz'))
+
+        response = self.get(hashed, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(int(response['Content-Length']), os.path.getsize(staticfiles_storage.path(hashed)))
+
+    def test_serve_plain_file(self):
+        response = self.get('scorecard/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], PLAIN_CACHE_CONTROL)
+        response = self.get('scorecard/style.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_files(self):
+        self.assertEqual(self.get('scorecard/missing.css').status_code, 404)
+        self.assertEqual(self.get('../settings.py').status_code, 404)
+        self.assertEqual(self.get('scorecard/../../webtech/settings.py').status_code, 404)
+
+
+class NotCollectedTest(TestCase):
+
+    def test_index_before_collectstatic(self):
+        """
+        Without a manifest the pages link the files with their plain names
+        """
+        staticfiles_storage._wrapped = empty
+        self.addCleanup(setattr, staticfiles_storage, '_wrapped', empty)
+        with override_settings(STATIC_ROOT=tempfile.mkdtemp(), DEBUG=False):
+            response = self.client.get(reverse('scorecard:index'))
+        self.assertContains(response, 'href="/static/{0}"'.format(BOOTSTRAP_MIN))
+        self.assertContains(response, 'href="/static/scorecard/style.css"')
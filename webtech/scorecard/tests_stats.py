@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+
+from scorecard.models import Course, Lecturer
+from scorecard.stats import get_statistics
+from scorecard.views import update_vote
+
+
+class StatisticsTest(TestCase):
+
+    def setUp(self):
+        """
+        Create some courses & lecturers
+        """
+        self.lecturer_1 = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.lecturer_2 = Lecturer.objects.create(first_name="A", last_name="B")
+        self.lecturer_3 = Lecturer.objects.create(first_name="C", last_name="D")
+        Course.objects.create(course_title="EADS", votes=3, lecturer=self.lecturer_1)
+        Course.objects.create(course_title="ITSec", votes=1, lecturer=self.lecturer_2)
+        self.course = Course.objects.create(course_title="Webtech", votes=2, lecturer=self.lecturer_2)
+
+    def check_statistics(self, statistics):
+        self.assertEqual(statistics.lecturer_count, 3)
+        self.assertEqual(statistics.courses_count, 3)
+        self.assertEqual(statistics.courses_votes_mean, 2)
+        self.assertEqual(statistics.lecturer_best, self.lecturer_1)
+        self.assertEqual(str(statistics.lecturer_best), "Janosch Maier")
+        self.assertEqual(statistics.lecturer_best_votes_mean, 3)
+
+    def test_statistics(self):
+        self.check_statistics(get_statistics(counters=False))
+
+    def test_statistics_with_counters(self):
+        """
+        The maintained counters give the same figures as counting the rows
+        """
+        self.check_statistics(get_statistics(counters=True))
+        Lecturer.objects.create(first_name="E", last_name="F")
+        self.lecturer_3.delete()
+        self.assertEqual(get_statistics(counters=True).lecturer_count, 3)
+
+    @override_settings(SCORECARD_SHARDED_VOTES=True)
+    def test_statistics_with_corrections(self):
+        """
+        Votes in shards are part of the statistics
+        """
+        for i in range(4):
+            update_vote(self.course, 1)
+        statistics = get_statistics()
+        self.assertEqual(statistics.lecturer_best, self.lecturer_2)
+        self.assertEqual(statistics.lecturer_best_votes_mean, 3.5)
+
+    def test_statistics_without_courses(self):
+        Course.objects.all().delete()
+        statistics = get_statistics()
+        self.assertEqual(statistics.courses_count, 0)
+        self.assertEqual(statistics.lecturer_best, None)
+        self.assertEqual(statistics.courses_votes_mean, None)
+
+    def test_view_query_count(self):
+        """
+        The statistics page needs exactly one query in every mode, besides reading the scoreboard version
+        """
+        for mode in ({}, {'SCORECARD_STATISTICS_COUNTERS': True}, {'SCORECARD_SHARDED_VOTES': True}):
+            with override_settings(**mode):
+                with self.assertNumQueries(2):
+                    response = self.client.get(reverse('scorecard:statistics'))
+                self.assertEqual(response.context['lecturer_best'], self.lecturer_1)
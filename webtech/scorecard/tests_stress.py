@@ -0,0 +1,75 @@
+import threading
+from django.test import TransactionTestCase, Client
+from django.core.urlresolvers import reverse
+from django.db import connections
+
+from scorecard.models import Course, Lecturer
+
+
+class ConcurrentVoteTest(TransactionTestCase):
+    """
+    Fire a lot of votes from parallel threads and check that none of them gets lost
+    """
+    threads = 8
+    votes_per_thread = 250
+
+    def setUp(self):
+        """
+        Create one course all threads vote on
+        """
+        lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course = Course.objects.create(course_title="Webtech", votes=0, lecturer=lecturer)
+
+    def run_voters(self, up_down_for_thread):
+        """
+        Start all voting threads at the same time and wait until they are finished
+        :param up_down_for_thread: Function returning the vote (1 or -1) for a thread number
+        :return: List of errors raised in the threads
+        """
+        start = threading.Event()
+        errors = []
+
+        def voter(number):
+            url = reverse('scorecard:vote', kwargs={'pk': self.course.pk, 'vote': up_down_for_thread(number)})
+            start.wait()
+            try:
+                for i in range(self.votes_per_thread):
+                    # A fresh client has no session, so has_already_voted never blocks the vote
+                    response = Client().get(url)
+                    if response.status_code != 302:
+                        errors.append(response.status_code)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Every thread opens its own database connection
+                for conn in connections.all():
+                    conn.close()
+
+        workers = [threading.Thread(target=voter, args=(n,)) for n in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join()
+        return errors
+
+    def current_votes(self):
+        return Course.objects.get(pk=self.course.pk).votes
+
+    def test_no_upvote_is_lost(self):
+        """
+        All up-votes from all threads have to be counted
+        """
+        errors = self.run_voters(lambda number: 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.current_votes(), self.threads * self.votes_per_thread)
+
+    def test_no_vote_is_lost_when_mixed(self):
+        """
+        Up- and down-votes running at the same time have to add up exactly
+        """
+        errors = self.run_voters(lambda number: 1 if number % 4 else -1)
+        self.assertEqual(errors, [])
+        downvoters = len([n for n in range(self.threads) if not n % 4])
+        expected = (self.threads - 2 * downvoters) * self.votes_per_thread
+        self.assertEqual(self.current_votes(), expected)
@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.utils.six import StringIO
+
+from scorecard.models import Course, Lecturer, Vote
+from scorecard.votelog import compact_votes
+
+
+@override_settings(SCORECARD_VOTE_LOG=True)
+class VoteLogTest(TestCase):
+
+    def setUp(self):
+        """
+        Create some courses & lecturers
+        """
+        self.lecturer = Lecturer.objects.create(first_name="Janosch", last_name="Maier")
+        self.course_1 = Course.objects.create(course_title="EADS", votes=0, lecturer=self.lecturer)
+        self.course_2 = Course.objects.create(course_title="ITSec", votes=1, lecturer=self.lecturer)
+
+    def vote(self, course, up_down):
+        """
+        Vote for course with vote up_down from a new session
+        """
+        self.client.cookies.clear()
+        self.client.get(reverse('scorecard:vote', kwargs={'pk': course.pk, 'vote': up_down}))
+
+    def votes(self, course):
+        return Course.objects.get(pk=course.pk).votes
+
+    def test_vote_is_logged(self):
+        """
+        A vote is appended to the log and does not touch the course
+        """
+        self.vote(self.course_1, 1)
+        vote = Vote.objects.get()
+        self.assertEqual(vote.course, self.course_1)
+        self.assertEqual(vote.delta, 1)
+        self.assertFalse(vote.processed)
+        self.assertNotEqual(vote.session_key, '')
+        self.assertEqual(self.votes(self.course_1), 0)
+
+    def test_compaction(self):
+        """
+        Compaction folds the logged votes into the courses and marks them processed
+        """
+        self.vote(self.course_1, 1)
+        self.vote(self.course_1, 1)
+        self.vote(self.course_2, -1)
+        self.assertEqual(compact_votes(), 3)
+        self.assertEqual(self.votes(self.course_1), 2)
+        self.assertEqual(self.votes(self.course_2), 0)
+        self.assertFalse(Vote.objects.filter(processed=False).exists())
+        # Processed votes are never counted twice
+        self.assertEqual(compact_votes(), 0)
+        self.assertEqual(self.votes(self.course_1), 2)
+
+    def test_compact_votes_command(self):
+        self.vote(self.course_1, -1)
+        out = StringIO()
+        call_command('compact_votes', stdout=out)
+        self.assertIn("Compacted 1 votes", out.getvalue())
+        self.assertEqual(self.votes(self.course_1), -1)
+
+    def test_reads_without_pending_votes(self):
+        """
+        By default only compacted votes are shown
+        """
+        self.vote(self.course_1, 1)
+        response = self.client.get(reverse('scorecard:details', kwargs={'pk': self.course_1.pk}))
+        self.assertEqual(response.context['course'].votes, 0)
+
+    @override_settings(SCORECARD_VOTE_LOG_INCLUDE_PENDING=True)
+    def test_reads_with_pending_votes(self):
+        """
+        Index and details can include votes which are not compacted yet
+        """
+        self.vote(self.course_1, 1)
+        self.vote(self.course_1, 1)
+        response = self.client.get(reverse('scorecard:details', kwargs={'pk': self.course_1.pk}))
+        self.assertEqual(response.context['course'].votes, 2)
+        response = self.client.get(reverse('scorecard:index'))
+        courses = response.context['object_list']
+        self.assertEqual([course.pk for course in courses], [self.course_1.pk, self.course_2.pk])
+        self.assertEqual(courses[0].votes, 2)
@@ -1,6 +1,6 @@
 from django.conf.urls import patterns, url
 
-from scorecard import views
+from scorecard import api, views
 
 urlpatterns = patterns('',
                        url(r'^$', views.IndexView.as_view(), name='index'),
@@ -8,4 +8,8 @@ urlpatterns = patterns('',
                        url(r'^details/(?P<pk>\d+)$', views.details, name='details'),
                        url(r'^vote_again$', views.vote_again, name='vote_again'),
                        url(r'^statistics', views.statistics, name="statistics"),
+                       url(r'^api/vote/(?P<pk>\d+)/(?P<vote>-?\d)/$', api.vote, name='api_vote'),
+                       url(r'^api/votes/$', api.vote_batch, name='api_votes'),
+                       url(r'^export\.(?P<format>csv|ndjson)$', views.export, name='export'),
+                       url(r'^metrics$', views.metrics, name='metrics'),
                        )
\ No newline at end of file
@@ -1,39 +1,349 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render
-from django.http import HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.views import generic
 from django.core.urlresolvers import reverse
 from django.contrib import messages
-from django.db.models import Avg, Max
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections, router, transaction
+from django.db.models import Avg, Max, F
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.encoding import force_bytes, force_text
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from collections import defaultdict
+import hashlib
 import sys
 
-from scorecard.models import Course, Lecturer
+from scorecard.models import Course, Lecturer, LecturerStats, chunks
+from scorecard import buffer, caching, leaderboard, shards, sqlite, votelog
+from scorecard.buffer import vote_buffer
+from scorecard.caching import statistics_cache
+from scorecard.dedupe import COOKIE_NAME, VotedCourses, get_voted_courses, save_voted_courses
+from scorecard.export import FORMATS, export_lines
+from scorecard.fragments import render_rows
+from scorecard.metrics import CONTENT_TYPE, metrics as request_metrics
+from scorecard.pagination import get_page
+from scorecard.stats import get_statistics, get_variant, get_vote_corrections, current_votes_sql
 
 
 def redirect_to_index():
     return HttpResponseRedirect(reverse('scorecard:index'))
 
 
-def update_vote(course, vote):
+def update_vote(course, vote, session_key=None):
+    """
+    Count a vote for a course
+    The increment is done by the database in a single UPDATE of the votes column,
+    so concurrent votes can not overwrite each other
+    The statistics of the lecturer are updated in the same transaction
+    If the vote log is enabled, the vote is appended to the log and counted by the next compaction
+    If the vote buffer is enabled, the vote is only written with the next flush
+    If sharded votes are enabled, votes for hot courses are counted in one of the shards of the course
+    The scoreboard version changes in the transaction writing the vote, for buffered votes with the flush
+    The vote is counted on the leaderboard of this process in every case
+    The votes attribute of the passed course object is not refreshed
+    :param course:      Course to vote for
+    :param vote:        1 or -1 depending on up/down-vote
+    :param session_key: Session key of the voter, stored in the vote log
+    :return:            True if the vote was counted, False otherwise
+    """
     vote = int(vote)
     if abs(vote) == 1:
-        course.votes += vote
-        course.save()
+        if buffer.is_enabled() and not votelog.is_enabled():
+            # Never retried, the vote is in the buffer once add returns and a failed flush keeps it pending
+            vote_buffer.add(course.pk, vote)
+        else:
+            write_vote(course, vote, session_key)
+        leaderboard.leaderboard.add_votes(course.pk, vote)
         return True
     return False
 
 
-def set_voted(request, voted):
-    request.session['has_voted'] = voted
+@sqlite.retry_on_lock
+def write_vote(course, vote, session_key=None):
+    """
+    Store one vote the way update_vote describes it, again if the database was locked
+    The vote and the new scoreboard version are written in one transaction, so a failed attempt wrote nothing
+    Buffered votes are added by update_vote itself
+    :param course:      Course to vote for
+    :param vote:        1 or -1
+    :param session_key: Session key of the voter, stored in the vote log
+    :return:
+    """
+    with transaction.atomic():
+        if votelog.is_enabled():
+            votelog.log_vote(course.pk, vote, session_key)
+        elif shards.is_enabled() and shards.is_hot(course.pk):
+            shards.add_vote(course.pk, vote)
+        else:
+            Course.objects.filter(pk=course.pk).update(votes=F('votes') + vote, modified=timezone.now())
+            LecturerStats.objects.add_votes({course.lecturer_id: vote})
+        if is_vote_visible():
+            caching.bump_version()
+
+
+def is_vote_visible():
+    """
+    :return: True if a vote written by write_vote or write_votes changes the votes read by the pages at once,
+             logged votes only change them with the compaction unless pending votes are included
+    """
+    return not votelog.is_enabled() or votelog.include_pending()
+
+
+def update_votes(votes, session_key=None):
+    """
+    Count many votes in one transaction
+    Every vote is counted the way update_vote would count it,
+    but votes counted in Course.votes share the grouped UPDATEs of add_votes
+    :param votes:       List of (course pk, vote) pairs, vote is 1 or -1
+    :param session_key: Session key of the voter, stored in the vote log
+    :return:            True if the votes were counted, False if one of them is invalid
+    """
+    votes = [(int(pk), int(vote)) for pk, vote in votes]
+    if any(abs(vote) != 1 for pk, vote in votes):
+        return False
+    if buffer.is_enabled() and not votelog.is_enabled():
+        for pk, vote in votes:
+            vote_buffer.add(pk, vote)
+    else:
+        write_votes(votes, session_key)
+    for pk, vote in votes:
+        leaderboard.leaderboard.add_votes(pk, vote)
+    return True
+
+
+@sqlite.retry_on_lock
+def write_votes(votes, session_key=None):
+    """
+    Store many votes in one transaction the way update_votes describes it, again if the database was locked
+    The scoreboard version changes in the same transaction
+    Buffered votes are added by update_votes itself
+    :param votes:       List of (course pk, vote) pairs
+    :param session_key: Session key of the voter, stored in the vote log
+    :return:
+    """
+    with transaction.atomic():
+        if votelog.is_enabled():
+            votelog.log_votes(votes, session_key)
+            if votelog.include_pending():
+                caching.bump_version()
+        else:
+            deltas = defaultdict(int)
+            for pk, vote in votes:
+                if shards.is_enabled() and shards.is_hot(pk):
+                    shards.add_vote(pk, vote)
+                else:
+                    deltas[pk] += vote
+            Course.objects.add_votes(deltas)
+
+
+def get_votes(course):
+    """
+    Get the votes of a course including votes which are not yet written to Course.votes
+    :param course:  Course object
+    :return:        Number of votes
+    """
+    votes = course.votes
+    if votelog.include_pending():
+        votes += votelog.pending_votes(course.pk)
+    if buffer.is_enabled():
+        votes += vote_buffer.pending_votes(course.pk)
+    if shards.is_enabled():
+        votes += shards.shard_votes(course.pk)
+    return votes
+
+
+def get_current_votes(pks):
+    """
+    Get the votes of many courses including votes which are not yet written to Course.votes
+    :param pks: Primary keys of the courses
+    :return:    Dict of course pk -> votes, courses which do not exist are missing
+    """
+    corrections = get_vote_corrections()
+    votes = {}
+    for chunk in chunks(list(pks)):
+        courses = Course.objects.filter(pk__in=chunk)
+        if corrections:
+            courses = courses.extra(select={'current_votes': current_votes_sql(corrections)})
+            votes.update(courses.values_list('pk', 'current_votes'))
+        else:
+            votes.update(courses.values_list('pk', 'votes'))
+    if buffer.is_enabled():
+        for pk in votes:
+            votes[pk] += vote_buffer.pending_votes(pk)
+    return votes
+
+
+def get_lecturer_votes():
+    """
+    Get the mean votes of the courses of every lecturer
+    :return: Iterable of dicts with the lecturer pk and avg_votes
+    """
+    corrections = get_vote_corrections()
+    if not corrections:
+        return Course.objects.values('lecturer').annotate(avg_votes=Avg('votes'))
+    cursor = connections[router.db_for_read(Course)].cursor()
+    cursor.execute(
+        'SELECT "scorecard_course"."lecturer_id", AVG({0}) FROM "scorecard_course" '
+        'GROUP BY "scorecard_course"."lecturer_id"'.format(current_votes_sql(corrections)))
+    return [{'lecturer': lecturer, 'avg_votes': avg_votes} for lecturer, avg_votes in cursor.fetchall()]
+
+
+def set_voted(request, pks):
+    """
+    Remember the votes of the voter, save_voted_courses writes them into the response
+    :param request:
+    :param pks:     Primary keys of the courses the voter voted for
+    :return:
+    """
+    voted = get_voted_courses(request)
+    for pk in pks:
+        voted.add(pk)
 
 
-def has_already_voted(request):
-    return request.session.get('has_voted', False)
+def has_already_voted(request, pk):
+    """
+    :param request:
+    :param pk:      Primary key of a Course
+    :return:        True if the voter has already voted for the course, answered without the database
+    """
+    return pk in get_voted_courses(request)
+
+
+def get_session_key(request):
+    """
+    :param request:
+    :return:        Session key of the voter, the session is created first if votes are logged
+    """
+    if votelog.is_enabled() and request.session.session_key is None:
+        # Create the session now, so the logged vote can refer to it
+        request.session.save()
+    return request.session.session_key
+
+
+def make_etag(*parts):
+    """
+    :param parts:   Everything the content of a page depends on
+    :return:        ETag value, the same parts always give the same ETag
+    """
+    return hashlib.md5(force_bytes(':'.join(force_text(part) for part in parts))).hexdigest()
+
+
+def has_messages(request):
+    """
+    A page showing messages has to be rendered, a 304 response would swallow the messages
+    :param request:
+    :return:        True if there are messages to show
+    """
+    return len(messages.get_messages(request)) > 0
+
+
+def votes_outside_courses():
+    """
+    :return: True if shown votes can change without changing Course.votes and Course.modified
+    """
+    return votelog.include_pending() or buffer.is_enabled() or shards.is_enabled()
+
+
+def statistics_may_be_stale():
+    """
+    :return: True if the statistics page may show figures of an older scoreboard version
+    """
+    return caching.is_enabled() and statistics_cache.staleness() > 0
+
+
+def scoreboard_version(request):
+    """
+    Read the scoreboard version once per request, the validators and the statistics cache need it
+    :param request:
+    :return:        Current scoreboard version
+    """
+    if not hasattr(request, 'scoreboard_version'):
+        request.scoreboard_version = caching.get_version()
+    return request.scoreboard_version
+
+
+def index_etag(request, *args, **kwargs):
+    """
+    The index page changes with the scoreboard version, the page and the courses the voter voted for
+    """
+    if has_messages(request):
+        return None
+    return make_etag('index', scoreboard_version(request), request.COOKIES.get(COOKIE_NAME, ''),
+                     request.GET.get('after'), request.GET.get('before'), IndexView.get_page_size())
+
+
+def scoreboard_modified(request, *args, **kwargs):
+    if has_messages(request):
+        return None
+    return caching.version_modified(scoreboard_version(request))
+
+
+def statistics_etag(request):
+    """
+    The statistics page changes with the scoreboard version
+    """
+    if has_messages(request) or statistics_may_be_stale():
+        return None
+    return make_etag('statistics', scoreboard_version(request), get_variant())
+
+
+def statistics_modified(request):
+    if statistics_may_be_stale():
+        return None
+    return scoreboard_modified(request)
+
+
+def course_modified(request, pk):
+    """
+    Read the modification time of a course once per request
+    :param request:
+    :param pk:      Primary key of the Course
+    :return:        Modification time, None if there is no such course
+    """
+    if not hasattr(request, 'course_modified'):
+        request.course_modified = Course.objects.filter(pk=pk).values_list('modified', flat=True).first()
+    return request.course_modified
+
+
+def details_on_scoreboard():
+    """
+    :return: True if the details page changes with the scoreboard version and not only with the course,
+             because votes are counted outside of the course or the rank among all courses is shown
+    """
+    return votes_outside_courses() or leaderboard.is_enabled()
+
+
+def details_etag(request, pk):
+    """
+    The details page changes with the course, or with the scoreboard version, see details_on_scoreboard
+    Buffered votes only change the scoreboard version with the flush, the votes pending in the buffer
+    of this process are part of the ETag until then
+    """
+    modified = course_modified(request, pk)
+    if modified is None or has_messages(request):
+        return None
+    if details_on_scoreboard():
+        pending = vote_buffer.pending_votes(int(pk)) if buffer.is_enabled() else 0
+        return make_etag('details', pk, modified.isoformat(), scoreboard_version(request), pending)
+    return make_etag('details', pk, modified.isoformat())
+
+
+def details_modified(request, pk):
+    modified = course_modified(request, pk)
+    if modified is None or has_messages(request):
+        return None
+    if details_on_scoreboard():
+        return max(modified, caching.version_modified(scoreboard_version(request)))
+    return modified
 
 
 def get_best_lecturer_with_mean():
     best_lecturer = None
     best_lecturer_mean = -sys.maxsize
-    lecturer_votes = Course.objects.values('lecturer').annotate(avg_votes=Avg('votes'))
+    lecturer_votes = get_lecturer_votes()
     for lecturer_vote in lecturer_votes:
         if lecturer_vote['avg_votes'] > best_lecturer_mean:
             best_lecturer = lecturer_vote['lecturer']
@@ -52,8 +362,8 @@ def get_best_lecturer_with_mean_2():
 
 def vote(request, pk, vote):
     """
-    You can either up- or down-vote a course
-    The vote is saved in the model
+    You can either up- or down-vote a course, once for every course
+    The vote is saved in the model, the voted course is remembered in a cookie
     Then the user is redirected to the index page
     :param request: Request to work on
     :param pk:      Primary key of the Course
@@ -62,65 +372,136 @@ def vote(request, pk, vote):
     """
     # If there is no course with the corresponding pk return an error
     course = get_object_or_404(Course, pk=pk)
-    if has_already_voted(request):
+    if has_already_voted(request, course.pk):
         messages.add_message(request, messages.ERROR, "You have already voted!")
-    elif update_vote(course, vote):
-        set_voted(request, True)
+    elif update_vote(course, vote, get_session_key(request)):
+        set_voted(request, [course.pk])
         messages.add_message(request, messages.SUCCESS, "Vote Successful!")
     else:
         # Vote invalid
         messages.add_message(request, messages.ERROR, "Vote Not Successful!")
-    return redirect_to_index()
+    return save_voted_courses(request, redirect_to_index())
 
 
+@cache_control(no_cache=True)
+@condition(etag_func=statistics_etag, last_modified_func=statistics_modified)
 def statistics(request):
     """
     Show statistics page
+    All figures are computed in one query and cached until the next vote
+    Unchanged statistics are answered with 304 Not Modified
     :param request:
     :return:
     """
-    best_lecturer, best_lecturer_mean = get_best_lecturer_with_mean_2()
-    context = {
-        'lecturer_count': Lecturer.objects.count(),
-        'courses_count': Course.objects.count(),
-        'courses_votes_mean': Course.objects.aggregate(Avg('votes'))['votes__avg'],
-        'lecturer_best': best_lecturer,
-        'lecturer_best_votes_mean': best_lecturer_mean,
-    }
-    return render(request, 'scorecard/statistics.html', context)
+    if caching.is_enabled():
+        statistics, hit = statistics_cache.get(get_statistics, get_variant(), scoreboard_version(request))
+    else:
+        statistics, hit = get_statistics(), False
+    response = render(request, 'scorecard/statistics.html', statistics._asdict())
+    response['X-Statistics-Cache'] = 'hit' if hit else 'miss'
+    return response
 
 
 def vote_again(request):
     """
-    Remove vote counter from session
+    Forget the courses the voter voted for
     :param request:
     :return:
     """
-    set_voted(request, False)
-    return redirect_to_index()
+    request.voted_courses = VotedCourses()
+    return save_voted_courses(request, redirect_to_index())
 
 
+@cache_control(no_cache=True)
+@condition(etag_func=details_etag, last_modified_func=details_modified)
 def details(request, pk):
     """
     Show details page for course with primary key pk
+    An unchanged course is answered with 304 Not Modified
     :param request:
     :param pk:
     :return:
     """
-    course = get_object_or_404(Course, pk=pk)
+    course = get_object_or_404(Course.objects.select_related('lecturer'), pk=pk)
+    course.votes = get_votes(course)
+    if leaderboard.is_enabled():
+        leaderboard.leaderboard.ensure_loaded()
+        rank = leaderboard.leaderboard.rank(course.pk)
+        if rank is not None:
+            course.rank_label = leaderboard.rank_label(rank, leaderboard.leaderboard.count())
     return render(request, 'scorecard/details.html', {'course': course})
 
 
+@staff_member_required
+def export(request, format):
+    """
+    Stream all courses with their lecturers and votes
+    The rows are read chunk by chunk while the response is sent, so the memory use does not grow with the courses
+    :param request:
+    :param format:  csv or ndjson
+    :return:        Streaming response with the export as attachment
+    """
+    response = StreamingHttpResponse(export_lines(format), content_type=FORMATS[format][1])
+    response['Content-Disposition'] = 'attachment; filename="courses.{0}"'.format(format)
+    return response
+
+
+def metrics(request):
+    """
+    Show the request metrics of this process in the Prometheus text format
+    :param request:
+    :return:
+    """
+    return HttpResponse(request_metrics.render(), content_type=CONTENT_TYPE)
+
+
 class IndexView(generic.ListView):
     """
     The index page is a generic ListView.
-    All Courses are shown in a list
+    The Courses are shown in a list, one page at a time
     """
     template_name = 'scorecard/index.html'  # Template to use
     model = Course  # Model to use
 
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(condition(etag_func=index_etag, last_modified_func=scoreboard_modified))
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Answer with 304 Not Modified if the page did not change, before anything is loaded or rendered
+        """
+        return super(IndexView, self).dispatch(request, *args, **kwargs)
+
+    @staticmethod
+    def get_page_size():
+        return getattr(settings, 'SCORECARD_INDEX_PAGE_SIZE', 50)
+
     def get_queryset(self):
         """
         Order the Courses by their votes begining from the course with most votes.
+        Only the page selected by the after or before cursor is loaded.
+        If enabled, votes in the vote log which are not compacted yet and votes in shards are included.
+        If the leaderboard is enabled, the page and the ranks of the courses are taken from the leaderboard
+        and only the courses on the page are loaded.
+        """
+        after, before = self.request.GET.get('after'), self.request.GET.get('before')
+        if leaderboard.is_enabled():
+            self.page = leaderboard.get_page(self.get_page_size(), after=after, before=before)
+        else:
+            self.page = get_page(Course.objects.get_queryset(), self.get_page_size(), after=after, before=before,
+                                 corrections=get_vote_corrections())
+        return self.page.courses
+
+    def get_context_data(self, **kwargs):
+        """
+        Add the cursors for the previous and next page, mark the courses the voter voted for
+        and render the rows of the courses, which are cached for every course, votes and voted state
         """
-        return Course.objects.get_queryset().order_by('-votes')
+        context = super(IndexView, self).get_context_data(**kwargs)
+        context['previous_cursor'] = self.page.previous_cursor
+        context['next_cursor'] = self.page.next_cursor
+        voted = get_voted_courses(self.request)
+        for course in self.page.courses:
+            course.has_voted = course.pk in voted
+        context['has_voted'] = bool(voted)
+        context['course_rows'] = render_rows(self.page.courses)
+        return context
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+
+from scorecard.models import Course, Vote
+
+# Votes of a course which are logged but not yet compacted into Course.votes
+PENDING_VOTES_SQL = (
+    'SELECT COALESCE(SUM("scorecard_vote"."delta"), 0) FROM "scorecard_vote" '
+    'WHERE "scorecard_vote"."course_id" = "scorecard_course"."id" AND NOT "scorecard_vote"."processed"'
+)
+
+
+def is_enabled():
+    """
+    :return: True if votes should be appended to the vote log instead of updating the course
+    """
+    return getattr(settings, 'SCORECARD_VOTE_LOG', False)
+
+
+def include_pending():
+    """
+    :return: True if read votes should include logged votes which are not compacted yet
+    """
+    return is_enabled() and getattr(settings, 'SCORECARD_VOTE_LOG_INCLUDE_PENDING', False)
+
+
+def log_vote(course_pk, vote, session_key=None):
+    """
+    Append a vote to the log
+    This is a single INSERT which never touches the row of the course
+    :param course_pk:   Primary key of the Course
+    :param vote:        1 or -1 depending on up/down-vote
+    :param session_key: Session key of the voter
+    :return:            The created Vote
+    """
+    return Vote.objects.create(course_id=course_pk, delta=vote, session_key=session_key or '')
+
+
+def log_votes(votes, session_key=None):
+    """
+    Append many votes to the log with one INSERT per batch
+    :param votes:       List of (course pk, vote) pairs
+    :param session_key: Session key of the voter
+    :return:
+    """
+    Vote.objects.bulk_create([Vote(course_id=pk, delta=vote, session_key=session_key or '') for pk, vote in votes])
+
+
+def pending_votes(course_pk):
+    """
+    :param course_pk:   Primary key of the Course
+    :return:            Sum of the logged votes of the course which are not compacted yet
+    """
+    pending = Vote.objects.filter(course_id=course_pk, processed=False).aggregate(Sum('delta'))['delta__sum']
+    return pending or 0
+
+
+def compact_votes():
+    """
+    Fold all unprocessed votes into Course.votes and mark them processed
+    Only votes existing when the compaction starts are processed,
+    so votes logged in the meantime are left for the next run
+    :return: Number of votes compacted
+    """
+    with transaction.atomic():
+        unprocessed = Vote.objects.filter(processed=False)
+        last_id = unprocessed.aggregate(Max('id'))['id__max']
+        if last_id is None:
+            return 0
+        unprocessed = unprocessed.filter(id__lte=last_id)
+        deltas = unprocessed.values('course').annotate(delta=Sum('delta')).order_by()
+        Course.objects.add_votes(dict((row['course'], row['delta']) for row in deltas))
+        return unprocessed.update(processed=True)
@@ -40,6 +40,8 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE_CLASSES = (
+    'scorecard.middleware.MetricsMiddleware',
+    'scorecard.middleware.PrimaryPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -68,9 +70,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # The test database is a file, so that tests with several threads share it
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        },
     }
 }
 
+# Caches
+# Every process keeps the statistics in its default cache, the scoreboard version they belong to is in the database.
+# The rendered rows of the index page get their own cache, so they never push other entries out of the default cache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'scorecard',
+    },
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'scorecard-fragments',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Reads go to the databases listed in SCORECARD_REPLICAS and writes to default,
+# without replicas everything uses default, see webtech.settings_replica for a local replica
+DATABASE_ROUTERS = ['scorecard.routers.ReplicaRouter']
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.7/topics/i18n/
 
@@ -90,6 +117,19 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# collectstatic writes the files with the hash of their content in the name and their gzip/brotli copies here,
+# without DEBUG they are served by scorecard.assets.serve with far-future cache headers
+STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATICFILES_STORAGE = 'scorecard.storage.CompressedManifestStaticFilesStorage'
+
+# Sessions and messages
+# Anonymous voters only need cookies: the voted courses are kept in a signed cookie (scorecard.dedupe)
+# and the flash messages as well, so neither the index page nor a vote reads or writes django_session.
+# Sessions are still used by the admin and to identify voters in the vote log, with
+# SESSION_ENGINE = 'django.contrib.sessions.backends.cache' they stay out of the database, too
+# (the cache has to be shared by all processes, the default local memory cache is not).
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 from django.contrib.messages import constants as messages
 MESSAGE_TAGS = {
     messages.ERROR: 'danger'
@@ -0,0 +1,38 @@
+"""
+Production profile of the webtech project on SQLite
+
+Use it with DJANGO_SETTINGS_MODULE=webtech.settings_production, the hosts are read from WEBTECH_ALLOWED_HOSTS,
+separated by commas. Run collectstatic once per deployment.
+"""
+
+from webtech.settings import *
+
+DEBUG = False
+
+TEMPLATE_DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('WEBTECH_ALLOWED_HOSTS', 'localhost').split(',')
+
+# Templates are compiled once per process, changed templates need a restart
+TEMPLATE_LOADERS = (
+    ('django.template.loaders.cached.Loader', (
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    )),
+)
+
+# Keep the connection of a worker open for ten minutes instead of connecting for every request,
+# the PRAGMAs below are set once per connection
+DATABASES['default']['CONN_MAX_AGE'] = 600
+
+# WAL journal, synchronous=NORMAL, a bigger page cache, memory mapped reads and a busy timeout,
+# see scorecard.sqlite.TUNED_PRAGMAS, single values can be changed with SCORECARD_SQLITE_PRAGMAS
+SCORECARD_SQLITE_TUNING = True
+
+# Votes failing with "database is locked" are tried again up to 4 times, after 10, 20, 40 and 80 ms (randomized)
+SCORECARD_SQLITE_RETRIES = 4
+SCORECARD_SQLITE_RETRY_DELAY = 0.01
+
+# Votes within the same second share one scoreboard version, so the version row is written once per second
+# and cached pages and statistics are at most one second behind the votes, see scorecard.caching.get_version
+SCORECARD_VERSION_INTERVAL = 1
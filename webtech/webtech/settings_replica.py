@@ -0,0 +1,25 @@
+"""
+The webtech project with a read replica, a second SQLite file standing in for a replicated database
+
+Copy the primary into the replica with manage.py refresh_replicas --settings=webtech.settings_replica,
+add --interval 5 to keep it in sync, and run the server with the same settings.
+Votes are only seen on the replica after the next refresh, except by the voter, see scorecard.routers.
+"""
+
+from webtech.settings import *
+
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+    # refresh_replicas replaces the file, a connection per request reads the latest copy
+    'CONN_MAX_AGE': 0,
+    # Tests use the primary under both names
+    'TEST': {
+        'MIRROR': 'default',
+    },
+}
+
+SCORECARD_REPLICAS = ['replica']
+
+# A visitor reads from the primary for this many seconds after a vote, longer than the refresh interval
+SCORECARD_PRIMARY_PIN_SECONDS = 30
@@ -1,6 +1,10 @@
+import re
+from django.conf import settings
 from django.conf.urls import patterns, include, url
 from django.contrib import admin
 
+from scorecard import assets
+
 urlpatterns = patterns('',
                        # Examples:
                        # url(r'^$', 'webtech.views.home', name='home'),
@@ -8,4 +12,6 @@ urlpatterns = patterns('',
 
                        url(r'^admin/', include(admin.site.urls)),
                        url(r'^scorecard/', include('scorecard.urls', namespace="scorecard")),
+                       url(r'^{0}(?P<path>.*)$'.format(re.escape(settings.STATIC_URL.lstrip('/'))), assets.serve,
+                           name='static'),
 )